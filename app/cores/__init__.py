@@ -5,5 +5,22 @@ Contains application configuration, settings, and core utilities.
 """
 
 from .config import DATABASE_URL, SECRET_KEY
+from .cache import ResultCache, caches, get_data_version, bump_data_version
+from .single_flight import SingleFlight, flights
+from .pipeline import Pipeline, Stage, Done, pipelines, close_pipelines
 
-__all__ = ["DATABASE_URL", "SECRET_KEY"]
\ No newline at end of file
+__all__ = [
+    "DATABASE_URL",
+    "SECRET_KEY",
+    "ResultCache",
+    "caches",
+    "get_data_version",
+    "bump_data_version",
+    "SingleFlight",
+    "flights",
+    "Pipeline",
+    "Stage",
+    "Done",
+    "pipelines",
+    "close_pipelines"
+]
\ No newline at end of file
@@ -0,0 +1,95 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from .config import CACHE_MAXSIZE, CACHE_TTL
+
+_version_lock = threading.Lock()
+_data_version = 0
+
+# All result caches by name
+caches: Dict[str, "ResultCache"] = {}
+
+def get_data_version() -> int:
+    """Current version of the ingested data"""
+    return _data_version
+
+def bump_data_version() -> int:
+    """Mark cached results as stale after new data has been ingested"""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+class ResultCache:
+    """
+    Bounded LRU cache with a TTL for fully built endpoint responses.
+
+    Every entry remembers the data version it was computed at, so bumping the
+    version through bump_data_version() invalidates all entries at once.
+    """
+
+    def __init__(self, name: str, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None when missing, expired or stale"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, value = entry
+                if version == _data_version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """
+        Store value for key.
+
+        Args:
+            key: Normalized request parameters
+            value: Response object to cache
+            version: Data version the value was computed from (defaults to the current one)
+        """
+        with self._lock:
+            self._entries[key] = (
+                _data_version if version is None else version,
+                time.monotonic() + self.ttl,
+                value
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "data_version": _data_version
+            }
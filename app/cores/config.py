@@ -4,3 +4,44 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
+
+# Result cache for analytics endpoints
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "256"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+
+# On-disk location of the case search index
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "data/search_index.pkl")
+# Minimum seconds between saves of the index while cases are being ingested
+SEARCH_INDEX_SAVE_INTERVAL = float(os.getenv("SEARCH_INDEX_SAVE_INTERVAL", "60"))
+
+# Clustering backend of /api/cluster: 'optimal' (exact 1-D k-means) or 'kmeans' (scikit-learn)
+CLUSTER_BACKEND = os.getenv("CLUSTER_BACKEND", "optimal")
+CLUSTER_PROCESS_WORKERS = int(os.getenv("CLUSTER_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+# Scraper: worker threads, per-host token bucket (requests per second and burst size) and retries on 429/5xx
+SCRAPER_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "4"))
+SCRAPER_RATE = float(os.getenv("SCRAPER_RATE", "1"))
+SCRAPER_BURST = int(os.getenv("SCRAPER_BURST", "2"))
+SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", "4"))
+SCRAPER_BACKOFF = float(os.getenv("SCRAPER_BACKOFF", "1"))
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "60"))
+
+# Background ingestion jobs: SQLite queue file and number of job worker threads (0 disables them)
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite3")
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+# API key of the scraping job routes (X-API-Key header); unset disables the routes
+SCRAP_API_KEY = os.getenv("SCRAP_API_KEY")
+# Running jobs refresh a heartbeat; one silent for JOB_STALE_AFTER seconds belongs to a dead worker
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "120"))
+
+# Crawl frontier (per base_url progress and per-URL state) of the scraper
+CRAWL_FRONTIER_PATH = os.getenv("CRAWL_FRONTIER_PATH", "data/frontier.sqlite3")
+CRAWL_MAX_ATTEMPTS = int(os.getenv("CRAWL_MAX_ATTEMPTS", "3"))
+
+# Document pipeline of the scraper: queue size between stages and workers per stage
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_NETWORK_WORKERS = int(os.getenv("PIPELINE_NETWORK_WORKERS", "4"))
+PIPELINE_COMPRESS_WORKERS = int(os.getenv("PIPELINE_COMPRESS_WORKERS", str(os.cpu_count() or 1)))
+PIPELINE_LLM_CONCURRENCY = int(os.getenv("PIPELINE_LLM_CONCURRENCY", "2"))
+PIPELINE_STORE_WORKERS = int(os.getenv("PIPELINE_STORE_WORKERS", "1"))
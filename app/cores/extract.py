@@ -0,0 +1,113 @@
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+# A dotted path into nested dicts ('kabupaten.nama_kabupaten') or a tuple/list position
+Path = Union[str, int]
+
+_MISSING_ERRORS = (KeyError, IndexError, TypeError)
+
+def _segments(path: Path) -> Tuple[Union[str, int], ...]:
+    return (path,) if isinstance(path, int) else tuple(path.split('.'))
+
+@lru_cache(maxsize=None)
+def compile_path(path: Path) -> Callable[[Any], Any]:
+    """
+    Compile a path once into an accessor for one row.
+
+    The accessor indexes straight through the nested values and returns None
+    when a key is missing, an intermediate value is None, or it is not a container.
+
+    Args:
+        path: Dotted dict path or tuple position
+
+    Returns:
+        Function mapping a row to the value at the path (or None)
+    """
+    segments = _segments(path)
+    if len(segments) == 1:
+        get = itemgetter(segments[0])
+
+        def accessor(row):
+            try:
+                return get(row)
+            except _MISSING_ERRORS:
+                return None
+    else:
+        getters = tuple(itemgetter(segment) for segment in segments)
+
+        def accessor(row):
+            try:
+                for get in getters:
+                    row = get(row)
+                return row
+            except _MISSING_ERRORS:
+                return None
+
+    return accessor
+
+@lru_cache(maxsize=None)
+def compile_record(paths: Tuple[Path, ...]) -> Callable[[Any], tuple]:
+    """
+    Compile several paths into one accessor returning a tuple of their values.
+
+    Rows holding every top-level key are read with a single itemgetter call;
+    other rows fall back to one compiled accessor per path.
+
+    Args:
+        paths: Dotted dict paths or tuple positions
+
+    Returns:
+        Function mapping a row to a tuple with one value (or None) per path
+    """
+    accessors = tuple(compile_path(path) for path in paths)
+
+    def slow(row):
+        return tuple([accessor(row) for accessor in accessors])
+
+    if len(paths) < 2 or any(len(_segments(path)) > 1 for path in paths):
+        return slow
+
+    get = itemgetter(*(_segments(path)[0] for path in paths))
+
+    def accessor(row):
+        try:
+            return get(row)
+        except _MISSING_ERRORS:
+            return slow(row)
+
+    return accessor
+
+def extract_column(rows: Iterable[Any], path: Path, default: Any = None) -> List[Any]:
+    """
+    Pull one column out of a list of result rows.
+
+    Args:
+        rows: Result rows (e.g. the data of a Supabase response)
+        path: Dotted dict path or tuple position
+        default: Value used where the path is missing or null
+
+    Returns:
+        One value per row
+    """
+    accessor = compile_path(path)
+    if default is None:
+        return list(map(accessor, rows))
+    return [default if value is None else value for value in map(accessor, rows)]
+
+def extract_columns(rows: Sequence[Any], paths: Iterable[Path]) -> Dict[Path, List[Any]]:
+    """
+    Pull several columns out of a list of result rows in one pass.
+
+    Args:
+        rows: Result rows (e.g. the data of a Supabase response)
+        paths: Dotted dict paths or tuple positions
+
+    Returns:
+        Dictionary mapping each path to one value (or None) per row
+    """
+    paths = tuple(paths)
+    if not rows:
+        return {path: [] for path in paths}
+    columns = zip(*map(compile_record(paths), rows))
+    return {path: list(column) for path, column in zip(paths, columns)}
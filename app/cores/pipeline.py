@@ -0,0 +1,264 @@
+import time
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# All pipelines by name
+pipelines: Dict[str, "Pipeline"] = {}
+
+class Done:
+    """Returned by a stage to finish an item early with `result`, skipping the later stages"""
+
+    __slots__ = ('result',)
+
+    def __init__(self, result: Any):
+        self.result = result
+
+class Stage:
+    """
+    One step of a pipeline, run by `workers` concurrent workers.
+
+    fn receives the output of the previous stage. Coroutine functions are awaited
+    on the event loop; plain functions run on `executor` (e.g. a process pool for
+    CPU-bound work, where fn and its values must be picklable) or, by default, on
+    a thread of the pipeline run.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1, executor: Optional[Executor] = None):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.is_async = inspect.iscoroutinefunction(fn)
+
+class StageCounters:
+    """Progress of one stage during one pipeline run"""
+
+    def __init__(self, stage: Stage, queue: asyncio.Queue):
+        self.stage = stage
+        self.queue = queue
+        self.processed = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "name": self.stage.name,
+            "workers": self.stage.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "in_progress": self.in_progress,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput_per_second": round(self.processed / elapsed, 3) if elapsed else 0,
+            "utilization": round(self.busy_seconds / (elapsed * self.stage.workers), 4) if elapsed else 0
+        }
+
+class PipelineRun:
+    """Queues and counters of one pipeline run"""
+
+    def __init__(self, label: str, stages: List[Stage], queue_size: int):
+        self.label = label
+        self.items = 0
+        self.completed = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages = [StageCounters(stage, asyncio.Queue(maxsize=queue_size)) for stage in stages]
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "label": self.label,
+            "items": self.items,
+            "completed": self.completed,
+            "running": self.finished is None,
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": [counters.stats(elapsed) for counters in self.stages]
+        }
+
+class Pipeline:
+    """
+    Staged processing with a bounded queue in front of every stage.
+
+    Each stage has its own workers, so a slow stage only holds up the items
+    queued in front of it; when its queue is full the previous stage waits
+    (backpressure), down to the source, which stops reading new items.
+    An exception in a stage finishes the item with on_error(item, exc);
+    exceptions raised by on_error or on_result are logged and do not stop the run.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stages: List[Stage],
+        queue_size: int = 8,
+        on_error: Optional[Callable[[Any, Exception], Any]] = None
+    ):
+        self.name = name
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_error = on_error
+        self._runs: List[PipelineRun] = []
+        self._last_run: Optional[PipelineRun] = None
+        self._lock = threading.Lock()
+        pipelines[name] = self
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        on_result: Optional[Callable[[Any, Any], None]] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+        label: str = ""
+    ) -> List[Any]:
+        """
+        Push items through every stage.
+
+        Args:
+            items: Inputs of the first stage
+            on_result: Called with (item, result) as each item finishes
+            cancelled: Checked before each item is read; once True no new items enter
+            label: Name of this run in stats()
+
+        Returns:
+            One result per item in input order (None for items never started)
+
+        Raises:
+            The exception of a stage worker that died; the run stops instead of
+            waiting on its queue
+        """
+        items = list(items)
+        run = PipelineRun(label, self.stages, self.queue_size)
+        run.items = len(items)
+        results: List[Any] = [None] * len(items)
+        thread_workers = sum(stage.workers for stage in self.stages if not stage.is_async and stage.executor is None)
+        threads = ThreadPoolExecutor(max_workers=max(1, thread_workers), thread_name_prefix=f"{self.name}-stage")
+        with self._lock:
+            self._runs.append(run)
+
+        def finish(index: int, result: Any):
+            results[index] = result
+            run.completed += 1
+            if on_result:
+                try:
+                    on_result(items[index], result)
+                except Exception as e:
+                    print(f"Error in on_result of pipeline {self.name}: {e}")
+
+        def failed(index: int, error: Exception) -> Any:
+            if not self.on_error:
+                return None
+            try:
+                return self.on_error(items[index], error)
+            except Exception as e:
+                print(f"Error in on_error of pipeline {self.name}: {e}")
+                return None
+
+        async def feed():
+            for index in range(len(items)):
+                if cancelled and cancelled():
+                    break
+                await put(0, (index, items[index]))
+
+        async def put(position: int, entry):
+            counters = run.stages[position]
+            await counters.queue.put(entry)
+            counters.max_queue_depth = max(counters.max_queue_depth, counters.queue.qsize())
+
+        async def call(stage: Stage, value: Any) -> Any:
+            if stage.is_async:
+                return await stage.fn(value)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(stage.executor or threads, stage.fn, value)
+
+        async def work(position: int):
+            counters = run.stages[position]
+            last = position == len(run.stages) - 1
+            while True:
+                entry = await counters.queue.get()
+                if entry is None:
+                    return
+                index, value = entry
+                counters.in_progress += 1
+                start = time.perf_counter()
+                try:
+                    value = await call(counters.stage, value)
+                except Exception as e:
+                    counters.failed += 1
+                    value = Done(failed(index, e))
+                finally:
+                    counters.busy_seconds += time.perf_counter() - start
+                    counters.in_progress -= 1
+                    counters.processed += 1
+
+                if isinstance(value, Done):
+                    finish(index, value.result)
+                elif last:
+                    finish(index, value)
+                else:
+                    await put(position + 1, (index, value))
+
+        # A worker that dies would leave its queue without consumers and the stages
+        # in front of it blocked on put() forever, so it cancels the run instead
+        main = asyncio.current_task()
+        crashes: List[BaseException] = []
+
+        def watch(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None and not crashes:
+                crashes.append(task.exception())
+                main.cancel()
+
+        workers = [
+            [asyncio.create_task(work(position)) for _ in range(stage.workers)]
+            for position, stage in enumerate(self.stages)
+        ]
+        for task in (task for stage_tasks in workers for task in stage_tasks):
+            task.add_done_callback(watch)
+        try:
+            await feed()
+            # Close the stages in order once everything in front of them is done
+            for position, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    await run.stages[position].queue.put(None)
+                await asyncio.gather(*workers[position])
+        except asyncio.CancelledError:
+            if crashes:
+                raise crashes[0] from None
+            raise
+        finally:
+            for task in (task for stage_tasks in workers for task in stage_tasks):
+                task.cancel()
+            threads.shutdown(wait=False)
+            run.finished = time.perf_counter()
+            with self._lock:
+                self._runs.remove(run)
+                self._last_run = run
+
+        return results
+
+    def close(self):
+        """Shut down the stage executors (e.g. worker processes) and unregister the pipeline"""
+        for executor in {id(stage.executor): stage.executor for stage in self.stages if stage.executor}.values():
+            executor.shutdown(cancel_futures=True)
+        if pipelines.get(self.name) is self:
+            del pipelines[self.name]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage throughput and queue depth of the running runs and of the last finished run"""
+        with self._lock:
+            runs = list(self._runs)
+            last_run = self._last_run
+        return {
+            "name": self.name,
+            "running": [run.stats() for run in runs],
+            "last": last_run.stats() if last_run else None
+        }
+
+def close_pipelines():
+    """Close every registered pipeline"""
+    for pipeline in list(pipelines.values()):
+        pipeline.close()
@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# All single-flight groups by name
+flights: Dict[str, "SingleFlight"] = {}
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one in-flight computation.
+
+    The first caller for a key (the leader) starts the computation; callers with
+    the same key arriving before it finishes await the same task and receive its
+    result or exception. Nothing is kept once the task is done, so this sits in
+    front of the result caches rather than replacing them.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.coalesced = 0
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        flights[name] = self
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run compute() for key, or join the computation already running for it.
+
+        Args:
+            key: Normalized request parameters
+            compute: Coroutine function producing the result
+
+        Returns:
+            Result of the shared computation
+        """
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.leaders += 1
+            task = asyncio.ensure_future(compute())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._finish, key))
+
+        # A disconnecting caller must not cancel the computation for the others
+        return await asyncio.shield(task)
+
+    def coalesce(self, handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        Decorate an async route handler so identical concurrent calls share one run.
+
+        The key is built from the validated handler arguments, so equivalent query
+        strings (order, defaults) coalesce. Arguments must be hashable.
+        """
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return await self.do(key, lambda: handler(*args, **kwargs))
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """Leader/coalesced counters and current number of in-flight computations"""
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / total, 4) if total else 0,
+            "in_flight": len(self._tasks)
+        }
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved when every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -4,6 +4,8 @@ Database module.
 Contains database connections and database-related utilities.
 """
 
-from .database import supabase
+from .database import supabase, async_supabase
+from .fetch import iter_pages, fetch_all, aexecute, aiter_pages, afetch_all
+from .local_replica import replica
 
-__all__ = ["supabase"]
\ No newline at end of file
+__all__ = ["supabase", "async_supabase", "iter_pages", "fetch_all", "aexecute", "aiter_pages", "afetch_all", "replica"]
\ No newline at end of file
@@ -1,9 +1,28 @@
-from supabase import create_client, Client
+from supabase import create_client, Client, AsyncClient, AsyncClientOptions
 import os
+import httpx
 from dotenv import load_dotenv
 load_dotenv() 
 
 supabase: Client = create_client(
   os.getenv("SUPABASE_URL"),
   os.getenv("SUPABASE_KEY")
-)
\ No newline at end of file
+)
+
+# Maximum number of concurrent queries (and pooled keep-alive connections) of the async client
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+
+# Async client used by the API routes so queries do not block the event loop
+async_http_client = httpx.AsyncClient(
+  limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+  timeout=httpx.Timeout(120)
+)
+async_supabase: AsyncClient = AsyncClient(
+  os.getenv("SUPABASE_URL"),
+  os.getenv("SUPABASE_KEY"),
+  AsyncClientOptions(httpx_client=async_http_client)
+)
+
+async def close_async_client():
+  """Close the pooled connections of the async client"""
+  await async_http_client.aclose()
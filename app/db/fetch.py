@@ -0,0 +1,134 @@
+import os
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, List
+from dotenv import load_dotenv
+from .database import MAX_CONNECTIONS
+load_dotenv()
+
+# PostgREST max-rows of the Supabase project; a larger page would be truncated silently
+PAGE_SIZE = int(os.getenv("SUPABASE_MAX_ROWS", "1000"))
+FETCH_WORKERS = int(os.getenv("SUPABASE_FETCH_WORKERS", "4"))
+
+# Bounds the async queries in flight across all requests to the connection pool size
+_query_slots = asyncio.Semaphore(MAX_CONNECTIONS)
+
+def _fetch_window(build_query: Callable[[], Any], order_by: str, start: int, end: int) -> list:
+    """Execute one .range() window of a freshly built query"""
+    result = build_query().order(order_by).range(start, end).execute()
+    return result.data or []
+
+def iter_pages(
+    build_query: Callable[[], Any],
+    order_by: str = 'id',
+    page_size: int = PAGE_SIZE,
+    max_workers: int = FETCH_WORKERS
+) -> Iterator[List[dict]]:
+    """
+    Stream every row of a select as pages of at most page_size rows.
+
+    Up to max_workers consecutive windows are fetched concurrently and yielded
+    in order, so only a bounded number of pages is held in memory at a time.
+
+    Args:
+        build_query: Callable returning a new, unexecuted select builder (builders
+            are mutated by .range(), so each window needs its own)
+        order_by: Unique column giving the windows a stable order
+        page_size: Rows per window, must not exceed the PostgREST max-rows setting
+        max_workers: Maximum number of windows in flight
+
+    Yields:
+        Lists of row dictionaries
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        next_start = 0
+
+        def submit():
+            nonlocal next_start
+            pending.append(executor.submit(
+                _fetch_window, build_query, order_by, next_start, next_start + page_size - 1
+            ))
+            next_start += page_size
+
+        for _ in range(max_workers):
+            submit()
+
+        while pending:
+            page = pending.popleft().result()
+            if page:
+                yield page
+
+            # A short window is the last one; windows requested past it are dropped
+            if len(page) < page_size:
+                for future in pending:
+                    future.cancel()
+                break
+
+            submit()
+
+def fetch_all(build_query: Callable[[], Any], **kwargs) -> List[dict]:
+    """Fetch every row of a select, see iter_pages for the arguments"""
+    rows = []
+    for page in iter_pages(build_query, **kwargs):
+        rows.extend(page)
+    return rows
+
+
+async def aexecute(query: Any):
+    """Execute an async query builder once a connection slot is free"""
+    async with _query_slots:
+        return await query.execute()
+
+async def _afetch_window(build_query: Callable[[], Any], order_by: str, start: int, end: int) -> list:
+    """Execute one .range() window of a freshly built async query"""
+    result = await aexecute(build_query().order(order_by).range(start, end))
+    return result.data or []
+
+async def aiter_pages(
+    build_query: Callable[[], Any],
+    order_by: str = 'id',
+    page_size: int = PAGE_SIZE,
+    max_workers: int = FETCH_WORKERS
+) -> AsyncIterator[List[dict]]:
+    """
+    Async counterpart of iter_pages for builders of the async client.
+
+    Up to max_workers windows are requested concurrently on the event loop;
+    pages are still yielded in order.
+    """
+    pending = deque()
+    next_start = 0
+
+    def submit():
+        nonlocal next_start
+        pending.append(asyncio.ensure_future(
+            _afetch_window(build_query, order_by, next_start, next_start + page_size - 1)
+        ))
+        next_start += page_size
+
+    try:
+        for _ in range(max_workers):
+            submit()
+
+        while pending:
+            page = await pending.popleft()
+            if page:
+                yield page
+
+            # A short window is the last one; windows requested past it are dropped
+            if len(page) < page_size:
+                break
+
+            submit()
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def afetch_all(build_query: Callable[[], Any], **kwargs) -> List[dict]:
+    """Fetch every row of an async select, see iter_pages for the arguments"""
+    rows = []
+    async for page in aiter_pages(build_query, **kwargs):
+        rows.extend(page)
+    return rows
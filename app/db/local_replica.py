@@ -0,0 +1,229 @@
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from dotenv import load_dotenv
+from .database import supabase
+from .fetch import iter_pages
+load_dotenv()
+
+# SQLite file of the local replica; replication is disabled when empty
+LOCAL_REPLICA_PATH = os.getenv("LOCAL_REPLICA_PATH", "")
+LOCAL_REPLICA_SYNC_INTERVAL = float(os.getenv("LOCAL_REPLICA_SYNC_INTERVAL", "300"))
+
+# Incremental syncs re-read rows updated this many seconds before the newest synced
+# updated_at, so rows committed late with an older updated_at are still picked up
+SYNC_LOOKBACK_SECONDS = float(os.getenv("SYNC_LOOKBACK_SECONDS", "600"))
+
+# Replicated tables: key column, column types and whether rows are synced by updated_at.
+# Small reference tables without updated_at are reloaded on every sync.
+REPLICA_TABLES: Dict[str, Tuple[str, Dict[str, str], bool]] = {
+    'provinsi': ('kode_provinsi', {
+        'kode_provinsi': 'TEXT', 'nama_provinsi': 'TEXT'
+    }, False),
+    'kabupaten': ('kode_kabupaten', {
+        'kode_kabupaten': 'TEXT', 'nama_kabupaten': 'TEXT', 'kode_provinsi': 'TEXT'
+    }, False),
+    'waktu_kejadian': ('id', {'id': 'TEXT', 'waktu_kejadian': 'TEXT'}, False),
+    'lokasi_kejadian': ('id', {'id': 'TEXT', 'nama_lokasi': 'TEXT'}, False),
+    'putusan': ('id', {
+        'id': 'TEXT', 'nomor_putusan': 'TEXT', 'uri_dokumen': 'TEXT', 'judul_putusan': 'TEXT',
+        'tahun': 'INTEGER', 'lembaga_peradilan': 'TEXT', 'jenis_kejahatan': 'TEXT',
+        'lokasi_kejadian_id': 'TEXT', 'waktu_kejadian_id': 'TEXT', 'kode_kabupaten': 'TEXT',
+        'tanggal_dibacakan': 'TEXT', 'status_tahanan': 'TEXT', 'lama_tahanan': 'TEXT',
+        'vonis_hukuman': 'TEXT', 'hasil_putusan': 'TEXT', 'updated_at': 'TEXT'
+    }, True),
+    'putusan_detail': ('id', {
+        'id': 'TEXT', 'nomor_putusan': 'TEXT', 'hakim_id': 'TEXT', 'terdakwa_id': 'TEXT',
+        'penasihat_id': 'TEXT', 'penuntut_umum_id': 'TEXT', 'saksi_id': 'TEXT', 'updated_at': 'TEXT'
+    }, True),
+    'hakim': ('id', {'id': 'TEXT', 'nama_hakim': 'TEXT', 'jabatan': 'TEXT', 'updated_at': 'TEXT'}, True),
+    'terdakwa': ('id', {'id': 'TEXT', 'nama_lengkap': 'TEXT', 'updated_at': 'TEXT'}, True),
+    'saksi': ('id', {'id': 'TEXT', 'nama_saksi': 'TEXT', 'updated_at': 'TEXT'}, True),
+    'penuntut_umum': ('id', {'id': 'TEXT', 'nama_penuntut': 'TEXT', 'updated_at': 'TEXT'}, True),
+    'penasihat': ('id', {'id': 'TEXT', 'nama_penasihat': 'TEXT', 'updated_at': 'TEXT'}, True),
+}
+
+# Secondary indexes for the local group-bys, searches and incremental sync
+REPLICA_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS putusan_updated_at ON putusan (updated_at)',
+    'CREATE INDEX IF NOT EXISTS putusan_tanggal ON putusan (tanggal_dibacakan, id)',
+    'CREATE INDEX IF NOT EXISTS putusan_nomor ON putusan (nomor_putusan)',
+    'CREATE INDEX IF NOT EXISTS putusan_detail_nomor ON putusan_detail (nomor_putusan)',
+    'CREATE INDEX IF NOT EXISTS putusan_detail_updated_at ON putusan_detail (updated_at)',
+)
+
+class LocalReplica:
+    """
+    Optional SQLite copy of the putusan dataset for local SQL group-bys.
+
+    Tables with an updated_at column are synced incrementally: only rows changed
+    since the newest local updated_at are pulled and upserted. Rows deleted in
+    Supabase are not removed locally. Listeners are called after every sync
+    that changed data.
+    """
+
+    def __init__(self, path: str = LOCAL_REPLICA_PATH):
+        self.path = path
+        self.enabled = bool(path)
+        self.ready = False
+        self._sync_lock = threading.Lock()
+        self._listeners: List[Callable[[Dict[str, int]], None]] = []
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new connection; rows are returned as sqlite3.Row"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a read query against the replica"""
+        connection = self.connect()
+        try:
+            return [dict(row) for row in connection.execute(sql, params)]
+        finally:
+            connection.close()
+
+    def add_listener(self, listener: Callable[[Dict[str, int]], None]):
+        """Call listener with the changed row count per table after each sync that changed data"""
+        self._listeners.append(listener)
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Pull new and changed rows from Supabase into the replica.
+
+        Returns:
+            Dictionary mapping each table with changes to the number of rows written
+        """
+        with self._sync_lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            connection = self.connect()
+            try:
+                self._create_schema(connection)
+                changed = {}
+                for table in REPLICA_TABLES:
+                    count = self._sync_table(connection, table)
+                    if count:
+                        changed[table] = count
+
+                connection.execute(
+                    "INSERT OR REPLACE INTO replica_meta (name, value) VALUES ('synced_at', ?)",
+                    (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+                )
+                connection.commit()
+            finally:
+                connection.close()
+
+        self.ready = True
+        if changed:
+            for listener in self._listeners:
+                listener(changed)
+        return changed
+
+    def warm_in_background(self):
+        """Open an existing replica right away, then keep syncing it on a daemon thread"""
+        if not self.enabled:
+            return None
+
+        if os.path.exists(self.path):
+            try:
+                self.ready = bool(self.query("SELECT value FROM replica_meta WHERE name = 'synced_at'"))
+            except sqlite3.Error:
+                self.ready = False
+
+        def run():
+            while True:
+                try:
+                    self.sync()
+                except Exception as e:
+                    print(f"Error syncing local replica: {e}")
+                time.sleep(LOCAL_REPLICA_SYNC_INTERVAL)
+
+        thread = threading.Thread(target=run, name="replica-sync", daemon=True)
+        thread.start()
+        return thread
+
+    def _create_schema(self, connection: sqlite3.Connection):
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('CREATE TABLE IF NOT EXISTS replica_meta (name TEXT PRIMARY KEY, value TEXT)')
+        for table, (key, columns, _) in REPLICA_TABLES.items():
+            definitions = ', '.join(
+                f'{column} {kind} PRIMARY KEY' if column == key else f'{column} {kind}'
+                for column, kind in columns.items()
+            )
+            connection.execute(f'CREATE TABLE IF NOT EXISTS {table} ({definitions})')
+        for statement in REPLICA_INDEXES:
+            connection.execute(statement)
+
+    def _sync_table(self, connection: sqlite3.Connection, table: str) -> int:
+        """Upsert changed rows of one table, or reload it when it has no updated_at"""
+        key, columns, incremental = REPLICA_TABLES[table]
+        select = ', '.join(columns)
+
+        since = None
+        if incremental:
+            since = connection.execute(f'SELECT MAX(updated_at) FROM {table}').fetchone()[0]
+
+        if since:
+            # Rows of the lookback window are pulled again; the upsert is idempotent
+            since = sync_since(since)
+
+        def build_query():
+            query = supabase.table(table).select(select)
+            return query.gte('updated_at', since) if since else query
+
+        placeholders = ', '.join('?' for _ in columns)
+        rows = []
+        for page in iter_pages(build_query, order_by=key):
+            rows.extend(
+                tuple(_coerce(item.get(column), kind) for column, kind in columns.items())
+                for item in page
+            )
+
+        if not incremental:
+            local_rows = {tuple(row) for row in connection.execute(f'SELECT {select} FROM {table}')}
+            if local_rows == set(rows):
+                return 0
+            connection.execute(f'DELETE FROM {table}')
+        elif since:
+            # Skip rows already present unchanged (the lookback window is always pulled again)
+            unchanged = {
+                tuple(row)
+                for row in connection.execute(f'SELECT {select} FROM {table} WHERE updated_at >= ?', (since,))
+            }
+            rows = [row for row in rows if row not in unchanged]
+
+        connection.executemany(f'INSERT OR REPLACE INTO {table} ({select}) VALUES ({placeholders})', rows)
+        return len(rows)
+
+def sync_since(updated_at: str, lookback: float = SYNC_LOOKBACK_SECONDS) -> str:
+    """
+    Lower bound of an incremental sync from the newest updated_at already synced.
+
+    Args:
+        updated_at: Newest synced updated_at ('YYYY-MM-DD HH:MM:SS' or ISO 8601)
+        lookback: Seconds to re-read before it
+
+    Returns:
+        updated_at moved back by lookback, in the same format
+    """
+    try:
+        moment = datetime.fromisoformat(str(updated_at))
+    except ValueError:
+        return updated_at
+    return (moment - timedelta(seconds=lookback)).isoformat(sep='T' if 'T' in str(updated_at) else ' ')
+
+def _coerce(value: Any, kind: str) -> Any:
+    """Convert a value the way the column affinity would, so local and remote rows compare equal"""
+    if value is None:
+        return None
+    if kind == 'INTEGER':
+        return int(value) if str(value).strip().lstrip('-').isdigit() else value
+    return str(value)
+
+replica = LocalReplica()
@@ -1,6 +1,7 @@
 import os
 import sys
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -17,7 +18,18 @@ try:
     from .routers.cluster_router import router as cluster_router
     from .routers.search_router import router as search_router
     from .routers.trend_router import router as trend_router
-    # from .routers.scrap_router import router as scrap_router
+    from .routers.metrics_router import router as metrics_router
+    from .services.index_service import search_index
+    from .services.party_service import party_index
+    from .services.dimension_service import dimensions
+    from .services.master_service import master_dictionary
+    from .services.cube_service import crime_cube
+    from .db.database import close_async_client
+    from .services.cluster_service import shutdown_process_pool
+    from .services.job_service import job_workers
+    from .cores.pipeline import close_pipelines
+    from .db.local_replica import replica
+    from .routers.scrap_router import router as scrap_router
     # from .routers.summarize_router import router as summarize_router
 except ImportError:
     # Fallback to absolute import (when run directly)
@@ -27,13 +39,43 @@ except ImportError:
     from app.routers.cluster_router import router as cluster_router
     from app.routers.search_router import router as search_router
     from app.routers.trend_router import router as trend_router
-    # from app.routers.scrap_router import router as scrap_router
+    from app.routers.metrics_router import router as metrics_router
+    from app.services.index_service import search_index
+    from app.services.party_service import party_index
+    from app.services.dimension_service import dimensions
+    from app.services.master_service import master_dictionary
+    from app.services.cube_service import crime_cube
+    from app.db.database import close_async_client
+    from app.services.cluster_service import shutdown_process_pool
+    from app.services.job_service import job_workers
+    from app.cores.pipeline import close_pipelines
+    from app.db.local_replica import replica
+    from app.routers.scrap_router import router as scrap_router
     # from app.routers.summarize_router import router as summarize_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open and sync the optional local replica, warm the dimension cache, master dictionary and crime cube (sharing one case store load), then load (or build) the search index without delaying startup
+    replica.warm_in_background()
+    dimensions.warm_in_background()
+    master_dictionary.warm_in_background()
+    crime_cube.warm_in_background()
+    search_index.warm_in_background()
+    party_index.warm_in_background()
+    # Run queued scraping jobs on the ingestion worker threads
+    job_workers.start()
+    yield
+    job_workers.stop()
+    search_index.flush()
+    await close_async_client()
+    shutdown_process_pool()
+    close_pipelines()
+
 app = FastAPI(
     title="Crime Sight API",
     description="Backend API for Crime Sight application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Setup
@@ -50,7 +92,8 @@ app.include_router(master_router)
 app.include_router(cluster_router)
 app.include_router(search_router)
 app.include_router(trend_router)
-# app.include_router(scrap_router)
+app.include_router(metrics_router)
+app.include_router(scrap_router)
 # app.include_router(summarize_router)
 
 @app.get("/")
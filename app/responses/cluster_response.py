@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field
 
 class CrimeClusterResponse(BaseModel):
     name: str
@@ -8,8 +9,36 @@ class CrimeClusterResponse(BaseModel):
 
 class MetaResponse(BaseModel):
     total_records: int
+    k: Optional[int] = None
+    levels: list[str] = []
     filters: dict
 
 class APIResponse(BaseModel):
     meta: MetaResponse
-    data: list[CrimeClusterResponse]
\ No newline at end of file
+    data: list[CrimeClusterResponse]
+
+class ClusterFilter(BaseModel):
+    jenis_kejahatan: Optional[str] = None
+    tahun: Optional[int] = None
+    provinsi: Optional[str] = None
+
+class ClusterGrid(BaseModel):
+    jenis_kejahatan: list[Optional[str]] = Field(default_factory=lambda: [None])
+    tahun: list[Optional[int]] = Field(default_factory=lambda: [None])
+    provinsi: list[Optional[str]] = Field(default_factory=lambda: [None])
+
+class ClusterBatchRequest(BaseModel):
+    combinations: list[ClusterFilter] = Field(default_factory=list, description="Explicit filter combinations")
+    grid: Optional[ClusterGrid] = Field(None, description="Every combination of the listed values; null means no filter")
+    k: int = Field(3, ge=1, le=5)
+    auto_k: bool = Field(False, description="Pick the number of levels (2-5) per combination by silhouette score")
+    processes: bool = Field(False, description="Cluster the combinations across a process pool")
+
+class BatchMetaResponse(BaseModel):
+    total_combinations: int
+    k: int
+    auto_k: bool = False
+
+class BatchAPIResponse(BaseModel):
+    meta: BatchMetaResponse
+    data: list[APIResponse]
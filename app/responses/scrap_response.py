@@ -0,0 +1,46 @@
+from typing import Optional
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field, field_validator
+
+DEFAULT_BASE_URL = "https://putusan3.mahkamahagung.go.id/direktori/index/pengadilan/pn-bandung/kategori/pidana-umum-1"
+
+# Only the Mahkamah Agung decision directory may be crawled
+ALLOWED_HOSTS = ("putusan3.mahkamahagung.go.id",)
+
+class ScrapJobRequest(BaseModel):
+    base_url: str = Field(DEFAULT_BASE_URL, description="Base URL untuk scraping data putusan")
+    page_start: int = Field(1, ge=1, description="Halaman daftar pertama")
+    page_end: Optional[int] = Field(5, ge=1, description="Halaman daftar terakhir; null sampai halaman terakhir")
+    incremental: bool = Field(False, description="Berhenti pada halaman pertama yang seluruh putusannya sudah ada")
+
+    @field_validator("base_url")
+    @classmethod
+    def check_base_url(cls, value: str) -> str:
+        url = urlsplit(value.strip())
+        if url.scheme not in ("http", "https") or url.hostname not in ALLOWED_HOSTS or url.username or url.port:
+            raise ValueError(f"base_url harus berupa URL direktori {', '.join(ALLOWED_HOSTS)}")
+        return value.strip()
+
+class ScrapJobResponse(BaseModel):
+    id: str
+    base_url: str
+    page_start: int
+    page_end: Optional[int] = None
+    incremental: bool = False
+    status: str
+    cancel_requested: bool
+    pages: int
+    cases_found: int
+    cases_processed: int
+    cases_saved: int
+    cases_skipped: int
+    cases_failed: int
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    owner: Optional[str] = None
+    heartbeat_at: Optional[str] = None
+
+class ScrapJobListResponse(BaseModel):
+    data: list[ScrapJobResponse]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
     
 class HakimResponse(BaseModel):
     """Model for judge information."""
@@ -49,9 +49,41 @@ class SearchMetaResponse(BaseModel):
     has_next: bool = Field(..., description="Whether there are more results")
     has_prev: bool = Field(..., description="Whether there are previous results")
     search_query: Optional[str] = Field(None, description="Search query used")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page in keyset mode (date ordering only)")
+
+# Model for one facet value
+class FacetBucketResponse(BaseModel):
+    """Model for the number of matching cases sharing one facet value."""
+    value: str = Field(..., description="Facet value (province code for provinsi)")
+    label: Optional[str] = Field(None, description="Display name (province name for provinsi)")
+    count: int = Field(..., description="Number of matching cases")
 
 # Main search response model
 class SearchCasesResponse(BaseModel):
     """Main response model for case search."""
     data: List[CaseResponse] = Field(..., description="List of cases found")
     meta: SearchMetaResponse = Field(..., description="Search metadata and pagination")
+    facets: Optional[Dict[str, List[FacetBucketResponse]]] = Field(None, description="Facet counts over all matching cases")
+
+
+# Model for one fuzzy party name match
+class PartyMatchResponse(BaseModel):
+    """Model for a person whose name matches a party search."""
+    role: str = Field(..., description="Party table (terdakwa, hakim, saksi, penuntut_umum)")
+    id: str = Field(..., description="Person ID")
+    nama: str = Field(..., description="Name as stored")
+    score: float = Field(..., description="Trigram similarity to the query (0-1)")
+    cases: List[str] = Field(default=[], description="Case numbers the person appears in")
+
+# Model for party search metadata
+class PartySearchMetaResponse(BaseModel):
+    """Model for party search metadata."""
+    total: int = Field(..., description="Number of matches returned")
+    search_query: str = Field(..., description="Name searched for")
+    role: Optional[str] = Field(None, description="Party table filter used")
+
+# Party search response model
+class PartySearchResponse(BaseModel):
+    """Response model for fuzzy party name search."""
+    data: List[PartyMatchResponse] = Field(..., description="Matching people, best first")
+    meta: PartySearchMetaResponse = Field(..., description="Search metadata")
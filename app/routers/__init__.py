@@ -4,6 +4,6 @@ Routers module.
 Contains all API route definitions.
 """
 
-from . import cluster_router, search_router, master_router, trend_router
+from . import cluster_router, search_router, master_router, trend_router, scrap_router, metrics_router
 
-__all__ = ["cluster_router", "search_router", "master_router", "trend_router"]
\ No newline at end of file
+__all__ = ["cluster_router", "search_router", "master_router", "trend_router", "scrap_router", "metrics_router"]
\ No newline at end of file
@@ -1,60 +1,194 @@
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from itertools import product
 from typing import Optional
-from ..db.database import supabase
-from ..responses.cluster_response import APIResponse
-from ..services.cluster_service import group_and_count, perform_clustering
+from ..cores.cache import ResultCache, get_data_version
+from ..cores.single_flight import SingleFlight
+from ..responses.cluster_response import APIResponse, ClusterBatchRequest, BatchAPIResponse
+from ..services.cluster_service import perform_clustering, kabupaten_counts, cluster_many, clustering_levels, MAX_CLUSTERS
+from ..services.cube_service import crime_cube
 
 router = APIRouter(prefix="/api", tags=["cluster"])
+cluster_cache = ResultCache("cluster")
+cluster_flight = SingleFlight("cluster")
+
 @router.get("/cluster", response_model=APIResponse)
+@cluster_flight.coalesce
 async def get_crime_clusters(
     jenis_kejahatan: Optional[str] = Query(None),
     tahun: Optional[int] = Query(None),
-    provinsi: Optional[str] = Query(None)
+    provinsi: Optional[str] = Query(None),
+    k: int = Query(3, ge=1, le=MAX_CLUSTERS, description="Number of levels; 3 gives Rendah/Sedang/Tinggi"),
+    auto_k: bool = Query(False, description="Pick the number of levels (2-5) with the best silhouette score instead of k")
 ):
     try:
-        # 1. Build query
-        query = supabase.table('putusan').select('id, jenis_kejahatan, tahun, kabupaten(nama_kabupaten, kode_provinsi)')
-        
-        if jenis_kejahatan:
-            query = query.eq('jenis_kejahatan', jenis_kejahatan)
-        if tahun:
-            query = query.eq('tahun', tahun)
-        if provinsi:
-            query = query.eq('kabupaten.kode_provinsi', provinsi)
-
-        # 2. Execute query
-        res = query.execute()
-        # print(f"Raw query result: {res.data if res.data else 'No data'}")  # Debug: show first 2 items
-        
-        data = [item for item in res.data if item and isinstance(item, dict) and item.get('kabupaten') is not None]
-        # print(f"Filtered data count: {len(data)}")
-        # if data:
-        #     print(f"Sample filtered item: {data[0]}")
-        
-        if not data:
+        # Serve repeated filter combinations from the result cache
+        cache_key = (jenis_kejahatan, tahun, provinsi, k, auto_k)
+        cached = cluster_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        data_version = get_data_version()
+
+        # Load the crime cube on first use without blocking other requests
+        await crime_cube.aensure_built()
+
+        # 1. Roll the crime cube up to kabupaten within the filters
+        cells = crime_cube.rollup(
+            ('kabupaten', 'nama_kabupaten'),
+            tahun=tahun or None,
+            jenis_kejahatan=jenis_kejahatan or None,
+            kode_provinsi=provinsi or None
+        )
+
+        # 2. Count cases per kabupaten, skipping cases without a known kabupaten
+        grouped_data, total_records = kabupaten_counts(cells.items())
+
+        if not total_records:
             raise HTTPException(status_code=404, detail="Data tidak ditemukan")
 
         # 3. Process data
-        group_col = 'kabupaten.nama_kabupaten'
-        # print(f"Group column: {group_col}")
-        grouped_data = group_and_count(data, group_col)
-        # print(f"Grouped data: {grouped_data}")
-        clustered_data = perform_clustering(grouped_data)
-
-        # 4. Prepare response
-        response = {
-            "data": clustered_data,
-            "meta": {
-                "total_records": len(data),
+        clustered_data = await run_in_threadpool(perform_clustering, grouped_data, k, None, auto_k)
+
+        # 4. Prepare response with the levels actually used, lowest first
+        levels = clustering_levels(clustered_data)
+        response = APIResponse(
+            data=clustered_data,
+            meta={
+                "total_records": total_records,
+                "k": len(levels),
+                "levels": levels,
                 "filters": {
                     "jenis_kejahatan": jenis_kejahatan,
                     "tahun": tahun,
                     "provinsi": provinsi
                 }
             }
-        }
+        )
 
+        cluster_cache.set(cache_key, response, version=data_version)
         return response
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Upper bound on filter combinations per batch request
+MAX_BATCH_COMBINATIONS = 1000
+
+def slice_cluster_data(combinations: list[tuple]) -> list[tuple]:
+    """
+    Count cases per kabupaten for many filter combinations from one cube rollup.
+
+    Args:
+        combinations: (jenis_kejahatan, tahun, provinsi) tuples, None meaning no filter
+
+    Returns:
+        (name/count items, total_records) for each combination, in order
+    """
+    # Which of (jenis_kejahatan, tahun, provinsi) each combination filters on
+    masks = {tuple(value is not None for value in combination) for combination in combinations}
+
+    # One cube rollup summed into a per-kabupaten marginal for every filter pattern
+    # in use, so each combination is a single dict lookup; cells keep their order
+    marginals = {}
+    cells = crime_cube.rollup(('jenis_kejahatan', 'tahun', 'kode_provinsi', 'kabupaten', 'nama_kabupaten'))
+    for (jenis, year, kode_provinsi, kabupaten, nama_kabupaten), count in cells.items():
+        place = (kabupaten, nama_kabupaten)
+        for mask in masks:
+            key = (
+                mask,
+                jenis if mask[0] else None,
+                year if mask[1] else None,
+                kode_provinsi if mask[2] else None
+            )
+            marginal = marginals.get(key)
+            if marginal is None:
+                marginal = marginals[key] = {}
+            marginal[place] = marginal.get(place, 0) + count
+
+    results = []
+    for combination in combinations:
+        mask = tuple(value is not None for value in combination)
+        results.append(kabupaten_counts(marginals.get((mask, *combination), {}).items()))
+    return results
+
+@router.post("/cluster/batch", response_model=BatchAPIResponse)
+async def get_crime_clusters_batch(request: ClusterBatchRequest):
+    """
+    Cluster kabupaten for many filter combinations in one request.
+
+    **Body:**
+    - `combinations`: Explicit (`jenis_kejahatan`, `tahun`, `provinsi`) filters
+    - `grid`: Lists of values whose every combination is clustered; `null` means no filter
+    - `k`: Number of levels (default 3)
+    - `auto_k`: Pick the number of levels per combination instead of k
+    - `processes`: Cluster the combinations across a process pool
+
+    **Returns:**
+    One /api/cluster response per combination, in request order (combinations first,
+    then the grid); combinations without data have `total_records` 0 and no items.
+    """
+    try:
+        # 1. Expand the grid after the explicit combinations
+        combinations = [(c.jenis_kejahatan or None, c.tahun or None, c.provinsi or None) for c in request.combinations]
+        if request.grid:
+            combinations += [
+                (jenis_kejahatan or None, tahun or None, provinsi or None)
+                for jenis_kejahatan, tahun, provinsi in product(
+                    request.grid.jenis_kejahatan or [None],
+                    request.grid.tahun or [None],
+                    request.grid.provinsi or [None]
+                )
+            ]
+        if not combinations:
+            raise HTTPException(status_code=400, detail="Kombinasi filter kosong")
+        if len(combinations) > MAX_BATCH_COMBINATIONS:
+            raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_COMBINATIONS} kombinasi filter")
+
+        # 2. Reuse combinations already answered by /api/cluster
+        k = request.k
+        auto_k = request.auto_k
+        responses = [cluster_cache.get((*combination, k, auto_k)) for combination in combinations]
+        missing = [i for i, response in enumerate(responses) if response is None]
+
+        if missing:
+            data_version = get_data_version()
+            await crime_cube.aensure_built()
+
+            # 3. Count every missing combination from one rollup, then cluster them together
+            sliced = await run_in_threadpool(slice_cluster_data, [combinations[i] for i in missing])
+            clustered = await run_in_threadpool(
+                cluster_many, [grouped_data for grouped_data, _ in sliced], k, request.processes, auto_k
+            )
+
+            # 4. Prepare responses, caching the ones a single /api/cluster call would return
+            for i, (_, total_records), clustered_data in zip(missing, sliced, clustered):
+                jenis_kejahatan, tahun, provinsi = combinations[i]
+                levels = clustering_levels(clustered_data)
+                response = APIResponse(
+                    data=clustered_data,
+                    meta={
+                        "total_records": total_records,
+                        "k": len(levels),
+                        "levels": levels,
+                        "filters": {
+                            "jenis_kejahatan": jenis_kejahatan,
+                            "tahun": tahun,
+                            "provinsi": provinsi
+                        }
+                    }
+                )
+                if total_records:
+                    cluster_cache.set((*combinations[i], k, auto_k), response, version=data_version)
+                responses[i] = response
+
+        return BatchAPIResponse(
+            data=responses,
+            meta={"total_combinations": len(combinations), "k": k, "auto_k": auto_k}
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,11 +1,37 @@
-from fastapi import APIRouter, HTTPException
-from ..db.database import supabase
+from fastapi import APIRouter, HTTPException, Request, Response
+from ..services.master_service import master_dictionary
 from ..responses.master_response import ProvinsiResponse, JenisKejahatanResponse, TahunResponse
 
 router = APIRouter(prefix="/api/master", tags=["master-data"])
 
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the If-None-Match header of the request names the current ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+async def master_response(request: Request, field: str) -> Response:
+    """
+    Serve one master data list from the in-memory dictionary.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        field: Master data field of master_dictionary
+
+    Returns:
+        The precomputed JSON body, or 304 Not Modified when the client copy is current
+    """
+    await master_dictionary.aensure_built()
+    etag, body = master_dictionary.payload(field)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/jenis-kejahatan", response_model=JenisKejahatanResponse)
-async def get_jenis_kejahatan():
+async def get_jenis_kejahatan(request: Request):
     """
     Get list of unique crime types (jenis kejahatan) from putusan table.
     
@@ -16,29 +42,14 @@ async def get_jenis_kejahatan():
     - `/api/master/jenis-kejahatan` - Get all unique crime types
     """
     try:
-        # Get all jenis_kejahatan from putusan table
-        result = supabase.table('putusan').select('jenis_kejahatan').execute()
-        
-        if not result.data:
-            return []
-        
-        # Get unique crime types
-        crime_types = set()
-        for item in result.data:
-            crime_type = item.get('jenis_kejahatan')
-            if crime_type and crime_type.strip():
-                crime_types.add(crime_type.strip())
-        
-        # Convert to sorted list
-        return {
-            "data": sorted(list(crime_types))
-        }
+        # Serve unique crime types from the master dictionary
+        return await master_response(request, 'jenis_kejahatan')
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving crime types: {str(e)}")
 
 @router.get("/provinsi", response_model=ProvinsiResponse)
-async def get_provinsi():
+async def get_provinsi(request: Request):
     """
     Get list of unique provinces from putusan table.
     
@@ -49,38 +60,14 @@ async def get_provinsi():
     - `/api/master/provinsi` - Get all unique provinces
     """
     try:
-        # Get all cases with provinsi data
-        result = supabase.table('putusan').select('''
-            kabupaten(
-                provinsi(kode_provinsi, nama_provinsi)
-            )
-        ''').execute()
-        
-        if not result.data:
-            return []
-        
-        # Extract unique provinces with their codes
-        provinces_dict = {}
-        
-        for item in result.data:
-            kabupaten = item.get('kabupaten')
-            if kabupaten:
-              provinsi_info = kabupaten.get('provinsi')
-              if provinsi_info and provinsi_info.get('nama_provinsi') and provinsi_info.get('kode_provinsi'):
-                  kode = provinsi_info.get('kode_provinsi')
-                  nama = provinsi_info.get('nama_provinsi')
-                  provinces_dict[kode] = {'kode_provinsi': kode, 'nama_provinsi': nama}
-        
-        # Convert to sorted list by nama_provinsi
-        return {
-            "data": sorted(list(provinces_dict.values()), key=lambda x: x['nama_provinsi'])
-        }
+        # Serve unique provinces with their codes from the master dictionary
+        return await master_response(request, 'provinsi')
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving provinces: {str(e)}")
 
 @router.get("/tahun", response_model=TahunResponse)
-async def get_available_years():
+async def get_available_years(request: Request):
     """
     Get list of available years from putusan table.
     
@@ -91,22 +78,8 @@ async def get_available_years():
     - `/api/master/years` - Get all available years
     """
     try:
-        result = supabase.table('putusan').select('tahun').execute()
-        
-        if not result.data:
-            return []
-        
-        # Get unique years
-        years = set()
-        for item in result.data:
-            year = item.get('tahun')
-            if year:
-                years.add(year)
-        
-        # Convert to sorted list (descending)
-        return {
-            "data": sorted(list(years), reverse=True)
-        }
+        # Serve unique years from the master dictionary
+        return await master_response(request, 'tahun')
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving years: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from ..cores.cache import caches
+from ..cores.single_flight import flights
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Counters of the analytics result caches and request coalescing.
+
+    **Returns:**
+    - `caches`: per cache hits, misses, hit rate, size, TTL and current data version
+    - `flights`: per endpoint leader and coalesced calls, coalesce rate and computations in flight
+    """
+    return {
+        "caches": {name: cache.stats() for name, cache in list(caches.items())},
+        "flights": {name: flight.stats() for name, flight in list(flights.items())}
+    }
@@ -1,26 +1,95 @@
-import time
-from fastapi import APIRouter, Query, HTTPException
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
 from typing import Optional
-from ..services.scrap_service import get_all_links, process_putusan
-
-router = APIRouter(prefix="/api", tags=["cluster"])
-@router.get("/scrap")
-async def get_scrap_data(
-    base_url: str = Query(
-        "https://putusan3.mahkamahagung.go.id/direktori/index/pengadilan/pn-bandung/kategori/pidana-umum-1",
-        description="Base URL untuk scraping data putusan"
-    ),
+from ..cores.config import SCRAP_API_KEY
+from ..cores.pipeline import pipelines
+from ..services.job_service import job_queue, job_workers, JOB_STATUSES, JOB_DONE, JOB_FAILED
+from ..responses.scrap_response import ScrapJobRequest, ScrapJobResponse, ScrapJobListResponse
+
+async def require_api_key(x_api_key: Optional[str] = Header(None)):
+    """Allow only callers sending the SCRAP_API_KEY; without a configured key the routes are closed"""
+    if not SCRAP_API_KEY:
+        raise HTTPException(status_code=403, detail="Scraping API tidak diaktifkan")
+    if not x_api_key or not secrets.compare_digest(x_api_key.encode(), SCRAP_API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="API key tidak valid")
+
+router = APIRouter(prefix="/api", tags=["scraping"], dependencies=[Depends(require_api_key)])
+
+async def submit_job(request: ScrapJobRequest) -> dict:
+    """Queue a scraping job and wake the ingestion workers"""
+    if request.page_end is not None and request.page_end < request.page_start:
+        raise HTTPException(status_code=400, detail="page_end harus lebih besar atau sama dengan page_start")
+    job = await asyncio.to_thread(
+        job_queue.submit, request.base_url, request.page_start, request.page_end, request.incremental
+    )
+    job_workers.notify()
+    return job
+
+@router.post("/scrap/jobs", response_model=ScrapJobResponse, status_code=202)
+async def create_scrap_job(request: ScrapJobRequest):
+    """
+    Submit a scraping job to the persistent ingestion queue.
+
+    **Returns:**
+    The queued job. It is processed by the ingestion workers, never by the API worker.
+    """
+    try:
+        return await submit_job(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scrap/jobs", response_model=ScrapJobListResponse)
+async def list_scrap_jobs(
+    status: Optional[str] = Query(None, description=f"Filter status: {', '.join(JOB_STATUSES)}"),
+    limit: int = Query(50, ge=1, le=500, description="Jumlah job maksimal")
 ):
-    # 1. Ambil semua link putusan
-    links = get_all_links(base_url, 1, 5)
-    print(f"Total {len(links)} putusan ditemukan.")
+    """
+    List scraping jobs, newest first, with their progress.
+    """
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Status tidak valid, pilih salah satu: {', '.join(JOB_STATUSES)}")
+    try:
+        return {"data": await asyncio.to_thread(job_queue.list, status, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-    # 2. Proses setiap putusan
-    for idx, link in enumerate(links):
-        print(f"{idx + 1}. ", end="")
-        process_putusan(link)
+@router.get("/scrap/jobs/{job_id}", response_model=ScrapJobResponse)
+async def get_scrap_job(job_id: str):
+    """
+    Get one scraping job: status and pages, cases found, saved, skipped and failed.
+    """
+    try:
+        job = await asyncio.to_thread(job_queue.get, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    return job
 
-        # if result == None:
-        #   break
+@router.post("/scrap/jobs/{job_id}/cancel", response_model=ScrapJobResponse)
+async def cancel_scrap_job(job_id: str):
+    """
+    Cancel a scraping job. A queued job is cancelled immediately; a running job
+    stops before its next case and keeps the cases already saved.
+    """
+    try:
+        job = await asyncio.to_thread(job_queue.cancel, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan")
+    if job['status'] in (JOB_DONE, JOB_FAILED):
+        raise HTTPException(status_code=409, detail=f"Job sudah selesai dengan status {job['status']}")
+    return job
 
-        time.sleep(2)  # Delay untuk hindari rate limiting
\ No newline at end of file
+@router.get("/scrap/pipeline")
+async def get_scrap_pipeline():
+    """
+    Per-stage metrics of the document pipeline: workers, processed and failed items,
+    throughput, utilization and current/maximum queue depth, for the running
+    ingestion runs and the last finished one.
+    """
+    return {"data": [pipeline.stats() for pipeline in list(pipelines.values())]}
@@ -1,15 +1,27 @@
 from fastapi import APIRouter
-from typing import Optional
+from typing import Optional, Literal
 from fastapi import Query, HTTPException
-from ..responses.search_response import  SearchCasesResponse
+from fastapi.concurrency import run_in_threadpool
+from ..responses.search_response import  SearchCasesResponse, PartySearchResponse
 from ..services.search_service import search_cases
+from ..services.party_service import party_index
 
 router = APIRouter(prefix="/api", tags=["cluster"])
 @router.get("/search", response_model=SearchCasesResponse)
 async def search_court_cases(
     query: Optional[str] = Query(None, description="Text search query (searches in case titles, defendants, prosecutors, etc.)"),
+    jenis_kejahatan: Optional[str] = Query(None, description="Crime type filter"),
+    tahun: Optional[int] = Query(None, description="Case year filter"),
+    provinsi: Optional[str] = Query(None, description="Province code filter"),
+    kabupaten: Optional[str] = Query(None, description="District/city name filter"),
+    peradilan: Optional[str] = Query(None, description="Court name filter (lembaga_peradilan)"),
+    status_tahanan: Optional[str] = Query(None, description="Detention status filter"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Number of results to skip for pagination")
+    offset: int = Query(0, ge=0, description="Number of results to skip for pagination"),
+    count: Literal["exact", "planned", "estimated"] = Query("exact", description="Total count method: exact, planned (planner estimate) or estimated"),
+    sort: Literal["relevance", "tanggal"] = Query("relevance", description="Order text search results by relevance (BM25) or by verdict date"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from meta.next_cursor for keyset pagination by verdict date (offset is ignored)"),
+    facets: bool = Query(False, description="Return facet counts over all matching cases")
 ):
     """
     Search for court cases using plain text query and filters.
@@ -17,25 +29,78 @@ async def search_court_cases(
     **Text Search:**
     - Searches across case titles, case summaries, defendant names, prosecutor names, and case numbers
     - Use simple keywords or phrases (e.g., "korupsi bantuan sosial", "Budi Santoso")
+    - Results are ranked by relevance from the in-process search index; use `sort=tanggal` for newest first
+
+    **Pagination:**
+    - `offset`/`limit` page by position
+    - Date-ordered results return `meta.next_cursor`; pass it back as `cursor` to page in
+      constant time regardless of depth, stable while new cases are being ingested
     
     **Available Filters:**
-    - Crime type: Filter by specific crime categories
-    - Year: Filter by case year
-    - Location: Filter by province or district
-    - Court: Filter by specific court
-    - Status: Filter by case status
+    - Crime type: Filter by specific crime categories (`jenis_kejahatan`)
+    - Year: Filter by case year (`tahun`)
+    - Location: Filter by province code or district name (`provinsi`, `kabupaten`)
+    - Court: Filter by specific court (`peradilan`)
+    - Status: Filter by case status (`status_tahanan`)
+
+    **Facets:**
+    - `facets` holds counts per jenis_kejahatan, tahun, provinsi, lembaga_peradilan and
+      status_tahanan over all matching cases; request them with `facets=true`
     
     **Examples:**
     - `/api/search/cases?query=korupsi` - Search for corruption cases
     - `/api/search/cases?query=Budi Santoso` - Search for cases involving Budi Santoso
     - `/api/search/cases?jenis_kejahatan=Korupsi&tahun=2024` - Filter corruption cases from 2024
+    - `/api/search?query=narkotika&count=estimated` - Use a planner estimate for the total on broad queries
     """
     try:
-        result = search_cases(
+        result = await search_cases(
             query=query,
+            jenis_kejahatan=jenis_kejahatan,
+            tahun=tahun,
+            provinsi=provinsi,
+            kabupaten=kabupaten,
+            peradilan=peradilan,
+            status_tahanan=status_tahanan,
             limit=limit,
-            offset=offset
+            offset=offset,
+            count_method=count,
+            sort=sort,
+            cursor=cursor,
+            with_facets=facets
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search/parties", response_model=PartySearchResponse)
+async def search_parties(
+    name: str = Query(..., min_length=2, description="Name to look up; titles (S.H., Hj.) and spelling variants are tolerated"),
+    role: Optional[Literal["terdakwa", "hakim", "saksi", "penuntut_umum"]] = Query(None, description="Only match one party type"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of people")
+):
+    """
+    Find defendants, judges, witnesses and prosecutors by approximate name.
+
+    Names are compared by character trigram similarity, so "Budi Santoso SH" also finds
+    "BUDI SANTOSO, S.H." and "Budi Santosa". Each match lists the case numbers the
+    person appears in.
+
+    **Examples:**
+    - `/api/search/parties?name=budi santoso` - Anyone named like Budi Santoso
+    - `/api/search/parties?name=sutrisno&role=hakim` - Judges named like Sutrisno
+    """
+    try:
+        matches = await run_in_threadpool(party_index.search, name, role=role, limit=limit)
+        return {
+            "data": matches,
+            "meta": {
+                "total": len(matches),
+                "search_query": name,
+                "role": role
+            }
+        }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
 from datetime import datetime
-from ..db.database import supabase
+from ..cores.cache import ResultCache, get_data_version
+from ..cores.single_flight import SingleFlight
 from ..responses.trend_response import TrendResponse
-from ..services.trend_service import calculate_stats
+from ..services.cube_service import crime_cube
+from ..services.trend_service import calculate_stats, build_trend_frame, aggregate_trends, TREND_CUBE_GROUPS
 
 router = APIRouter(prefix="/api", tags=["trends"])
+trend_cache = ResultCache("trends")
+trend_flight = SingleFlight("trends")
 
 @router.get("/trends", response_model=TrendResponse)
+@trend_flight.coalesce
 async def get_crime_trends(
     start_year: Optional[int] = Query(None, description="Start year for trend analysis"),
     end_year: Optional[int] = Query(None, description="End year for trend analysis"),
@@ -36,225 +41,49 @@ async def get_crime_trends(
     - `/api/trends?provinsi=32` - Get trends for West Java province
     """
     try:
-        # 1. Get start year from database if not provided
+        # Serve repeated filter combinations from the result cache
+        cache_key = (start_year, end_year, provinsi)
+        cached = trend_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        data_version = get_data_version()
+
+        # Load the crime cube on first use without blocking other requests
+        await crime_cube.aensure_built()
+
+        # 1. Get start year from the crime cube if not provided
         if not start_year:
-            start_year_result = supabase.table('putusan').select('tahun').order('tahun', desc=False).limit(1).execute()
-            start_year = start_year_result.data[0]['tahun'] if start_year_result.data else 2000
+            start_year = crime_cube.min_year() or 2000
         
         # Set end year to current year if not provided
         if not end_year:
             end_year = datetime.now().year
 
-        # 2. Build query with filters
-        query = supabase.table('putusan').select('''
-            id,
-            tahun,
-            jenis_kejahatan,
-            waktu_kejadian(waktu_kejadian),
-            lokasi_kejadian(nama_lokasi),
-            kabupaten(
-                nama_kabupaten,
-                kode_provinsi,
-                provinsi(nama_provinsi)
-            )
-        ''')
-
-        # Apply year range filter
-        query = query.gte('tahun', start_year).lte('tahun', end_year)
-
-        # Apply province filter if provided
-        if provinsi:
-            query = query.eq('kabupaten.kode_provinsi', provinsi)
+        # 2. Roll the crime cube up to the trend dimensions within the year range
+        cells = crime_cube.rollup(TREND_CUBE_GROUPS, start_year=start_year, end_year=end_year)
 
-        # 3. Execute query
-        result = query.execute()
-        
-        if not result.data:
+        if not cells:
             raise HTTPException(status_code=404, detail="Data tidak ditemukan")
 
-        data = result.data
-
-        # 4. Generate labels for years
+        # 3. Generate labels for years
         labels = [str(year) for year in range(start_year, end_year + 1)]
 
-        # 5. Process datasets for crime types (jenis kejahatan)
-        jenis_kejahatan_list = list(set([
-            item['jenis_kejahatan'] for item in data 
-            if item.get('jenis_kejahatan')
-        ]))
-
-        jenis_kejahatan_datasets = []
-        for jenis in jenis_kejahatan_list:
-            trend_data = []
-            for year in labels:
-                count = len([
-                    item for item in data 
-                    if str(item['tahun']) == year and item['jenis_kejahatan'] == jenis
-                ])
-                trend_data.append(count)
-            
-            jenis_kejahatan_datasets.append({
-                "label": jenis,
-                "data": trend_data
-            })
-
-        # 6. Process datasets for time of occurrence (waktu kejadian)
-        waktu_kejadian_list = list(set([
-            item['waktu_kejadian']['waktu_kejadian'] for item in data 
-            if item.get('waktu_kejadian') and item['waktu_kejadian'].get('waktu_kejadian')
-        ]))
-
-        waktu_kejadian_datasets = []
-        for waktu in waktu_kejadian_list:
-            trend_data = []
-            for year in labels:
-                count = len([
-                    item for item in data 
-                    if (str(item['tahun']) == year and 
-                        item.get('waktu_kejadian') and 
-                        item['waktu_kejadian'].get('waktu_kejadian') == waktu)
-                ])
-                trend_data.append(count)
-            
-            waktu_kejadian_datasets.append({
-                "label": waktu,
-                "data": trend_data
-            })
-
-        # 7. Process datasets for location (lokasi kejadian)
-        lokasi_kejadian_list = list(set([
-            item['lokasi_kejadian']['nama_lokasi'] for item in data 
-            if item.get('lokasi_kejadian') and item['lokasi_kejadian'].get('nama_lokasi')
-        ]))
-
-        lokasi_kejadian_datasets = []
-        for lokasi in lokasi_kejadian_list:
-            trend_data = []
-            for year in labels:
-                count = len([
-                    item for item in data 
-                    if (str(item['tahun']) == year and 
-                        item.get('lokasi_kejadian') and 
-                        item['lokasi_kejadian'].get('nama_lokasi') == lokasi)
-                ])
-                trend_data.append(count)
-            
-            lokasi_kejadian_datasets.append({
-                "label": lokasi,
-                "data": trend_data
-            })
-
-        # 8. Process datasets for regions (wilayah)
-        wilayah_datasets = []
-        if provinsi:
-            # If province is selected, show kabupaten data within that province
-            kabupaten_list = list(set([
-                item['kabupaten']['nama_kabupaten'] for item in data 
-                if item.get('kabupaten') and item['kabupaten'].get('nama_kabupaten')
-            ]))
-            
-            for kab in kabupaten_list:
-                trend_data = []
-                for year in labels:
-                    count = len([
-                        item for item in data 
-                        if (str(item['tahun']) == year and 
-                            item.get('kabupaten') and 
-                            item['kabupaten'].get('nama_kabupaten') == kab)
-                    ])
-                    trend_data.append(count)
-                
-                wilayah_datasets.append({
-                    "label": kab,
-                    "data": trend_data
-                })
-        else:
-            # If no province selected, show province data
-            provinsi_list = list(set([
-                item['kabupaten']['provinsi']['nama_provinsi'] for item in data 
-                if (item.get('kabupaten') and 
-                    item['kabupaten'].get('provinsi') and 
-                    item['kabupaten']['provinsi'].get('nama_provinsi'))
-            ]))
-            
-            for prov in provinsi_list:
-                trend_data = []
-                for year in labels:
-                    count = len([
-                        item for item in data 
-                        if (str(item['tahun']) == year and 
-                            item.get('kabupaten') and 
-                            item['kabupaten'].get('provinsi') and 
-                            item['kabupaten']['provinsi'].get('nama_provinsi') == prov)
-                    ])
-                    trend_data.append(count)
-                
-                wilayah_datasets.append({
-                    "label": prov,
-                    "data": trend_data
-                })
-
-        # 9. Calculate statistics
-        total_records = len(data)
-
-        # Cases by type
-        cases_by_type = {}
-        for jenis in jenis_kejahatan_list:
-            cases_by_type[jenis] = len([
-                item for item in data if item['jenis_kejahatan'] == jenis
-            ])
-
-        # Cases by waktu
-        cases_by_waktu = {}
-        for waktu in waktu_kejadian_list:
-            cases_by_waktu[waktu] = len([
-                item for item in data 
-                if (item.get('waktu_kejadian') and 
-                    item['waktu_kejadian'].get('waktu_kejadian') == waktu)
-            ])
-
-        # Cases by lokasi
-        cases_by_lokasi = {}
-        for lokasi in lokasi_kejadian_list:
-            cases_by_lokasi[lokasi] = len([
-                item for item in data 
-                if (item.get('lokasi_kejadian') and 
-                    item['lokasi_kejadian'].get('nama_lokasi') == lokasi)
-            ])
+        # 4. Aggregate every dimension in one grouped pass
+        frame = build_trend_frame(cells, provinsi)
+        aggregates = aggregate_trends(frame, labels)
 
-        # Cases by wilayah
-        cases_by_wilayah = {}
-        if provinsi:
-            kabupaten_list = list(set([
-                item['kabupaten']['nama_kabupaten'] for item in data 
-                if item.get('kabupaten') and item['kabupaten'].get('nama_kabupaten')
-            ]))
-            for kab in kabupaten_list:
-                cases_by_wilayah[kab] = len([
-                    item for item in data 
-                    if (item.get('kabupaten') and 
-                        item['kabupaten'].get('nama_kabupaten') == kab)
-                ])
-        else:
-            provinsi_list = list(set([
-                item['kabupaten']['provinsi']['nama_provinsi'] for item in data 
-                if (item.get('kabupaten') and 
-                    item['kabupaten'].get('provinsi') and 
-                    item['kabupaten']['provinsi'].get('nama_provinsi'))
-            ]))
-            for prov in provinsi_list:
-                cases_by_wilayah[prov] = len([
-                    item for item in data 
-                    if (item.get('kabupaten') and 
-                        item['kabupaten'].get('provinsi') and 
-                        item['kabupaten']['provinsi'].get('nama_provinsi') == prov)
-                ])
+        jenis_kejahatan_datasets = aggregates["datasets"]["jenis_kejahatan"]
+        waktu_kejadian_datasets = aggregates["datasets"]["waktu_kejadian"]
+        lokasi_kejadian_datasets = aggregates["datasets"]["lokasi_kejadian"]
+        wilayah_datasets = aggregates["datasets"]["wilayah"]
 
-        # Cases by year
-        cases_by_year = []
-        for year in labels:
-            count = len([item for item in data if str(item['tahun']) == year])
-            cases_by_year.append(count)
+        # 5. Calculate statistics
+        total_records = aggregates["total_records"]
+        cases_by_type = aggregates["details"]["jenis_kejahatan"]
+        cases_by_waktu = aggregates["details"]["waktu_kejadian"]
+        cases_by_lokasi = aggregates["details"]["lokasi_kejadian"]
+        cases_by_wilayah = aggregates["details"]["wilayah"]
+        cases_by_year = aggregates["tahun"]
 
         # Year statistics
         year_stats = {
@@ -282,7 +111,7 @@ async def get_crime_trends(
         lokasi_stats = calculate_stats(cases_by_lokasi)
         wilayah_stats = calculate_stats(cases_by_wilayah)
 
-        # 10. Build response using Pydantic models structure
+        # 6. Build response using Pydantic models structure
         trend_response = TrendResponse(
             meta={
                 "total_records": total_records,
@@ -364,7 +193,10 @@ async def get_crime_trends(
             }
         )
 
+        trend_cache.set(cache_key, trend_response, version=data_version)
         return trend_response
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving trend data: {str(e)}")
\ No newline at end of file
@@ -5,12 +5,26 @@ Contains business logic and service layer functions.
 """
 
 from .cluster_service import group_and_count, get_nested_value, perform_clustering
-from .search_service import search_cases, get_putusan_detail
+from .search_service import search_cases, get_putusan_detail, get_putusan_details
+from .store_service import case_store
+from .dimension_service import dimensions
+from .master_service import master_dictionary
+from .cube_service import crime_cube
+from .party_service import party_index
+from .job_service import job_queue, job_workers
 
 __all__ = [
     "group_and_count", 
     "get_nested_value", 
     "perform_clustering",
     "search_cases",
-    "get_putusan_detail"
+    "get_putusan_detail",
+    "get_putusan_details",
+    "case_store",
+    "dimensions",
+    "master_dictionary",
+    "crime_cube",
+    "party_index",
+    "job_queue",
+    "job_workers"
 ]
\ No newline at end of file
@@ -1,70 +1,305 @@
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import MinMaxScaler
+import math
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..cores.config import CLUSTER_BACKEND, CLUSTER_PROCESS_WORKERS
+from ..cores.extract import compile_path, extract_column
+
+# Level names for each number of clusters, lowest average count first
+LEVEL_NAMES = {
+    1: ("Sedang",),
+    2: ("Rendah", "Tinggi"),
+    3: ("Rendah", "Sedang", "Tinggi"),
+    4: ("Sangat Rendah", "Rendah", "Tinggi", "Sangat Tinggi"),
+    5: ("Sangat Rendah", "Rendah", "Sedang", "Tinggi", "Sangat Tinggi"),
+}
+MAX_CLUSTERS = max(LEVEL_NAMES)
 
 def group_and_count(data: list, group_key: str) -> list[dict]:
     """Group data and count occurrences"""
     counts = {}
     
-    for item in data:
-        key = get_nested_value(item, group_key)
+    # The dotted path is compiled once, then the whole column is pulled out in bulk
+    for key in extract_column(data, group_key):
         if key is not None:  # Only count non-None keys
             counts[key] = counts.get(key, 0) + 1
     
-    return [{"name": k, "count": v} for k, v in counts.items() if k is not None]
+    return [{"name": k, "count": v} for k, v in counts.items()]
 
 def get_nested_value(obj: dict, path: str):
-    """Access nested dictionary keys"""
-    keys = path.split('.')
-    # print(f"Getting nested value for path: {path}, keys: {keys}")
-    # print(f"Initial obj: {obj}")
-    
-    for i, key in enumerate(keys):
-        # print(f"Step {i}: key='{key}', obj type: {type(obj)}, obj: {obj}")
-        if obj is None or not isinstance(obj, dict):
-            # print(f"Returning None at step {i} because obj is None or not dict")
-            return None
-        obj = obj.get(key, {})
-        # print(f"After get('{key}'): {obj}")
-    
-    result = obj if obj != {} else None
-    # print(f"Final result: {result}")
-    return result
+    """Access nested dictionary keys (None when any level is missing)"""
+    return compile_path(path)(obj)
+
+def kabupaten_counts(cells: Iterable[Tuple[tuple, int]]) -> Tuple[list[dict], int]:
+    """
+    Count cases per kabupaten from crime cube cells.
+
+    Args:
+        cells: (group, count) pairs whose group ends with (kabupaten, nama_kabupaten)
+
+    Returns:
+        Tuple of (name/count items, number of cases with a known kabupaten)
+    """
+    counts = {}
+    total_records = 0
+    for group, count in cells:
+        kabupaten, nama_kabupaten = group[-2:]
+        # Skip cases without a known kabupaten
+        if kabupaten is None:
+            continue
+        total_records += count
+        if nama_kabupaten is not None:
+            counts[nama_kabupaten] = counts.get(nama_kabupaten, 0) + count
+
+    return [{"name": k, "count": v} for k, v in counts.items()], total_records
+
+def optimal_1d_clusterings(values: Sequence[float], max_k: int) -> List[np.ndarray]:
+    """
+    Exact k-means (Jenks natural breaks) of one-dimensional values for every k up to max_k.
+
+    Clusters of sorted 1-D data are contiguous segments, so the partition with the
+    minimum within-cluster sum of squares is found by dynamic programming over the
+    sorted values. Each layer is solved by divide and conquer on the monotone split
+    point with prefix sums, in O(k * n log n) overall, and layer k extends layer k-1,
+    so all smaller k come for free.
+
+    Args:
+        values: Values to cluster
+        max_k: Largest number of clusters, at most the number of distinct values
+
+    Returns:
+        Cluster labels of each value for k = 1..max_k, 0 for the lowest segment
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    if max_k <= 1 or n <= 1:
+        return [np.zeros(n, dtype=int)]
+
+    order = np.argsort(x, kind='stable')
+    xs = x[order]
+    s1 = [0.0] + np.cumsum(xs).tolist()
+    s2 = [0.0] + np.cumsum(xs * xs).tolist()
+
+    def cost(i: int, j: int) -> float:
+        """Sum of squared deviations of the sorted values i..j-1"""
+        total = s1[j] - s1[i]
+        return s2[j] - s2[i] - total * total / (j - i)
+
+    # best[j]: minimum cost of the first j values split into the current number of clusters
+    best = [math.inf] + [cost(0, j) for j in range(1, n + 1)]
+    splits = []
+    for clusters in range(2, max_k + 1):
+        current = [math.inf] * (n + 1)
+        split = [0] * (n + 1)
+
+        # The optimal start of the last segment never decreases as j grows
+        stack = [(clusters, n, clusters - 1, n - 1)]
+        while stack:
+            lo, hi, opt_lo, opt_hi = stack.pop()
+            if lo > hi:
+                continue
+            mid = (lo + hi) // 2
+            best_cost, best_i = math.inf, opt_lo
+            for i in range(opt_lo, min(mid - 1, opt_hi) + 1):
+                candidate = best[i] + cost(i, mid)
+                if candidate < best_cost:
+                    best_cost, best_i = candidate, i
+            current[mid] = best_cost
+            split[mid] = best_i
+            stack.append((lo, mid - 1, opt_lo, best_i))
+            stack.append((mid + 1, hi, best_i, opt_hi))
+
+        best = current
+        splits.append(split)
+
+    # Walk the split points back from the last value, once per k
+    clusterings = []
+    for k in range(1, max_k + 1):
+        sorted_labels = np.zeros(n, dtype=int)
+        end = n
+        for cluster in range(k - 1, 0, -1):
+            start = splits[cluster - 1][end]
+            sorted_labels[start:end] = cluster
+            end = start
+
+        labels = np.empty(n, dtype=int)
+        labels[order] = sorted_labels
+        clusterings.append(labels)
+    return clusterings
+
+def optimal_1d_clusters(values: Sequence[float], k: int) -> np.ndarray:
+    """Exact k-means of one-dimensional values, see optimal_1d_clusterings"""
+    return optimal_1d_clusterings(values, k)[-1]
+
+def silhouette_1d(values: np.ndarray, labels: np.ndarray) -> float:
+    """
+    Mean silhouette of a clustering of one-dimensional values.
+
+    Distance sums to each cluster come from its sorted prefix sums and one
+    searchsorted per cluster, so the cost is O(n * k log n) instead of the
+    O(n^2) pairwise distance matrix.
 
-def perform_clustering(data: list[dict]) -> list[dict]:
-    """Perform KMeans clustering on crime data based on average count per cluster"""
+    Returns:
+        Score in [-1, 1]; points in singleton clusters count as 0
+    """
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return 0.0
+
+    # mean_distances[i, c]: mean |x_i - x_j| over the points j of cluster c (excluding i itself)
+    mean_distances = np.empty((len(values), len(clusters)))
+    sizes = np.empty(len(clusters))
+    for c, cluster in enumerate(clusters):
+        members = np.sort(values[labels == cluster])
+        prefix = np.concatenate(([0.0], np.cumsum(members)))
+        below = np.searchsorted(members, values)
+        total = values * below - prefix[below] + (prefix[-1] - prefix[below]) - values * (len(members) - below)
+        sizes[c] = len(members)
+        mean_distances[:, c] = total / len(members)
+
+    own = np.searchsorted(clusters, labels)
+    rows = np.arange(len(values))
+    own_sizes = sizes[own]
+    a = np.where(own_sizes > 1, mean_distances[rows, own] * own_sizes / np.maximum(own_sizes - 1, 1), 0.0)
+    mean_distances[rows, own] = np.inf
+    b = mean_distances.min(axis=1)
+
+    spread = np.maximum(a, b)
+    scores = np.where((own_sizes > 1) & (spread > 0), (b - a) / np.where(spread > 0, spread, 1), 0.0)
+    return float(scores.mean())
+
+def sklearn_kmeans_clusters(values: Sequence[float], k: int) -> np.ndarray:
+    """Heuristic k-means with scikit-learn (imported on first use)"""
+    from sklearn.cluster import KMeans
+
+    return KMeans(n_clusters=k, random_state=42).fit_predict(np.asarray(values, dtype=float).reshape(-1, 1))
+
+# Clustering backends: (values, k) -> cluster label of each value
+CLUSTERING_BACKENDS: Dict[str, Callable[[Sequence[float], int], np.ndarray]] = {
+    "optimal": optimal_1d_clusters,
+    "kmeans": sklearn_kmeans_clusters,
+}
+
+def choose_clustering(values: np.ndarray, max_k: int, cluster: Callable[[Sequence[float], int], np.ndarray]) -> np.ndarray:
+    """
+    Cluster with the k in 2..max_k that has the best mean silhouette (ties go to the smaller k).
+
+    Args:
+        values: Normalized counts
+        max_k: Largest k tried, at most the number of distinct values
+        cluster: Clustering backend; the exact backend computes every k in one pass
+
+    Returns:
+        Cluster labels of the chosen clustering
+    """
+    if cluster is optimal_1d_clusters:
+        candidates = optimal_1d_clusterings(values, max_k)[1:]
+    else:
+        candidates = [cluster(values, k) for k in range(2, max_k + 1)]
+
+    scores = [silhouette_1d(values, labels) for labels in candidates]
+    return candidates[int(np.argmax(scores))]
+
+def clustering_levels(data: list[dict]) -> list[str]:
+    """Level names used by clustered items, lowest first"""
+    used = {item['level'] for item in data}
+    return list(LEVEL_NAMES[len(used)]) if used else []
+
+def perform_clustering(data: list[dict], k: int = 3, backend: Optional[str] = None, auto_k: bool = False) -> list[dict]:
+    """
+    Cluster crime data into k levels by count.
+
+    Args:
+        data: Items with a count, updated in place
+        k: Number of levels (1 to MAX_CLUSTERS); fewer are used when there are
+            fewer distinct counts
+        backend: Name in CLUSTERING_BACKENDS, defaults to CLUSTER_BACKEND
+        auto_k: Ignore k and pick the number of levels (2 to MAX_CLUSTERS) with
+            the best silhouette score; see clustering_levels for the result
+
+    Returns:
+        The items with a level (Rendah/Sedang/Tinggi for k=3) and a min-max
+        normalized_count
+    """
     if not data:
         return []
+    if k not in LEVEL_NAMES:
+        raise ValueError(f"k harus antara 1 dan {MAX_CLUSTERS}")
+    cluster = CLUSTERING_BACKENDS.get(backend or CLUSTER_BACKEND)
+    if cluster is None:
+        raise ValueError(f"Backend clustering tidak dikenal: {backend or CLUSTER_BACKEND}")
 
-    # Prepare data for clustering
-    counts = [d['count'] for d in data]
-    scaler = MinMaxScaler()
-    normalized_counts = scaler.fit_transform([[x] for x in counts])
+    # Normalize counts to [0, 1] (all zeros when every count is equal)
+    counts = np.array([d['count'] for d in data], dtype=float)
+    spread = counts.max() - counts.min()
+    normalized_counts = (counts - counts.min()) / spread if spread else np.zeros(len(counts))
 
-    # Cluster into 3 levels
-    kmeans = KMeans(n_clusters=3, random_state=42)
-    clusters = kmeans.fit_predict(normalized_counts)
-
-    # print(f"Counts : {counts}")
+    # Never ask for more clusters than distinct counts
+    distinct = len(np.unique(counts))
+    k = min(MAX_CLUSTERS if auto_k else k, distinct)
+    if k <= 1:
+        clusters = np.zeros(len(counts), dtype=int)
+    elif auto_k:
+        clusters = choose_clustering(normalized_counts, k, cluster)
+    else:
+        clusters = cluster(normalized_counts, k)
 
     # Calculate average count for each cluster
-    cluster_avgs = {}
     cluster_items = {}
-    for i, cluster in enumerate(clusters):
-        cluster_items.setdefault(cluster, []).append(counts[i])
-    for cluster, items in cluster_items.items():
-        cluster_avgs[cluster] = sum(items) / len(items)
-
-    # Sort clusters by average count
-    sorted_clusters = sorted(cluster_avgs.items(), key=lambda x: x[1])
-    level_map = {
-        sorted_clusters[0][0]: "Rendah",
-        sorted_clusters[1][0]: "Sedang",
-        sorted_clusters[2][0]: "Tinggi"
-    }
+    for i, label in enumerate(clusters):
+        cluster_items.setdefault(label, []).append(counts[i])
+    cluster_avgs = {label: sum(items) / len(items) for label, items in cluster_items.items()}
+
+    # Name clusters by ascending average count
+    sorted_clusters = sorted(cluster_avgs, key=cluster_avgs.get)
+    names = LEVEL_NAMES[len(sorted_clusters)]
+    level_map = {label: names[rank] for rank, label in enumerate(sorted_clusters)}
 
     # Add cluster info to each item
     for i, item in enumerate(data):
         item['level'] = level_map[clusters[i]]
-        item['normalized_count'] = float(normalized_counts[i][0])
+        item['normalized_count'] = float(normalized_counts[i])
 
     return data
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def cluster_many(datasets: List[list[dict]], k: int = 3, processes: bool = False, auto_k: bool = False) -> List[list[dict]]:
+    """
+    Cluster several independent datasets.
+
+    Args:
+        datasets: Lists of name/count items, one per filter combination
+        k: Number of levels for every dataset
+        auto_k: Pick the number of levels per dataset, see perform_clustering
+        processes: Spread the datasets over a shared process pool instead of
+            clustering them one after another
+
+    Returns:
+        Clustered datasets in the same order
+    """
+    global _process_pool
+    if not processes or len(datasets) < 2 or CLUSTER_PROCESS_WORKERS < 2:
+        return [perform_clustering(data, k, auto_k=auto_k) for data in datasets]
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Workers come from a forkserver (or spawn), never a fork of the threaded API process
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _process_pool = ProcessPoolExecutor(max_workers=CLUSTER_PROCESS_WORKERS, mp_context=context)
+        pool = _process_pool
+    chunksize = max(1, len(datasets) // (CLUSTER_PROCESS_WORKERS * 4))
+    return list(pool.map(perform_clustering, datasets, repeat(k), repeat(None), repeat(auto_k), chunksize=chunksize))
+
+def shutdown_process_pool():
+    """Stop the clustering worker processes, if they were started"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,191 @@
+import time
+import random
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from ..cores.config import (
+    SCRAPER_CONCURRENCY, SCRAPER_RATE, SCRAPER_BURST,
+    SCRAPER_MAX_RETRIES, SCRAPER_BACKOFF, SCRAPER_TIMEOUT
+)
+
+# Responses worth retrying: throttled or a transient server error
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Upper bound of one backoff delay in seconds
+MAX_BACKOFF = 60.0
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `burst`.
+
+    Thread-safe; acquire() blocks until a token is available. pause() empties the
+    bucket for a while, e.g. when the host answered 429 with Retry-After.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting for it if needed.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                else:
+                    delay = self._paused_until - now
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds` seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Delay requested by a Retry-After header (seconds or HTTP date), if any"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class Crawler:
+    """
+    Concurrent HTTP fetcher for the scraper.
+
+    One pooled keep-alive session is shared by all worker threads. Every request
+    first takes a token from the bucket of its host, so the total request rate to a
+    host stays within `rate` per second whatever the concurrency. 429 and 5xx
+    responses and connection errors are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = SCRAPER_CONCURRENCY,
+        rate: float = SCRAPER_RATE,
+        burst: int = SCRAPER_BURST,
+        max_retries: int = SCRAPER_MAX_RETRIES,
+        backoff: float = SCRAPER_BACKOFF,
+        timeout: float = SCRAPER_TIMEOUT
+    ):
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Token bucket of one host, created on first use"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET a URL within the rate limit of its host, retrying transient failures.
+
+        Args:
+            url: URL to fetch
+            **kwargs: Extra arguments for requests.Session.get
+
+        Returns:
+            The final response; the caller still checks its status
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        bucket = self.bucket(urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            waited = bucket.acquire()
+            with self._lock:
+                self.requests += 1
+                self.throttled_seconds += waited
+
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+            # Full jitter, unless the server said how long to wait
+            delay = retry_after(response) if response is not None else None
+            if delay is None:
+                delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+            if response is not None and response.status_code == 429:
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Apply fn to every item on up to `concurrency` threads.
+
+        Returns:
+            Results in item order (exceptions propagate)
+        """
+        items = list(items)
+        if len(items) <= 1 or self.concurrency == 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items)), thread_name_prefix="crawler") as executor:
+            return list(executor.map(fn, items))
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, retry and rate-limit wait counters"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "hosts": len(self._buckets)
+            }
+
+crawler = Crawler()
@@ -0,0 +1,202 @@
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+from ..db.local_replica import replica
+from ..cores.cache import bump_data_version
+from .store_service import case_store
+from .dimension_service import dimensions
+
+# Cell key of the cube, in order
+CUBE_KEYS = ('tahun', 'jenis_kejahatan', 'waktu_kejadian_id', 'lokasi_kejadian_id', 'kode_kabupaten')
+
+class CrimeCube:
+    """
+    Precomputed case counts keyed by (tahun, jenis_kejahatan, waktu_kejadian_id,
+    lokasi_kejadian_id, kode_kabupaten).
+
+    The cells are counted from the shared case store and kept up to date by the
+    scraper through add(). Analytics endpoints answer from rollup(), which walks
+    the cells instead of the raw rows and resolves names from the dimension cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cells: Dict[tuple, int] = {}
+        self._built = False
+        self._async_build_lock = None
+
+    def build(self):
+        """Reload the case store, replacing current cells"""
+        case_store.load()
+        dimensions.ensure_loaded()
+        with self._lock:
+            self._cells = self._count_cells()
+            self._built = True
+
+    def ensure_built(self):
+        """Build the cube on first use"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build()
+
+    async def abuild(self):
+        """Build the cube with the async client, loading cases and dimensions concurrently"""
+        if replica.ready:
+            await asyncio.to_thread(self.build)
+            return
+
+        await asyncio.gather(case_store.aensure_loaded(), dimensions.aensure_loaded())
+
+        with self._lock:
+            self._cells = self._count_cells()
+            self._built = True
+
+    async def aensure_built(self):
+        """Build the cube on first use without blocking the event loop"""
+        if self._built:
+            return
+        if self._async_build_lock is None:
+            self._async_build_lock = asyncio.Lock()
+        async with self._async_build_lock:
+            if not self._built:
+                await self.abuild()
+
+    def warm_in_background(self) -> threading.Thread:
+        """Load the case store (shared with the master dictionary) and count the cells on a daemon thread"""
+        def warm():
+            try:
+                case_store.ensure_loaded()
+                dimensions.ensure_loaded()
+                with self._lock:
+                    if not self._built:
+                        self._cells = self._count_cells()
+                        self._built = True
+            except Exception as e:
+                print(f"Error warming crime cube: {e}")
+
+        thread = threading.Thread(target=warm, name="cube-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, putusan: dict):
+        """Count one newly inserted putusan row (append it to the case store first)"""
+        if not self._built:
+            return
+
+        key = self._cell_key(putusan)
+        if not dimensions.knows(key[2], key[3], key[4]):
+            dimensions.load()
+        with self._lock:
+            self._cells[key] = self._cells.get(key, 0) + 1
+
+    def min_year(self) -> Optional[int]:
+        """Earliest tahun present in the cube"""
+        self.ensure_built()
+        with self._lock:
+            keys = list(self._cells)
+        years = [key[0] for key in keys if key[0] is not None]
+        return min(years) if years else None
+
+    def rollup(
+        self,
+        group_by: Tuple[str, ...],
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        tahun: Optional[int] = None,
+        jenis_kejahatan: Optional[str] = None,
+        kode_provinsi: Optional[str] = None
+    ) -> Dict[tuple, int]:
+        """
+        Sum cell counts grouped by the given attributes.
+
+        Args:
+            group_by: Cube keys or resolved names (waktu_kejadian, nama_lokasi,
+                nama_kabupaten, kode_provinsi, nama_provinsi); 'kabupaten' is the
+                kode_kabupaten when it exists in the kabupaten table, else None
+            start_year: Lower tahun bound (inclusive)
+            end_year: Upper tahun bound (inclusive)
+            tahun: Exact tahun filter
+            jenis_kejahatan: Exact crime type filter
+            kode_provinsi: Only count cells whose kabupaten belongs to this province
+
+        Returns:
+            Dictionary mapping group tuples to case counts
+        """
+        self.ensure_built()
+
+        with self._lock:
+            cells = list(self._cells.items())
+
+        groups = {}
+        for key, count in cells:
+            year, jenis, _, _, kode_kabupaten = key
+            if start_year is not None and (year is None or year < start_year):
+                continue
+            if end_year is not None and (year is None or year > end_year):
+                continue
+            if tahun is not None and year != tahun:
+                continue
+            if jenis_kejahatan is not None and jenis != jenis_kejahatan:
+                continue
+            if kode_provinsi is not None:
+                kabupaten = dimensions.kabupaten(kode_kabupaten)
+                if not kabupaten or kabupaten['kode_provinsi'] != kode_provinsi:
+                    continue
+
+            group = tuple(self._attribute(key, name) for name in group_by)
+            groups[group] = groups.get(group, 0) + count
+
+        return groups
+
+    def refresh_cells(self):
+        """Recount the cells from the current case store"""
+        with self._lock:
+            self._cells = self._count_cells()
+
+    def _count_cells(self) -> Dict[tuple, int]:
+        """Cell counts from one vectorized group-by over the case store"""
+        cells = {}
+        for values, count in case_store.count_by(CUBE_KEYS).items():
+            key = self._cell_key(dict(zip(CUBE_KEYS, values)))
+            cells[key] = cells.get(key, 0) + count
+        return cells
+
+    def _attribute(self, key: tuple, name: str):
+        """Resolve a cube key or dimension name for one cell"""
+        if name in CUBE_KEYS:
+            return key[CUBE_KEYS.index(name)]
+        if name == 'waktu_kejadian':
+            return dimensions.waktu(key[2])
+        if name == 'nama_lokasi':
+            return dimensions.lokasi(key[3])
+        if name == 'kabupaten':
+            return key[4] if dimensions.kabupaten(key[4]) else None
+        return (dimensions.kabupaten(key[4]) or {}).get(name)
+
+    @staticmethod
+    def _cell_key(item: dict) -> tuple:
+        tahun = item.get('tahun')
+        kode_kabupaten = item.get('kode_kabupaten')
+        return (
+            int(tahun) if str(tahun).strip().isdigit() else None,
+            item.get('jenis_kejahatan') or None,
+            item.get('waktu_kejadian_id'),
+            item.get('lokasi_kejadian_id'),
+            str(kode_kabupaten) if kode_kabupaten else None
+        )
+
+crime_cube = CrimeCube()
+
+def _on_replica_change(changed):
+    """Recount the cube when a replica sync brought new cases or dimension rows"""
+    if not crime_cube._built:
+        return
+    if 'putusan' in changed:
+        # The case store reloads itself first (its listener is registered on import)
+        crime_cube.refresh_cells()
+    if changed.keys() & {'putusan', 'waktu_kejadian', 'lokasi_kejadian', 'kabupaten', 'provinsi'}:
+        # Dimension names were refreshed by their own listener, registered on import
+        bump_data_version()
+
+replica.add_listener(_on_replica_change)
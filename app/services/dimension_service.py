@@ -0,0 +1,152 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional
+from ..db.database import supabase, async_supabase
+from ..db.fetch import fetch_all, afetch_all
+from ..db.local_replica import replica
+
+# Kabupaten columns used to resolve names and provinces
+KABUPATEN_COLUMNS = '''
+    kode_kabupaten,
+    nama_kabupaten,
+    kode_provinsi,
+    provinsi(nama_provinsi)
+'''
+
+class DimensionCache:
+    """
+    In-memory copy of the small dimension tables: waktu_kejadian, lokasi_kejadian
+    and kabupaten with the name of its provinsi.
+
+    Fact queries select only the foreign keys (waktu_kejadian_id, lokasi_kejadian_id,
+    kode_kabupaten) and resolve names here instead of embedding the same dimension
+    rows into every result row.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._async_load_lock = None
+        self.loaded = False
+        self._waktu: Dict[str, str] = {}
+        self._lokasi: Dict[str, str] = {}
+        self._kabupaten: Dict[str, dict] = {}
+
+    def load(self):
+        """Load (or refresh) every dimension table, from the local replica when ready"""
+        if replica.ready:
+            waktu = replica.query('SELECT id, waktu_kejadian FROM waktu_kejadian')
+            lokasi = replica.query('SELECT id, nama_lokasi FROM lokasi_kejadian')
+            kabupaten = [
+                dict(row, provinsi={'nama_provinsi': row['nama_provinsi']})
+                for row in replica.query('''
+                    SELECT k.kode_kabupaten, k.nama_kabupaten, k.kode_provinsi, p.nama_provinsi
+                    FROM kabupaten k LEFT JOIN provinsi p ON p.kode_provinsi = k.kode_provinsi
+                ''')
+            ]
+        else:
+            waktu = fetch_all(lambda: supabase.table('waktu_kejadian').select('id, waktu_kejadian'))
+            lokasi = fetch_all(lambda: supabase.table('lokasi_kejadian').select('id, nama_lokasi'))
+            kabupaten = fetch_all(lambda: supabase.table('kabupaten').select(KABUPATEN_COLUMNS), order_by='kode_kabupaten')
+        self._set(waktu, lokasi, kabupaten)
+
+    async def aload(self):
+        """Load (or refresh) every dimension table concurrently without blocking the event loop"""
+        if replica.ready:
+            await asyncio.to_thread(self.load)
+            return
+
+        waktu, lokasi, kabupaten = await asyncio.gather(
+            afetch_all(lambda: async_supabase.table('waktu_kejadian').select('id, waktu_kejadian')),
+            afetch_all(lambda: async_supabase.table('lokasi_kejadian').select('id, nama_lokasi')),
+            afetch_all(lambda: async_supabase.table('kabupaten').select(KABUPATEN_COLUMNS), order_by='kode_kabupaten')
+        )
+        self._set(waktu, lokasi, kabupaten)
+
+    def ensure_loaded(self):
+        """Load the dimensions on first use"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load()
+
+    async def aensure_loaded(self):
+        """Load the dimensions on first use without blocking the event loop"""
+        if self.loaded:
+            return
+        if self._async_load_lock is None:
+            self._async_load_lock = asyncio.Lock()
+        async with self._async_load_lock:
+            if not self.loaded:
+                await self.aload()
+
+    def warm_in_background(self) -> threading.Thread:
+        """Load the dimensions on a daemon thread"""
+        def warm():
+            try:
+                self.ensure_loaded()
+            except Exception as e:
+                print(f"Error warming dimension cache: {e}")
+
+        thread = threading.Thread(target=warm, name="dimension-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def knows(self, waktu_kejadian_id=None, lokasi_kejadian_id=None, kode_kabupaten=None) -> bool:
+        """Whether every given foreign key exists in the cached dimensions"""
+        self.ensure_loaded()
+        return (not waktu_kejadian_id or waktu_kejadian_id in self._waktu) and \
+               (not lokasi_kejadian_id or lokasi_kejadian_id in self._lokasi) and \
+               (not kode_kabupaten or str(kode_kabupaten) in self._kabupaten)
+
+    def waktu(self, waktu_kejadian_id: Optional[str]) -> Optional[str]:
+        """Name of a waktu_kejadian, or None when unknown"""
+        self.ensure_loaded()
+        return self._waktu.get(waktu_kejadian_id)
+
+    def lokasi(self, lokasi_kejadian_id: Optional[str]) -> Optional[str]:
+        """Name of a lokasi_kejadian, or None when unknown"""
+        self.ensure_loaded()
+        return self._lokasi.get(lokasi_kejadian_id)
+
+    def kabupaten(self, kode_kabupaten: Optional[str]) -> Optional[dict]:
+        """Name, province code and province name of a kabupaten, or None when unknown"""
+        if not kode_kabupaten:
+            return None
+        self.ensure_loaded()
+        return self._kabupaten.get(str(kode_kabupaten))
+
+    def kabupaten_codes(self, kode_provinsi: Optional[str] = None, nama_kabupaten: Optional[str] = None) -> List[str]:
+        """Codes of the kabupaten in a province and/or with a given name"""
+        self.ensure_loaded()
+        return [
+            kode for kode, kabupaten in self._kabupaten.items()
+            if (not kode_provinsi or kabupaten['kode_provinsi'] == str(kode_provinsi))
+            and (not nama_kabupaten or kabupaten['nama_kabupaten'] == nama_kabupaten)
+        ]
+
+    def _set(self, waktu: list, lokasi: list, kabupaten: list):
+        """Index dimension rows by their key"""
+        waktu = {item['id']: item.get('waktu_kejadian') for item in waktu}
+        lokasi = {item['id']: item.get('nama_lokasi') for item in lokasi}
+        kabupaten = {
+            str(item['kode_kabupaten']): {
+                'nama_kabupaten': item.get('nama_kabupaten'),
+                'kode_provinsi': str(item['kode_provinsi']) if item.get('kode_provinsi') else None,
+                'nama_provinsi': (item.get('provinsi') or {}).get('nama_provinsi')
+            }
+            for item in kabupaten
+        }
+        with self._lock:
+            self._waktu = waktu
+            self._lokasi = lokasi
+            self._kabupaten = kabupaten
+            self.loaded = True
+
+dimensions = DimensionCache()
+
+def _on_replica_change(changed):
+    """Refresh the dimensions when a replica sync changed one of their tables"""
+    if dimensions.loaded and changed.keys() & {'waktu_kejadian', 'lokasi_kejadian', 'kabupaten', 'provinsi'}:
+        dimensions.load()
+
+replica.add_listener(_on_replica_change)
@@ -0,0 +1,53 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..cores.extract import compile_record
+from .dimension_service import dimensions
+
+# Facets returned with search results, in facet row order
+FACET_FIELDS = ('jenis_kejahatan', 'tahun', 'provinsi', 'lembaga_peradilan', 'status_tahanan')
+
+# Light select used to compute facets over a matching set in the database;
+# the province is resolved from kode_kabupaten through the dimension cache
+FACET_COLUMNS = 'jenis_kejahatan, tahun, lembaga_peradilan, status_tahanan, kode_kabupaten'
+
+def provinsi_facet(kode_kabupaten: Optional[str]) -> Optional[Tuple[str, Optional[str]]]:
+    """(kode_provinsi, nama_provinsi) facet value of a kabupaten, or None when unknown"""
+    kabupaten = dimensions.kabupaten(kode_kabupaten)
+    if not kabupaten or not kabupaten['kode_provinsi']:
+        return None
+    return (kabupaten['kode_provinsi'], kabupaten['nama_provinsi'])
+
+_facet_values = compile_record(('jenis_kejahatan', 'tahun', 'kode_kabupaten', 'lembaga_peradilan', 'status_tahanan'))
+
+def facet_row(item: dict) -> Tuple[Any, ...]:
+    """Facet values of one putusan row selected with FACET_COLUMNS"""
+    jenis, tahun, kode_kabupaten, lembaga, status = _facet_values(item)
+    return (jenis, tahun, provinsi_facet(kode_kabupaten), lembaga, status)
+
+def count_facets(rows: Iterable[Tuple[Any, ...]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Count every facet in a single pass over the matching set.
+
+    Args:
+        rows: Facet tuples in FACET_FIELDS order; provinsi is a (kode, nama) pair
+
+    Returns:
+        Dictionary mapping each facet to buckets of value, label and count, most frequent first
+    """
+    counters = [Counter() for _ in FACET_FIELDS]
+    for row in rows:
+        for counter, value in zip(counters, row):
+            if value is not None and value != '':
+                counter[value] += 1
+
+    facets = {}
+    for field, counter in zip(FACET_FIELDS, counters):
+        buckets = []
+        for value, count in counter.most_common():
+            label: Optional[str] = None
+            if field == 'provinsi':
+                value, label = value
+            buckets.append({"value": str(value), "label": label, "count": count})
+        facets[field] = buckets
+
+    return facets
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from ..cores.config import CRAWL_FRONTIER_PATH, CRAWL_MAX_ATTEMPTS
+
+# Per-URL states, in crawl order; stored and skipped URLs are never fetched again
+URL_DISCOVERED = 'discovered'
+URL_FETCHED = 'fetched'
+URL_EXTRACTED = 'extracted'
+URL_STORED = 'stored'
+URL_SKIPPED = 'skipped'
+URL_FAILED = 'failed'
+URL_FINISHED_STATES = (URL_STORED, URL_SKIPPED)
+
+# Host parameters per statement stay well below SQLite's limit
+CHUNK_SIZE = 500
+
+FRONTIER_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS crawls (
+        base_url TEXT PRIMARY KEY,
+        page_start INTEGER NOT NULL,
+        page_end INTEGER,
+        last_page INTEGER NOT NULL,
+        completed INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL
+    )''',
+    # The primary key keeps the seen-URL set sorted on disk
+    '''CREATE TABLE IF NOT EXISTS urls (
+        url TEXT PRIMARY KEY,
+        base_url TEXT,
+        page INTEGER,
+        state TEXT NOT NULL,
+        nomor_putusan TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT NOT NULL
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS urls_base_state ON urls (base_url, state)',
+)
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def _chunks(items: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+class CrawlFrontier:
+    """
+    Durable crawl progress of the scraper in a local SQLite file.
+
+    For every court base_url it keeps the last listing page whose links were
+    recorded, and for every case URL ever seen its state
+    (discovered -> fetched -> extracted -> stored, or skipped/failed). A crawl
+    that was interrupted resumes after its last listed page with the URLs that
+    were not finished; finished URLs are skipped without any network request.
+    """
+
+    def __init__(self, path: str = CRAWL_FRONTIER_PATH, max_attempts: int = CRAWL_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._schema_lock = threading.Lock()
+        self._opened = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new connection, creating the schema on first use"""
+        if not self._opened:
+            with self._schema_lock:
+                if not self._opened:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    connection = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        connection.execute('PRAGMA journal_mode=WAL')
+                        for statement in FRONTIER_SCHEMA:
+                            connection.execute(statement)
+                        connection.commit()
+                    finally:
+                        connection.close()
+                    self._opened = True
+        return sqlite3.connect(self.path, timeout=30)
+
+    def begin(self, base_url: str, page_start: int = 1, page_end: Optional[int] = None) -> int:
+        """
+        Start or resume the crawl of a base_url.
+
+        An unfinished crawl over the same page range resumes after its last
+        listed page; otherwise a new crawl starts at page_start.
+
+        Returns:
+            First listing page still to fetch
+        """
+        connection = self.connect()
+        try:
+            with connection:
+                row = connection.execute(
+                    'SELECT page_start, page_end, last_page, completed FROM crawls WHERE base_url = ?', (base_url,)
+                ).fetchone()
+                if row and not row[3] and row[0] == page_start and row[1] == page_end:
+                    return row[2] + 1
+                connection.execute(
+                    'INSERT OR REPLACE INTO crawls (base_url, page_start, page_end, last_page, completed, updated_at) '
+                    'VALUES (?, ?, ?, ?, 0, ?)',
+                    (base_url, page_start, page_end, page_start - 1, _now())
+                )
+                return page_start
+        finally:
+            connection.close()
+
+    def record_page(self, base_url: str, page: int, links: Dict[str, Optional[str]]):
+        """Add the case links of one listing page ({url: nomor_putusan}) and mark the page as listed"""
+        now = _now()
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO urls (url, base_url, page, state, nomor_putusan, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(link, base_url, page, URL_DISCOVERED, nomor, now) for link, nomor in links.items()]
+                )
+                connection.execute(
+                    'UPDATE crawls SET last_page = MAX(last_page, ?), updated_at = ? WHERE base_url = ?',
+                    (page, now, base_url)
+                )
+        finally:
+            connection.close()
+
+    def complete(self, base_url: str):
+        """Mark the crawl of a base_url finished; the next crawl starts from its first page"""
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(
+                    'UPDATE crawls SET completed = 1, updated_at = ? WHERE base_url = ?', (_now(), base_url)
+                )
+        finally:
+            connection.close()
+
+    def pending(self, base_url: str) -> List[str]:
+        """URLs of a base_url that were listed but not finished, and not given up on, in listing order"""
+        connection = self.connect()
+        try:
+            rows = connection.execute(
+                f'SELECT url FROM urls WHERE base_url = ? AND state NOT IN ({", ".join("?" * len(URL_FINISHED_STATES))}) '
+                'AND attempts < ? ORDER BY page, url',
+                (base_url, *URL_FINISHED_STATES, self.max_attempts)
+            ).fetchall()
+        finally:
+            connection.close()
+        return [row[0] for row in rows]
+
+    def finished(self, urls: Iterable[str]) -> Set[str]:
+        """The given URLs that are already stored or skipped"""
+        urls = list(urls)
+        found = set()
+        connection = self.connect()
+        try:
+            for chunk in _chunks(urls):
+                rows = connection.execute(
+                    f'SELECT url FROM urls WHERE url IN ({", ".join("?" * len(chunk))}) '
+                    f'AND state IN ({", ".join("?" * len(URL_FINISHED_STATES))})',
+                    (*chunk, *URL_FINISHED_STATES)
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        finally:
+            connection.close()
+        return found
+
+    def mark(self, url: str, state: str, nomor_putusan: Optional[str] = None):
+        """Record the state a case URL reached; failures count towards max_attempts"""
+        connection = self.connect()
+        try:
+            with connection:
+                connection.execute(
+                    'INSERT INTO urls (url, state, nomor_putusan, attempts, updated_at) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (url) DO UPDATE SET state = excluded.state, '
+                    'nomor_putusan = COALESCE(excluded.nomor_putusan, urls.nomor_putusan), '
+                    'attempts = urls.attempts + excluded.attempts, updated_at = excluded.updated_at',
+                    (url, state, nomor_putusan, int(state == URL_FAILED), _now())
+                )
+        finally:
+            connection.close()
+
+    def state(self, url: str) -> Optional[str]:
+        """Current state of a case URL, or None if it was never seen"""
+        connection = self.connect()
+        try:
+            row = connection.execute('SELECT state FROM urls WHERE url = ?', (url,)).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+
+crawl_frontier = CrawlFrontier()
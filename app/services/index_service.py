@@ -0,0 +1,446 @@
+import os
+import re
+import copy
+import math
+import heapq
+import time
+import pickle
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..cores.config import SEARCH_INDEX_PATH, SEARCH_INDEX_SAVE_INTERVAL
+from ..db.database import supabase
+from ..db.fetch import iter_pages
+from ..db.local_replica import sync_since
+from .dimension_service import dimensions
+from .facet_service import count_facets, provinsi_facet
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Indexed putusan columns and how many times their tokens count
+INDEXED_FIELDS = {
+    'judul_putusan': 2,
+    'nomor_putusan': 2,
+    'jenis_kejahatan': 2,
+    'lembaga_peradilan': 1,
+    'hasil_putusan': 1,
+}
+PARTY_WEIGHT = 2
+
+PUTUSAN_COLUMNS = 'id, updated_at, tanggal_dibacakan, tahun, status_tahanan, kode_kabupaten, ' + ', '.join(INDEXED_FIELDS)
+PARTY_COLUMNS = '''
+    nomor_putusan,
+    terdakwa(nama_lengkap),
+    hakim(nama_hakim),
+    saksi(nama_saksi),
+    penuntut_umum(nama_penuntut)
+'''
+
+# Attributes making up the persisted index state; bump INDEX_VERSION when they change
+INDEX_VERSION = 2
+INDEX_STATE = ('_postings', '_doc_terms', '_doc_ids', '_tanggal', '_facets', '_lengths', '_slots', '_total_length', '_updated_at')
+
+STOPWORDS = {
+    'yang', 'dan', 'di', 'ke', 'dari', 'dengan', 'untuk', 'pada', 'dalam', 'atas',
+    'oleh', 'atau', 'ini', 'itu', 'sebagai', 'adalah', 'tersebut', 'telah', 'tidak',
+    'akan', 'bahwa', 'karena', 'secara', 'bin', 'binti', 'als', 'alias', 'nomor', 'no',
+}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+_PARTICLES = ('lah', 'kah', 'tah', 'pun')
+_POSSESSIVES = ('nya', 'ku', 'mu')
+_SUFFIXES = ('kan', 'an')
+_PREFIXES = ('meng', 'meny', 'mem', 'men', 'me', 'peng', 'peny', 'pem', 'pen', 'pe', 'ber', 'ter', 'di', 'ke', 'se')
+
+def stem(word: str) -> str:
+    """Light Indonesian stemmer: strip particles, possessives, one suffix and one prefix"""
+    if word.isdigit() or len(word) <= 4:
+        return word
+
+    for group in (_PARTICLES, _POSSESSIVES, _SUFFIXES):
+        for suffix in group:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+                word = word[:-len(suffix)]
+                break
+
+    for prefix in _PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 4:
+            return word[len(prefix):]
+
+    return word
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem"""
+    if not text:
+        return []
+    return [
+        stem(token) for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+def party_names(row: dict) -> List[str]:
+    """Party names of one putusan_detail row with embedded party relations"""
+    names = []
+    for table, column in (('terdakwa', 'nama_lengkap'), ('hakim', 'nama_hakim'),
+                          ('saksi', 'nama_saksi'), ('penuntut_umum', 'nama_penuntut')):
+        related = row.get(table)
+        for item in related if isinstance(related, list) else [related]:
+            if item and item.get(column):
+                names.append(item[column])
+    return names
+
+class SearchIndex:
+    """
+    In-process inverted index over putusan text and party names, ranked with BM25.
+
+    The index is built from the putusan and putusan_detail tables, pickled to
+    SEARCH_INDEX_PATH and caught up on load from the updated_at column. New
+    cases are added incrementally by the scraper through add_document(), which
+    saves at most every save_interval seconds; flush() writes the rest.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_PATH, save_interval: float = SEARCH_INDEX_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self.ready = False
+        self._lock = threading.RLock()
+        self._building = False
+        self._pending: List[Tuple[dict, List[str]]] = []
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+        # Terms whose postings were copied since the snapshot of a running save, None when not saving
+        self._copied_terms: Optional[set] = None
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: List[Optional[Counter]] = []
+        self._doc_ids: List[Optional[str]] = []
+        self._tanggal: List[str] = []
+        self._facets: List[tuple] = []
+        self._lengths: List[int] = []
+        self._slots: Dict[str, int] = {}
+        self._total_length = 0
+        self._updated_at: Optional[str] = None
+
+    def __len__(self):
+        return len(self._slots)
+
+    def warm(self):
+        """Load the index from disk and catch up, or build it from scratch"""
+        try:
+            if self.load():
+                self.sync()
+            else:
+                self.build()
+        except Exception as e:
+            print(f"Error warming search index: {e}")
+
+    def warm_in_background(self) -> threading.Thread:
+        """Warm the index on a daemon thread; searches fall back until it is ready"""
+        thread = threading.Thread(target=self.warm, name="search-index-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def build(self):
+        """Index every putusan and its parties, replacing the current index"""
+        with self._lock:
+            self._building = True
+            self._pending = []
+
+        try:
+            names_by_nomor = {}
+            for page in iter_pages(lambda: supabase.table('putusan_detail').select(PARTY_COLUMNS)):
+                for row in page:
+                    names_by_nomor.setdefault(row.get('nomor_putusan'), []).extend(party_names(row))
+
+            fresh = SearchIndex(self.path)
+            for page in iter_pages(lambda: supabase.table('putusan').select(PUTUSAN_COLUMNS)):
+                for putusan in page:
+                    fresh._index(putusan, names_by_nomor.get(putusan.get('nomor_putusan'), []))
+
+            with self._lock:
+                self._restore(fresh._state())
+                pending, self._pending = self._pending, []
+                for putusan, names in pending:
+                    self._index(putusan, names)
+                self.ready = True
+        finally:
+            with self._lock:
+                self._building = False
+
+        self.save()
+
+    def sync(self):
+        """Index putusan rows updated since the last indexed updated_at, minus the sync lookback window"""
+        if self._updated_at is None:
+            return self.build()
+
+        # Re-indexing a row replaces it, so the lookback window can safely be read again
+        since = sync_since(self._updated_at)
+        rows = []
+        for page in iter_pages(lambda: supabase.table('putusan').select(PUTUSAN_COLUMNS).gte('updated_at', since)):
+            rows.extend(page)
+        if not rows:
+            return
+
+        names_by_nomor = {}
+        nomor_list = [row['nomor_putusan'] for row in rows if row.get('nomor_putusan')]
+        for start in range(0, len(nomor_list), 200):
+            chunk = nomor_list[start:start + 200]
+            for page in iter_pages(lambda: supabase.table('putusan_detail').select(PARTY_COLUMNS).in_('nomor_putusan', chunk)):
+                for row in page:
+                    names_by_nomor.setdefault(row.get('nomor_putusan'), []).extend(party_names(row))
+
+        with self._lock:
+            for putusan in rows:
+                self._index(putusan, names_by_nomor.get(putusan.get('nomor_putusan'), []))
+        self.save()
+
+    def add_document(self, putusan: dict, names: Iterable[str] = ()):
+        """
+        Index one newly ingested putusan.
+
+        Args:
+            putusan: Inserted putusan row
+            names: Names of the parties involved in the case
+        """
+        names = [name for name in names if name]
+        with self._lock:
+            if self._building:
+                self._pending.append((putusan, names))
+            if not self.ready:
+                return
+            self._index(putusan, names)
+            self._dirty = True
+            due = time.monotonic() - self._saved_at >= self.save_interval
+        if due:
+            self.save()
+
+    def flush(self):
+        """Save the index if documents were added since the last save (end of a job, shutdown)"""
+        if self._dirty:
+            self.save()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 50,
+        offset: int = 0,
+        filters: Optional[Dict[str, Any]] = None,
+        with_facets: bool = False
+    ) -> Tuple[int, List[str], Optional[Dict[str, List[dict]]]]:
+        """
+        Rank cases for a text query with BM25.
+
+        Args:
+            query: Plain text search query
+            limit: Maximum number of ids to return
+            offset: Number of ranked ids to skip
+            filters: Search filters (same keys as search_cases)
+            with_facets: Also count facets over all matching cases
+
+        Returns:
+            Tuple of (number of matching cases, putusan ids of the requested page, facets or None)
+        """
+        terms = set(tokenize(query))
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        with self._lock:
+            doc_count = len(self._slots)
+            if not terms or not doc_count:
+                return 0, [], count_facets([]) if with_facets else None
+            average_length = self._total_length / doc_count
+
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for slot, tf in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[slot] / average_length)
+                    scores[slot] = scores.get(slot, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            if filters:
+                scores = {slot: score for slot, score in scores.items() if self._matches(slot, filters)}
+            facets = count_facets(self._facet_row(slot) for slot in scores) if with_facets else None
+
+            # Ties (e.g. single-term queries on equal-length documents) go to the newest decision
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], self._tanggal[item[0]]))
+            return len(scores), [self._doc_ids[slot] for slot, _ in top[offset:]], facets
+
+    def facets(self, query: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, List[dict]]:
+        """
+        Count facets over every indexed case matching a text query and filters, without ranking.
+
+        Args:
+            query: Plain text search query (cases containing any of its terms); None for all cases
+            filters: Search filters (same keys as search_cases)
+
+        Returns:
+            Facets in the format of count_facets
+        """
+        terms = set(tokenize(query))
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        with self._lock:
+            if terms:
+                slots = set()
+                for term in terms:
+                    slots.update(self._postings.get(term, ()))
+            else:
+                slots = range(len(self._doc_ids))
+            if filters:
+                slots = [slot for slot in slots if self._matches(slot, filters)]
+            return count_facets(self._facet_row(slot) for slot in slots)
+
+    def load(self) -> bool:
+        """Load a previously saved index, returns False when there is none"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"Error loading search index from {self.path}: {e}")
+            return False
+
+        if not isinstance(state, dict) or state.get('version') != INDEX_VERSION:
+            return False
+
+        with self._lock:
+            self._restore(state)
+            self.ready = True
+        return True
+
+    def save(self):
+        """
+        Atomically write the index to disk.
+
+        Only a shallow snapshot is taken under the lock; it is pickled outside it,
+        so searches and new documents are not held up while the file is written.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                state = self._state()
+                self._copied_terms = set()
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Error saving search index to {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
+            finally:
+                with self._lock:
+                    self._copied_terms = None
+
+    def _state(self) -> dict:
+        """Shallow copy of the index; the postings it shares are copied before _index changes them"""
+        state = {key: copy.copy(getattr(self, key)) for key in INDEX_STATE}
+        state['version'] = INDEX_VERSION
+        return state
+
+    def _writable_postings(self, term: str) -> Optional[Dict[int, int]]:
+        """Postings of term, copied first when a running save still shares them; caller holds the lock"""
+        postings = self._postings.get(term)
+        if postings is not None and self._copied_terms is not None and term not in self._copied_terms:
+            self._copied_terms.add(term)
+            postings = self._postings[term] = dict(postings)
+        return postings
+
+    def _restore(self, state: dict):
+        for key in INDEX_STATE:
+            setattr(self, key, state[key])
+
+    def _matches(self, slot: int, filters: Dict[str, Any]) -> bool:
+        """Check one document against search filters (same keys as search_cases)"""
+        jenis, tahun, lembaga, status, kode_kabupaten = self._facets[slot]
+        if filters.get('jenis_kejahatan') and jenis != filters['jenis_kejahatan']:
+            return False
+        if filters.get('tahun') and str(tahun) != str(filters['tahun']):
+            return False
+        if filters.get('peradilan') and lembaga != filters['peradilan']:
+            return False
+        if filters.get('status_tahanan') and status != filters['status_tahanan']:
+            return False
+        if filters.get('provinsi') or filters.get('kabupaten'):
+            kabupaten = dimensions.kabupaten(kode_kabupaten)
+            if not kabupaten:
+                return False
+            if filters.get('provinsi') and kabupaten['kode_provinsi'] != str(filters['provinsi']):
+                return False
+            if filters.get('kabupaten') and kabupaten['nama_kabupaten'] != filters['kabupaten']:
+                return False
+        return True
+
+    def _facet_row(self, slot: int) -> tuple:
+        """Facet tuple of one document in FACET_FIELDS order"""
+        jenis, tahun, lembaga, status, kode_kabupaten = self._facets[slot]
+        return (jenis, tahun, provinsi_facet(kode_kabupaten), lembaga, status)
+
+    def _index(self, putusan: dict, names: Iterable[str]):
+        """Add or replace one document; caller holds the lock"""
+        doc_id = putusan.get('id')
+        if not doc_id:
+            return
+
+        terms = Counter()
+        for field, weight in INDEXED_FIELDS.items():
+            for token in tokenize(putusan.get(field)):
+                terms[token] += weight
+        for name in names:
+            for token in tokenize(name):
+                terms[token] += PARTY_WEIGHT
+
+        slot = self._slots.get(doc_id)
+        if slot is None:
+            slot = len(self._doc_ids)
+            self._slots[doc_id] = slot
+            self._doc_ids.append(doc_id)
+            self._doc_terms.append(None)
+            self._tanggal.append('')
+            self._facets.append(())
+            self._lengths.append(0)
+        else:
+            for term in self._doc_terms[slot] or ():
+                postings = self._writable_postings(term)
+                if postings is not None:
+                    postings.pop(slot, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths[slot]
+
+        for term, tf in terms.items():
+            postings = self._writable_postings(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+            postings[slot] = tf
+        self._doc_terms[slot] = terms
+        self._tanggal[slot] = str(putusan.get('tanggal_dibacakan') or '')
+        self._facets[slot] = (
+            putusan.get('jenis_kejahatan'),
+            putusan.get('tahun'),
+            putusan.get('lembaga_peradilan'),
+            putusan.get('status_tahanan'),
+            str(putusan['kode_kabupaten']) if putusan.get('kode_kabupaten') else None
+        )
+        self._lengths[slot] = sum(terms.values())
+        self._total_length += self._lengths[slot]
+
+        updated_at = putusan.get('updated_at')
+        if updated_at and (self._updated_at is None or str(updated_at) > self._updated_at):
+            self._updated_at = str(updated_at)
+
+search_index = SearchIndex()
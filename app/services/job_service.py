@@ -0,0 +1,402 @@
+import os
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from ..cores.config import JOB_QUEUE_PATH, INGEST_WORKERS, JOB_HEARTBEAT_INTERVAL, JOB_STALE_AFTER
+
+# Job states; queued and running jobs are active
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# Progress counters of a job
+JOB_COUNTERS = ('pages', 'cases_found', 'cases_saved', 'cases_skipped', 'cases_failed')
+
+JOB_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    base_url TEXT NOT NULL,
+    page_start INTEGER NOT NULL,
+    page_end INTEGER,
+    incremental INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    pages INTEGER NOT NULL DEFAULT 0,
+    cases_found INTEGER NOT NULL DEFAULT 0,
+    cases_saved INTEGER NOT NULL DEFAULT 0,
+    cases_skipped INTEGER NOT NULL DEFAULT 0,
+    cases_failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    owner TEXT,
+    heartbeat_at TEXT
+)
+'''
+JOB_INDEX = 'CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)'
+
+# Columns added after the first release, created on open for older queue files
+JOB_MIGRATIONS = {
+    'incremental': 'ALTER TABLE jobs ADD COLUMN incremental INTEGER NOT NULL DEFAULT 0',
+    'owner': 'ALTER TABLE jobs ADD COLUMN owner TEXT',
+    'heartbeat_at': 'ALTER TABLE jobs ADD COLUMN heartbeat_at TEXT',
+}
+
+def _now(seconds_ago: float = 0) -> str:
+    return (datetime.now() - timedelta(seconds=seconds_ago)).strftime('%Y-%m-%d %H:%M:%S')
+
+class JobQueue:
+    """
+    Persistent queue of scraping jobs in a local SQLite file.
+
+    A claimed job records its owner and a heartbeat refreshed while it runs.
+    Jobs survive restarts: running jobs whose heartbeat is older than stale_after
+    seconds were left by a dead worker and are queued again (or marked cancelled
+    if cancellation was requested) on open and before every claim, while jobs of
+    other live workers sharing the file are left alone.
+    Every call opens its own connection, so the queue is safe to share between
+    the API and the worker threads.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, stale_after: float = JOB_STALE_AFTER):
+        self.path = path
+        self.stale_after = stale_after
+        self._claim_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._opened = False
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a new connection, creating the schema on first use"""
+        if not self._opened:
+            with self._schema_lock:
+                if not self._opened:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    connection = self._connect()
+                    try:
+                        connection.execute('PRAGMA journal_mode=WAL')
+                        connection.execute(JOB_SCHEMA)
+                        connection.execute(JOB_INDEX)
+                        columns = {row['name'] for row in connection.execute('PRAGMA table_info(jobs)')}
+                        for column, statement in JOB_MIGRATIONS.items():
+                            if column not in columns:
+                                connection.execute(statement)
+                        self._recover(connection)
+                    finally:
+                        connection.close()
+                    self._opened = True
+        return self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def submit(
+        self, base_url: str, page_start: int = 1, page_end: Optional[int] = None, incremental: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Queue a scraping job.
+
+        Args:
+            base_url: Listing URL of the court directory
+            page_start: First listing page
+            page_end: Last listing page (None crawls until the last page)
+            incremental: Stop at the first listing page with only known decisions
+
+        Returns:
+            The queued job
+        """
+        job_id = str(uuid.uuid4())
+        connection = self.connect()
+        try:
+            connection.execute(
+                'INSERT INTO jobs (id, base_url, page_start, page_end, incremental, status, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, base_url, page_start, page_end, int(incremental), JOB_QUEUED, _now())
+            )
+        finally:
+            connection.close()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """One job by id, or None"""
+        connection = self.connect()
+        try:
+            row = connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            connection.close()
+        return self._job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest jobs first, optionally only those in one status"""
+        sql = 'SELECT * FROM jobs'
+        params: list = []
+        if status:
+            sql += ' WHERE status = ?'
+            params.append(status)
+        sql += ' ORDER BY created_at DESC, rowid DESC LIMIT ?'
+        params.append(limit)
+        connection = self.connect()
+        try:
+            rows = connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job. Queued jobs are cancelled at once; running jobs stop
+        before their next case.
+
+        Returns:
+            The updated job, or None when it does not exist
+        """
+        connection = self.connect()
+        try:
+            connection.execute(
+                'UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ? AND status = ?',
+                (JOB_CANCELLED, _now(), job_id, JOB_QUEUED)
+            )
+            connection.execute(
+                'UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?',
+                (job_id, JOB_RUNNING)
+            )
+        finally:
+            connection.close()
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation of a job was requested"""
+        connection = self.connect()
+        try:
+            row = connection.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            connection.close()
+        return bool(row and row['cancel_requested'])
+
+    def claim(self, owner: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark the oldest queued job running for owner and return it, or None when
+        the queue is empty. Stale running jobs are queued again first.
+        """
+        with self._claim_lock:
+            connection = self.connect()
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                self._recover(connection)
+                row = connection.execute(
+                    'SELECT id FROM jobs WHERE status = ? ORDER BY created_at, rowid LIMIT 1', (JOB_QUEUED,)
+                ).fetchone()
+                if row:
+                    now = _now()
+                    connection.execute(
+                        'UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ?',
+                        (JOB_RUNNING, now, owner, now, row['id'])
+                    )
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            finally:
+                connection.close()
+        return self.get(row['id']) if row else None
+
+    def heartbeat(self, owner: str):
+        """Refresh the heartbeat of every job owner is running"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                'UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?', (_now(), owner, JOB_RUNNING)
+            )
+        finally:
+            connection.close()
+
+    def release(self, job_id: str, owner: str):
+        """Queue a running job of owner again, e.g. when its worker is stopped"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                'UPDATE jobs SET status = ?, owner = NULL, heartbeat_at = NULL '
+                'WHERE id = ? AND owner = ? AND status = ?',
+                (JOB_QUEUED, job_id, owner, JOB_RUNNING)
+            )
+        finally:
+            connection.close()
+
+    def increment(self, job_id: str, **counters: int):
+        """Add to the progress counters of a job"""
+        unknown = set(counters) - set(JOB_COUNTERS)
+        if unknown:
+            raise ValueError(f"Unknown job counters: {sorted(unknown)}")
+        if not counters:
+            return
+        assignments = ', '.join(f'{name} = {name} + ?' for name in counters)
+        connection = self.connect()
+        try:
+            connection.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*counters.values(), job_id))
+        finally:
+            connection.close()
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        """Record the final status of a running job"""
+        connection = self.connect()
+        try:
+            connection.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, error, _now(), job_id)
+            )
+        finally:
+            connection.close()
+
+    def _recover(self, connection: sqlite3.Connection):
+        # Jobs claimed before heartbeats were recorded have none and count as stale
+        stale = '(heartbeat_at IS NULL OR heartbeat_at < ?)'
+        cutoff = _now(self.stale_after)
+        connection.execute(
+            f'UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1 AND {stale}',
+            (JOB_CANCELLED, _now(), JOB_RUNNING, cutoff)
+        )
+        connection.execute(
+            f'UPDATE jobs SET status = ?, owner = NULL, heartbeat_at = NULL WHERE status = ? AND {stale}',
+            (JOB_QUEUED, JOB_RUNNING, cutoff)
+        )
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['incremental'] = bool(job['incremental'])
+        job['cases_processed'] = job['cases_saved'] + job['cases_skipped'] + job['cases_failed']
+        return job
+
+def run_job(queue: JobQueue, job: Dict[str, Any], stopping: Optional[Callable[[], bool]] = None):
+    """
+    Crawl the listing pages of a claimed job (resuming its frontier) and process every case found.
+
+    Args:
+        queue: Queue the job was claimed from
+        job: The claimed job
+        stopping: True once the worker is shutting down; the job then stops before
+            its next case and is queued again to resume on the next start
+    """
+    # Imported here so the API can queue jobs without loading the scraping stack
+    from .scrap_service import crawl_putusan, PUTUSAN_SAVED, PUTUSAN_SKIPPED
+
+    job_id = job['id']
+    stopping = stopping or (lambda: False)
+    cancelled = lambda: stopping() or queue.cancel_requested(job_id)
+    counter = {PUTUSAN_SAVED: 'cases_saved', PUTUSAN_SKIPPED: 'cases_skipped'}
+
+    try:
+        crawl_putusan(
+            job['base_url'], job['page_start'], job['page_end'],
+            on_page=lambda page, page_links: queue.increment(
+                job_id, pages=int(page is not None), cases_found=len(page_links)
+            ),
+            on_result=lambda link, result: queue.increment(job_id, **{counter.get(result, 'cases_failed'): 1}),
+            cancelled=cancelled,
+            incremental=job['incremental']
+        )
+        if queue.cancel_requested(job_id):
+            queue.finish(job_id, JOB_CANCELLED)
+        elif stopping():
+            queue.release(job_id, job['owner'])
+        else:
+            queue.finish(job_id, JOB_DONE)
+    except Exception as e:
+        print(f"Error menjalankan job {job_id}: {e}")
+        queue.finish(job_id, JOB_FAILED, str(e))
+
+class JobWorkers:
+    """
+    Pool of daemon threads running queued jobs one at a time each.
+
+    Ingestion never runs on the event loop: the API only queues jobs and
+    reads their progress. Every pool claims jobs under its own owner id and a
+    heartbeat thread keeps them fresh, so pools of several uvicorn workers can
+    share one queue file without requeueing each other's jobs.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = INGEST_WORKERS,
+        poll_interval: float = 5.0,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+        stop_timeout: float = 30.0
+    ):
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stop_timeout = stop_timeout
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the worker and heartbeat threads (no-op when already running or disabled)"""
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"ingest-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._heartbeat, name="ingest-heartbeat", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the workers and wait up to timeout seconds (stop_timeout by default)
+        for them to exit. A job in progress stops before its next case and is
+        queued again; one still running after the timeout is requeued once its
+        heartbeat goes stale.
+        """
+        self._stop.set()
+        self._wake.set()
+        timeout = self.stop_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                print(f"Worker {thread.name} belum berhenti setelah {timeout:g} detik")
+        self._threads = []
+
+    def notify(self):
+        """Wake idle workers after a job was submitted"""
+        self._wake.set()
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat(self.owner)
+            except Exception as e:
+                print(f"Error memperbarui heartbeat job: {e}")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.owner)
+            except Exception as e:
+                print(f"Error mengambil job: {e}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            run_job(self.queue, job, self._stop.is_set)
+
+job_queue = JobQueue()
+job_workers = JobWorkers(job_queue)
@@ -0,0 +1,152 @@
+import json
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+from ..db.local_replica import replica
+from .store_service import case_store
+from .dimension_service import dimensions
+
+# Master data endpoints served from the dictionary
+MASTER_FIELDS = ('jenis_kejahatan', 'provinsi', 'tahun')
+
+class MasterDictionary:
+    """
+    Distinct jenis_kejahatan, provinsi and tahun values of the putusan table.
+
+    Built once from the case store and dimension cache, then kept current by
+    add() for every case the scraper inserts. Each field keeps its rendered JSON
+    body and a content hash used as ETag, recomputed only when its values change.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._async_build_lock = None
+        self.ready = False
+        self._jenis_kejahatan = set()
+        self._provinsi: Dict[str, str] = {}
+        self._tahun = set()
+        self._payloads: Dict[str, Tuple[str, bytes]] = {}
+
+    def build(self):
+        """Collect the distinct values from the case store, replacing the current ones"""
+        case_store.ensure_loaded()
+        dimensions.ensure_loaded()
+        with self._lock:
+            self._jenis_kejahatan = set()
+            self._provinsi = {}
+            self._tahun = set()
+            for jenis_kejahatan in case_store.distinct('jenis_kejahatan'):
+                self._add_jenis_kejahatan(jenis_kejahatan)
+            for kode_kabupaten in case_store.distinct('kode_kabupaten'):
+                self._add_kabupaten(kode_kabupaten)
+            for tahun in case_store.distinct('tahun'):
+                self._add_tahun(tahun)
+            self._payloads = {}
+            self.ready = True
+
+    def ensure_built(self):
+        """Build the dictionary on first use"""
+        if not self.ready:
+            with self._lock:
+                if not self.ready:
+                    self.build()
+
+    async def aensure_built(self):
+        """Build the dictionary on first use without blocking the event loop"""
+        if self.ready:
+            return
+        if self._async_build_lock is None:
+            self._async_build_lock = asyncio.Lock()
+        async with self._async_build_lock:
+            if not self.ready:
+                await asyncio.gather(case_store.aensure_loaded(), dimensions.aensure_loaded())
+                await asyncio.to_thread(self.build)
+
+    def warm_in_background(self) -> threading.Thread:
+        """Build the dictionary on a daemon thread"""
+        def warm():
+            try:
+                self.ensure_built()
+            except Exception as e:
+                print(f"Error warming master dictionary: {e}")
+
+        thread = threading.Thread(target=warm, name="master-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, putusan: dict):
+        """Record the values of one newly inserted putusan row"""
+        with self._lock:
+            if not self.ready:
+                return
+            if self._add_jenis_kejahatan(putusan.get('jenis_kejahatan')):
+                self._payloads.pop('jenis_kejahatan', None)
+            if self._add_kabupaten(putusan.get('kode_kabupaten')):
+                self._payloads.pop('provinsi', None)
+            tahun = putusan.get('tahun')
+            if self._add_tahun(int(tahun) if str(tahun).strip().isdigit() else None):
+                self._payloads.pop('tahun', None)
+
+    def payload(self, field: str) -> Tuple[str, bytes]:
+        """
+        Rendered JSON body of one master data endpoint and its ETag.
+
+        Args:
+            field: One of MASTER_FIELDS
+
+        Returns:
+            Tuple of (quoted ETag, JSON body)
+        """
+        self.ensure_built()
+        with self._lock:
+            cached = self._payloads.get(field)
+            if cached is None:
+                body = json.dumps(self._render(field), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                cached = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+                self._payloads[field] = cached
+            return cached
+
+    def _render(self, field: str):
+        if field == 'jenis_kejahatan':
+            values = sorted(self._jenis_kejahatan)
+        elif field == 'provinsi':
+            values = sorted(
+                ({'kode_provinsi': kode, 'nama_provinsi': nama} for kode, nama in self._provinsi.items()),
+                key=lambda x: x['nama_provinsi']
+            )
+        else:
+            values = sorted(self._tahun, reverse=True)
+        # Empty master data is answered with a bare list, as before
+        return {"data": values} if values else []
+
+    def _add_jenis_kejahatan(self, jenis_kejahatan: Optional[str]) -> bool:
+        value = jenis_kejahatan.strip() if jenis_kejahatan else None
+        if not value or value in self._jenis_kejahatan:
+            return False
+        self._jenis_kejahatan.add(value)
+        return True
+
+    def _add_kabupaten(self, kode_kabupaten: Optional[str]) -> bool:
+        kabupaten = dimensions.kabupaten(kode_kabupaten)
+        if not kabupaten or not kabupaten.get('nama_provinsi') or not kabupaten.get('kode_provinsi'):
+            return False
+        if self._provinsi.get(kabupaten['kode_provinsi']) == kabupaten['nama_provinsi']:
+            return False
+        self._provinsi[kabupaten['kode_provinsi']] = kabupaten['nama_provinsi']
+        return True
+
+    def _add_tahun(self, tahun: Optional[int]) -> bool:
+        if not tahun or tahun in self._tahun:
+            return False
+        self._tahun.add(tahun)
+        return True
+
+master_dictionary = MasterDictionary()
+
+def _on_replica_change(changed):
+    """Rebuild the dictionary after the case store or dimensions reloaded from the replica"""
+    if master_dictionary.ready and changed.keys() & {'putusan', 'kabupaten', 'provinsi'}:
+        master_dictionary.build()
+
+replica.add_listener(_on_replica_change)
@@ -0,0 +1,204 @@
+import re
+import heapq
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from ..db.database import supabase
+from ..db.fetch import iter_pages
+
+# Party tables, their name column and foreign key in putusan_detail
+PARTY_TABLES = {
+    'terdakwa': ('nama_lengkap', 'terdakwa_id'),
+    'hakim': ('nama_hakim', 'hakim_id'),
+    'saksi': ('nama_saksi', 'saksi_id'),
+    'penuntut_umum': ('nama_penuntut', 'penuntut_umum_id'),
+}
+
+# Academic and religious titles stripped before comparing names
+NAME_TITLES = {
+    'sh', 'mh', 'mhum', 'mkn', 'msi', 'mm', 'ma', 'se', 'spd', 'ssos', 'sag', 'shi', 'sip',
+    'skom', 'st', 'sst', 'ssi', 'llm', 'dr', 'drs', 'dra', 'ir', 'h', 'hj', 'kh', 'prof',
+}
+
+MIN_SIMILARITY = 0.3
+
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase a name, drop punctuation and titles such as S.H., M.H. or Hj."""
+    if not name:
+        return ''
+    # Join dotted abbreviations (S.H. -> sh) before splitting into words
+    text = re.sub(r'\b([a-z])\.(?=[a-z]\.?)', r'\1', name.lower())
+    words = [word for word in _WORD_PATTERN.findall(text) if word not in NAME_TITLES]
+    return ' '.join(words)
+
+def trigrams(name: str) -> Set[str]:
+    """Character trigrams of a normalized name, padded so word edges count"""
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class PartyIndex:
+    """
+    In-memory trigram index over terdakwa, hakim, saksi and penuntut_umum names.
+
+    People are matched by the Jaccard similarity of their name trigrams, so
+    spelling variants and extra titles from the LLM extraction still match.
+    Each person also carries the nomor_putusan of the cases they appear in.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._building = False
+        self._pending: List[Tuple[Callable[..., None], tuple]] = []
+        self._people: List[Tuple[str, str, str]] = []
+        self._grams: List[int] = []
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._cases: Dict[Tuple[str, str], List[str]] = {}
+
+    def build(self):
+        """
+        Load every person and case link, replacing the current index.
+
+        The tables are read into a fresh index without holding the lock; people and
+        cases added meanwhile are replayed onto it when it is swapped in.
+        """
+        with self._lock:
+            self._building = True
+            self._pending = []
+
+        try:
+            fresh = PartyIndex()
+            for table, (column, _) in PARTY_TABLES.items():
+                for page in iter_pages(lambda: supabase.table(table).select(f'id, {column}')):
+                    for row in page:
+                        fresh._add_person(table, row.get('id'), row.get(column))
+
+            foreign_keys = ', '.join(foreign_key for _, foreign_key in PARTY_TABLES.values())
+            for page in iter_pages(lambda: supabase.table('putusan_detail').select(f'nomor_putusan, {foreign_keys}')):
+                for row in page:
+                    fresh._add_case(row)
+
+            with self._lock:
+                self._people = fresh._people
+                self._grams = fresh._grams
+                self._slots = fresh._slots
+                self._postings = fresh._postings
+                self._cases = fresh._cases
+                pending, self._pending = self._pending, []
+                for add, args in pending:
+                    add(*args)
+                self.ready = True
+        finally:
+            with self._lock:
+                self._building = False
+
+    def ensure_built(self):
+        """Build the index on first use; only callers waiting for that first build block"""
+        if not self.ready:
+            with self._build_lock:
+                if not self.ready:
+                    self.build()
+
+    def warm(self):
+        """Build the index, logging instead of raising"""
+        try:
+            self.ensure_built()
+        except Exception as e:
+            print(f"Error warming party index: {e}")
+
+    def warm_in_background(self) -> threading.Thread:
+        """Warm the index on a daemon thread"""
+        thread = threading.Thread(target=self.warm, name="party-index-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def add_person(self, table: str, person_id: str, name: str):
+        """Index one newly inserted person"""
+        with self._lock:
+            if self._building:
+                self._pending.append((self._add_person, (table, person_id, name)))
+            if self.ready:
+                self._add_person(table, person_id, name)
+
+    def add_case(self, detail: dict):
+        """Link the people of one newly inserted putusan_detail row to its case"""
+        with self._lock:
+            if self._building:
+                self._pending.append((self._add_case, (detail,)))
+            if self.ready:
+                self._add_case(detail)
+
+    def search(self, name: str, role: Optional[str] = None, limit: int = 10) -> List[dict]:
+        """
+        Find the people whose names are most similar to the given name.
+
+        Args:
+            name: Name to look up, titles and spelling variants allowed
+            role: Only match one party table (terdakwa, hakim, saksi, penuntut_umum)
+            limit: Maximum number of people
+
+        Returns:
+            Matches with role, id, nama, score and nomor_putusan of their cases, best first
+        """
+        self.ensure_built()
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized)
+
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                postings = self._postings.get(gram)
+                if postings:
+                    shared.update(postings)
+
+            scored = []
+            for slot, overlap in shared.items():
+                if role and self._people[slot][0] != role:
+                    continue
+                score = overlap / (len(query_grams) + self._grams[slot] - overlap)
+                if score >= MIN_SIMILARITY:
+                    scored.append((score, slot))
+
+            best = heapq.nlargest(limit, scored)
+            return [
+                {
+                    "role": self._people[slot][0],
+                    "id": self._people[slot][1],
+                    "nama": self._people[slot][2],
+                    "score": round(score, 4),
+                    "cases": list(self._cases.get(self._people[slot][:2], []))
+                }
+                for score, slot in best
+            ]
+
+    def _add_person(self, table: str, person_id: Optional[str], name: Optional[str]):
+        normalized = normalize_name(name)
+        if not person_id or not normalized or (table, person_id) in self._slots:
+            return
+
+        grams = trigrams(normalized)
+        slot = len(self._people)
+        self._people.append((table, str(person_id), name))
+        self._grams.append(len(grams))
+        self._slots[(table, str(person_id))] = slot
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(slot)
+
+    def _add_case(self, detail: dict):
+        nomor_putusan = detail.get('nomor_putusan')
+        if not nomor_putusan:
+            return
+        for table, (_, foreign_key) in PARTY_TABLES.items():
+            person_id = detail.get(foreign_key)
+            if person_id:
+                cases = self._cases.setdefault((table, str(person_id)), [])
+                if nomor_putusan not in cases:
+                    cases.append(nomor_putusan)
+
+party_index = PartyIndex()
@@ -1,15 +1,39 @@
-import requests
 import io
+import re
+import asyncio
+import threading
 import os
 import uuid
 import json
-import time
+import multiprocessing
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime
 from itertools import zip_longest
+from concurrent.futures import ProcessPoolExecutor
 from ..dependencies import extract_url_document, compress_pdf, upload_to_supabase_storage, convert_date
 from ..db.database import supabase
+from ..cores.cache import bump_data_version
+from ..cores.config import (
+    PIPELINE_QUEUE_SIZE, PIPELINE_NETWORK_WORKERS, PIPELINE_COMPRESS_WORKERS,
+    PIPELINE_LLM_CONCURRENCY, PIPELINE_STORE_WORKERS
+)
+from ..cores.pipeline import Pipeline, Stage, Done, pipelines
+from .store_service import case_store
+from .cube_service import crime_cube
+from .master_service import master_dictionary
+from .index_service import search_index
+from .party_service import party_index
+from .crawl_service import crawler
+from .frontier_service import crawl_frontier, URL_FETCHED, URL_EXTRACTED, URL_STORED, URL_SKIPPED, URL_FAILED
+
+# Nomor putusan pada judul di halaman daftar, contoh: "Putusan PN BANDUNG Nomor 12/Pid.B/2024/PN Bdg Tanggal ..."
+NOMOR_PATTERN = re.compile(r'Nomor\s+(.+?)(?:\s+Tanggal\b|$)', re.IGNORECASE)
+
+# Hasil process_putusan
+PUTUSAN_SAVED = 'saved'
+PUTUSAN_SKIPPED = 'skipped'
+PUTUSAN_FAILED = 'failed'
 
 prompt_detail_putusan = """
 Saya memiliki dokumen putusan pengadilan pidana dan ingin Anda merangkum isinya dalam format berikut.
@@ -63,6 +87,15 @@ Saya memiliki dokumen putusan pengadilan pidana dan ingin Anda merangkum isinya
 }
 """
 
+# Kunci per nama orang, dibagi ke sejumlah tetap kunci, agar putusan yang diproses
+# bersamaan tidak memasukkan orang yang sama dua kali (select lalu insert)
+DETAIL_LOCK_STRIPES = 64
+_detail_locks = [threading.Lock() for _ in range(DETAIL_LOCK_STRIPES)]
+
+def detail_lock(table_name, name):
+    """Kunci yang menjaga pencarian dan penyimpanan satu nama pada satu tabel"""
+    return _detail_locks[hash((table_name, name)) % DETAIL_LOCK_STRIPES]
+
 def save_putusan_detail(data, table_name):
     """Simpan format data detail putusan"""
     column_names = {
@@ -72,18 +105,20 @@ def save_putusan_detail(data, table_name):
         'penuntut_umum': 'nama_penuntut',
         'saksi': 'nama_saksi'
     }
-    column_name = column_names.table_name
+    column_name = column_names[table_name]
     
     try:
         for idx, table in enumerate(data):
-          data_existing = supabase.table(table_name).select('id').eq(column_name, table[column_name]).execute()
-          if len(data_existing.data) == 0:
-            table['id'] = str(uuid.uuid4())
-            table['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            res = supabase.table(table_name).insert(table).execute()
-            id = res.data[0]['id']
-          else:
-            id = data_existing.data[0]['id']
+          with detail_lock(table_name, table[column_name]):
+            data_existing = supabase.table(table_name).select('id').eq(column_name, table[column_name]).execute()
+            if len(data_existing.data) == 0:
+              table['id'] = str(uuid.uuid4())
+              table['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+              res = supabase.table(table_name).insert(table).execute()
+              id = res.data[0]['id']
+              party_index.add_person(table_name, id, table[column_name])
+            else:
+              id = data_existing.data[0]['id']
 
           data[idx]['id'] = id
 
@@ -91,50 +126,90 @@ def save_putusan_detail(data, table_name):
         print(f"Error saat menyimpan putusan: {e}")
         return None
 
-def get_all_links(base_url, page=1, page_end=None):
-    """Ambil semua link putusan dari semua halaman"""
-    links = []
-    while True:
-        # Cek jika halaman melebihi batas
-        if (page and page_end) and page > page_end:
-            break
-
-        url = f"{base_url}/page/{page}.html" if page > 1 else base_url
-        print(f"Mengambil halaman {page}...")
-
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Cek jika sudah di halaman terakhir
-            if "Tidak ditemukan" in soup.text:
-                break
+def listing_url(base_url, page):
+    """URL halaman daftar putusan"""
+    return f"{base_url}/page/{page}.html" if page > 1 else base_url
 
-            # Ambil semua link putusan
-            items = soup.select('.spost.clearfix .entry-c strong a')
-            if not items:
-                break
+def get_page_links(base_url, page):
+    """Ambil link putusan dari satu halaman beserta nomor putusan pada judulnya, None jika halaman kosong atau terakhir"""
+    print(f"Mengambil halaman {page}...")
+    response = crawler.get(listing_url(base_url, page))
+    response.raise_for_status()
+    soup = BeautifulSoup(response.text, 'html.parser')
 
-            for item in items:
-                # Cek jika judul putusan (pid.c -> banyak data yg tidak lengkap)
-                if "pid.c" not in item.text.lower():
-                  links.append(urljoin(base_url, item['href']))
+    # Cek jika sudah di halaman terakhir
+    if "Tidak ditemukan" in soup.text:
+        return None
 
-            page += 1
-            time.sleep(1)  # Delay untuk menghindari blocking
+    # Ambil semua link putusan
+    items = soup.select('.spost.clearfix .entry-c strong a')
+    if not items:
+        return None
 
+    # Cek jika judul putusan (pid.c -> banyak data yg tidak lengkap)
+    page_links = {}
+    for item in items:
+        title = " ".join(item.text.split())
+        if "pid.c" not in title.lower():
+            match = NOMOR_PATTERN.search(title)
+            page_links[urljoin(base_url, item['href'])] = match.group(1) if match else None
+    return page_links
+
+class ListingPageError(Exception):
+    """Halaman daftar gagal diambil; links berisi link dari halaman-halaman sebelumnya"""
+
+    def __init__(self, page, links, error):
+        super().__init__(f"Halaman {page} gagal diambil: {error}")
+        self.page = page
+        self.links = links
+
+def get_all_links(base_url, page=1, page_end=None, on_page=None, window=None):
+    """
+    Ambil semua link putusan dari semua halaman.
+
+    on_page(page, page_links) dipanggil per halaman dengan {link: nomor putusan};
+    jika mengembalikan True, halaman berikutnya tidak diambil. window adalah jumlah
+    halaman yang diambil sekaligus (bawaan: semua sisa halaman atau concurrency crawler).
+    Halaman yang gagal diambil (bukan akhir direktori) menghasilkan ListingPageError.
+    """
+    def fetch(page):
+        try:
+            return get_page_links(base_url, page)
         except Exception as e:
             print(f"Error saat mengambil halaman {page}: {e}")
+            return e
+
+    links = []
+    while True:
+        # Ambil beberapa halaman sekaligus (semua sisa halaman jika batas diketahui)
+        size = window or (page_end - page + 1 if page_end else crawler.concurrency)
+        if page_end:
+            size = min(size, page_end - page + 1)
+        if size <= 0:
             break
 
+        pages = range(page, page + size)
+        for current, page_links in zip(pages, crawler.map(fetch, pages)):
+            # Halaman gagal: berhenti tanpa menganggap direktori selesai
+            if isinstance(page_links, Exception):
+                raise ListingPageError(current, links, page_links)
+            # Berhenti di halaman terakhir
+            if page_links is None:
+                return links
+            links.extend(page_links)
+            if on_page and on_page(current, page_links):
+                return links
+
+        page += size
+
     return links
 
 def extract_putusan_data(url):
     """Ekstrak data putusan dari halaman detail"""
     try:
-        response = requests.get(url)
+        response = crawler.get(url)
         response.raise_for_status()
+        crawl_frontier.mark(url, URL_FETCHED)
         soup = BeautifulSoup(response.text, 'html.parser')
 
         # Cek apakah ada PDF
@@ -143,6 +218,7 @@ def extract_putusan_data(url):
         if pdf_btn:
             pdf_link = urljoin(url, pdf_btn['href'])
         else:
+          crawl_frontier.mark(url, URL_SKIPPED)
           return None
 
         # Ekstrak metadata
@@ -199,135 +275,312 @@ def extract_putusan_data(url):
         print(f"Error saat ekstrak data dari {url}: {e}")
         return None
     
-def process_putusan(putusan_url):
-    """Proses satu putusan: ekstrak data + simpan PDF"""
-    try:
-        # Ekstrak metadata
-        data = extract_putusan_data(putusan_url)
-        if not data:
-            print(f"Gagal memproses {putusan_url} karena tidak memiliki link dokumen, dilewati...")
-            return True
-
-        # Ekstrak data detail
-        data_detail = {
-            "alamat_kejadian": None,
-            "status_tahanan": None,
-            "lama_tahanan": None,
-            "barang_bukti": None,
-            "hasil_putusan": None,
-            "lokasi_kejadian_id": None,
-            "waktu_kejadian_id": None,
-            "kode_kabupaten": None,
-            "hakim": [],
-            "terdakwa": [],
-            "penasihat": [],
-            "penuntut_umum": [],
-            "saksi": []
-        }
-
-        # Cek apakah sudah ada di database
-        existing_data = supabase.table('putusan').select('id').eq('nomor_putusan', data['nomor_putusan']).execute()
-        if existing_data.data:
-            print(f"Putusan {data['nomor_putusan']} sudah ada, dilewati...")
-            return True
-
-        # Download PDF
-        pdf_response = requests.get(data['uri_dokumen'])
-        pdf_response.raise_for_status()
-        pdf_buffer = io.BytesIO(pdf_response.content)
-
-        # Kompres PDF
-        compressed_pdf = compress_pdf(pdf_buffer)
-
-        # Upload ke Supabase Storage
-        format_file_name = data['nomor_putusan'].strip().replace(" ", "_").replace("/", "_")
-        file_name = f"putusan/{format_file_name}.pdf"
+def fetch_putusan(putusan_url):
+    """Tahap 1: ekstrak metadata putusan dan cek apakah sudah ada di database"""
+    # Ekstrak metadata
+    data = extract_putusan_data(putusan_url)
+    if not data:
+        # Halaman tanpa link dokumen sudah ditandai skipped, selain itu halaman gagal diambil
+        if crawl_frontier.state(putusan_url) != URL_SKIPPED:
+            crawl_frontier.mark(putusan_url, URL_FAILED)
+            return Done(PUTUSAN_FAILED)
+        print(f"Gagal memproses {putusan_url} karena tidak memiliki link dokumen, dilewati...")
+        return Done(PUTUSAN_SKIPPED)
+    crawl_frontier.mark(putusan_url, URL_EXTRACTED, data['nomor_putusan'])
+
+    # Cek apakah sudah ada di database
+    existing_data = supabase.table('putusan').select('id').eq('nomor_putusan', data['nomor_putusan']).execute()
+    if existing_data.data:
+        print(f"Putusan {data['nomor_putusan']} sudah ada, dilewati...")
+        crawl_frontier.mark(putusan_url, URL_STORED)
+        return Done(PUTUSAN_SKIPPED)
+
+    return {'url': putusan_url, 'data': data}
+
+def download_putusan_pdf(putusan):
+    """Tahap 2: download PDF putusan"""
+    pdf_response = crawler.get(putusan['data']['uri_dokumen'])
+    pdf_response.raise_for_status()
+    putusan['pdf'] = pdf_response.content
+    return putusan
+
+def compress_putusan_pdf(putusan):
+    """Tahap 3 (CPU, dijalankan di process pool): kompres PDF putusan"""
+    putusan['pdf'] = compress_pdf(io.BytesIO(putusan['pdf'])).getvalue()
+    return putusan
+
+def upload_putusan_pdf(putusan):
+    """Tahap 4: upload PDF ke Supabase Storage"""
+    data = putusan['data']
+    format_file_name = data['nomor_putusan'].strip().replace(" ", "_").replace("/", "_")
+    file_name = f"putusan/{format_file_name}.pdf"
+
+    # Cek apakah sudah ada data di storage
+    existing_data = supabase.storage.from_(os.getenv("SUPABASE_BUCKET")).list('putusan', {"limit": 1, "search": format_file_name})
+    if existing_data:
+      print(f"File {file_name} sudah ada di storage, dilewati...")
+      crawl_frontier.mark(putusan['url'], URL_SKIPPED)
+      return Done(PUTUSAN_SKIPPED)
+
+    public_url = upload_to_supabase_storage(io.BytesIO(putusan.pop('pdf')), file_name)
+    if not public_url:
+        crawl_frontier.mark(putusan['url'], URL_FAILED)
+        return Done(PUTUSAN_FAILED)
+
+    # Update data dengan URL Supabase
+    data['uri_dokumen'] = public_url
+    return putusan
+
+def extract_putusan_detail(putusan):
+    """Tahap 5 (LLM): ekstrak detail putusan dari dokumen"""
+    result_extract_document = extract_url_document(prompt_detail_putusan, putusan['data']['uri_dokumen']).strip()[7:-3]
+    putusan['detail'] = json.loads(result_extract_document)
+    return putusan
+
+def store_putusan(putusan):
+    """Tahap 6: simpan putusan, pihak dan detailnya ke database dan indeks"""
+    data = putusan['data']
+    detail_document = putusan['detail']
+
+    # Ekstrak data detail
+    data_detail = {
+        "alamat_kejadian": None,
+        "status_tahanan": None,
+        "lama_tahanan": None,
+        "barang_bukti": None,
+        "hasil_putusan": None,
+        "lokasi_kejadian_id": None,
+        "waktu_kejadian_id": None,
+        "kode_kabupaten": None,
+        "hakim": [],
+        "terdakwa": [],
+        "penasihat": [],
+        "penuntut_umum": [],
+        "saksi": []
+    }
 
-        # Cek apakah sudah ada data di storage
-        existing_data = supabase.storage.from_(os.getenv("SUPABASE_BUCKET")).list('putusan', {"limit": 1, "search": format_file_name})
-        if existing_data:
-          print(f"File {file_name} sudah ada di storage, dilewati...")
-          return None
+    # Ambil data waktu dan lokasi kejadian
+    data_waktu_kejadian = supabase.table('waktu_kejadian').select('id', 'waktu_kejadian').execute().data
+    data_lokasi_kejadian = supabase.table('lokasi_kejadian').select('id', 'nama_lokasi').execute().data
+    waktu_kejadian_default = '5179ef1c-aaba-46d8-81eb-c4e5594a2a6f' # id dari data 'Tidak Diketahui' pada database
+    lokasi_kejadian_default = 'd6681071-1eb0-4995-b33e-de78fd87e7c1' # id dari data 'Jalan Umum' pada database
+
+    # Isi data detail
+    for key in detail_document:
+      if key == 'waktu_kejadian_id':
+        id_waktu_kejadian = next((item['id'] for item in data_waktu_kejadian if item['waktu_kejadian'] == detail_document['waktu_kejadian_id']), waktu_kejadian_default)
+        detail_document['waktu_kejadian_id'] = id_waktu_kejadian
+      elif key == 'lokasi_kejadian_id':
+        id_lokasi_kejadian = next((item['id'] for item in data_lokasi_kejadian if item['nama_lokasi'] == detail_document['lokasi_kejadian_id']), lokasi_kejadian_default)
+        detail_document['lokasi_kejadian_id'] = id_lokasi_kejadian
+
+      if key in data_detail:
+        data_detail[key] = detail_document[key]
+
+    # Kelola data untuk simpan ke db
+    data.update(data_detail)
+    data_putusan = dict(list(data.items())[:-5])
+    data_hakim = data['hakim']
+    data_terdakwa = data['terdakwa']
+    data_penasihat = data['penasihat']
+    data_penuntut_umum = data['penuntut_umum']
+    data_saksi = data['saksi']
+
+    # Simpan data putusan; updated_at dicap saat insert, bukan saat halaman diambil,
+    # agar sinkronisasi berdasarkan updated_at tidak melewatkan putusan yang lama diproses
+    data_putusan['id'] = str(uuid.uuid4())
+    data_putusan['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    res = supabase.table('putusan').insert(data_putusan).execute()
+    nomor_putusan = res.data[0]['nomor_putusan']
+    case_store.append(res.data[0])
+    crime_cube.add(res.data[0])
+    master_dictionary.add(res.data[0])
+    bump_data_version()
+
+    # Simpan data detail
+    save_putusan_detail(data_hakim, 'hakim')
+    save_putusan_detail(data_terdakwa, 'terdakwa')
+    save_putusan_detail(data_penasihat, 'penasihat')
+    save_putusan_detail(data_penuntut_umum, 'penuntut_umum')
+    save_putusan_detail(data_saksi, 'saksi')
+
+    # Gabung data putusan detail
+    data_putusan_detail = []
+    for hakim, terdakwa, penasihat, penuntut, saksi in zip_longest(
+        data_hakim,
+        data_terdakwa,
+        data_penasihat,
+        data_penuntut_umum,
+        data_saksi,
+        fillvalue={}
+    ):
+        data_putusan_detail.append({
+            'id': str(uuid.uuid4()),
+            'nomor_putusan': nomor_putusan,
+            'hakim_id': hakim.get('id') if hakim else None,
+            'terdakwa_id': terdakwa.get('id') if terdakwa else None,
+            'penasihat_id': penasihat.get('id') if penasihat else None,
+            'penuntut_umum_id': penuntut.get('id') if penuntut else None,
+            'saksi_id': saksi.get('id') if saksi else None,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    # Simpan data putusan detail
+    for detail in data_putusan_detail:
+      supabase.table('putusan_detail').insert(detail).execute()
+      party_index.add_case(detail)
+
+    # Tambahkan putusan ke indeks pencarian
+    search_index.add_document(res.data[0], [
+        *(hakim.get('nama_hakim') for hakim in data_hakim),
+        *(terdakwa.get('nama_lengkap') for terdakwa in data_terdakwa),
+        *(penuntut.get('nama_penuntut') for penuntut in data_penuntut_umum),
+        *(saksi.get('nama_saksi') for saksi in data_saksi)
+    ])
+
+    print(f"Berhasil menyimpan putusan {data['nomor_putusan']}")
+    crawl_frontier.mark(putusan['url'], URL_STORED)
+    return PUTUSAN_SAVED
+
+def putusan_failed(putusan_url, error):
+    """Catat putusan yang gagal diproses"""
+    print(f"Error memproses {putusan_url}: {error}")
+    crawl_frontier.mark(putusan_url, URL_FAILED)
+    return PUTUSAN_FAILED
+
+# Tahapan pemrosesan satu putusan, berurutan
+PUTUSAN_STAGES = (
+    fetch_putusan, download_putusan_pdf, compress_putusan_pdf,
+    upload_putusan_pdf, extract_putusan_detail, store_putusan
+)
 
-        public_url = upload_to_supabase_storage(compressed_pdf, file_name)
-
-        if public_url:
-            # Update data dengan URL Supabase
-            data['uri_dokumen'] = public_url
-
-            # Data ekstrak dokumen
-            result_extract_document = extract_url_document(prompt_detail_putusan, public_url).strip()[7:-3]
-            detail_document = json.loads(result_extract_document)
-
-            # Ambil data waktu dan lokasi kejadian
-            data_waktu_kejadian = supabase.table('waktu_kejadian').select('id', 'waktu_kejadian').execute().data
-            data_lokasi_kejadian = supabase.table('lokasi_kejadian').select('id', 'nama_lokasi').execute().data
-            waktu_kejadian_default = '5179ef1c-aaba-46d8-81eb-c4e5594a2a6f' # id dari data 'Tidak Diketahui' pada database
-            lokasi_kejadian_default = 'd6681071-1eb0-4995-b33e-de78fd87e7c1' # id dari data 'Jalan Umum' pada database
-
-            # Isi data detail
-            for key in detail_document:
-              if key == 'waktu_kejadian_id':
-                id_waktu_kejadian = next((item['id'] for item in data_waktu_kejadian if item['waktu_kejadian'] == detail_document['waktu_kejadian_id']), waktu_kejadian_default)
-                detail_document['waktu_kejadian_id'] = id_waktu_kejadian
-              elif key == 'lokasi_kejadian_id':
-                id_lokasi_kejadian = next((item['id'] for item in data_lokasi_kejadian if item['nama_lokasi'] == detail_document['lokasi_kejadian_id']), lokasi_kejadian_default)
-                detail_document['lokasi_kejadian_id'] = id_lokasi_kejadian
-
-              if key in data_detail:
-                data_detail[key] = detail_document[key]
-
-            # Kelola data untuk simpan ke db
-            data.update(data_detail)
-            data_putusan = dict(list(data.items())[:-5])
-            data_hakim = data['hakim']
-            data_terdakwa = data['terdakwa']
-            data_penasihat = data['penasihat']
-            data_penuntut_umum = data['penuntut_umum']
-            data_saksi = data['saksi']
-
-            # Simpan data putusan
-            data_putusan['id'] = str(uuid.uuid4())
-            res = supabase.table('putusan').insert(data_putusan).execute()
-            nomor_putusan = res.data[0]['nomor_putusan']
-
-            # Simpan data detail
-            save_putusan_detail(data_hakim, 'hakim')
-            save_putusan_detail(data_terdakwa, 'terdakwa')
-            save_putusan_detail(data_penasihat, 'penasihat')
-            save_putusan_detail(data_penuntut_umum, 'penuntut_umum')
-            save_putusan_detail(data_saksi, 'saksi')
-
-            # Gabung data putusan detail
-            data_putusan_detail = []
-            for hakim, terdakwa, penasihat, penuntut, saksi in zip_longest(
-                data_hakim,
-                data_terdakwa,
-                data_penasihat,
-                data_penuntut_umum,
-                data_saksi,
-                fillvalue={}
-            ):
-                data_putusan_detail.append({
-                    'id': str(uuid.uuid4()),
-                    'nomor_putusan': nomor_putusan,
-                    'hakim_id': hakim.get('id') if hakim else None,
-                    'terdakwa_id': terdakwa.get('id') if terdakwa else None,
-                    'penasihat_id': penasihat.get('id') if penasihat else None,
-                    'penuntut_umum_id': penuntut.get('id') if penuntut else None,
-                    'saksi_id': saksi.get('id') if saksi else None,
-                    'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
-
-            # Simpan data putusan detail
-            for detail in data_putusan_detail:
-              supabase.table('putusan_detail').insert(detail).execute()
-
-            print(f"Berhasil menyimpan putusan {data['nomor_putusan']}")
-            return True
-
-        return False
+def process_putusan(putusan_url):
+    """Proses satu putusan: ekstrak data + simpan PDF, kembalikan PUTUSAN_SAVED, PUTUSAN_SKIPPED atau PUTUSAN_FAILED"""
+    try:
+        putusan = putusan_url
+        for stage in PUTUSAN_STAGES:
+            putusan = stage(putusan)
+            if isinstance(putusan, Done):
+                return putusan.result
+        return putusan
 
     except Exception as e:
-        print(f"Error memproses {putusan_url}: {e}")
-        return False
\ No newline at end of file
+        return putusan_failed(putusan_url, e)
+
+_pipeline_lock = threading.Lock()
+
+def process_context():
+    """Konteks multiprocessing untuk process pool: forkserver jika tersedia, selain itu spawn"""
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def putusan_pipeline():
+    """
+    Pipeline pemrosesan putusan: setiap tahap punya worker sendiri dengan antrean terbatas di depannya.
+
+    Tahap jaringan berjalan di worker async (panggilan blocking di thread), kompresi
+    di process pool dan ekstraksi LLM dengan batas konkurensinya sendiri. Proses kompresi
+    dibuat dengan forkserver (atau spawn), bukan fork dari proses API yang sudah punya
+    thread, koneksi dan lock yang sedang dipegang.
+    """
+    with _pipeline_lock:
+        if 'putusan' not in pipelines:
+            Pipeline('putusan', [
+                Stage('fetch', fetch_putusan, PIPELINE_NETWORK_WORKERS),
+                Stage('download', download_putusan_pdf, PIPELINE_NETWORK_WORKERS),
+                Stage(
+                    'compress', compress_putusan_pdf, PIPELINE_COMPRESS_WORKERS,
+                    executor=ProcessPoolExecutor(max_workers=PIPELINE_COMPRESS_WORKERS, mp_context=process_context())
+                ),
+                Stage('upload', upload_putusan_pdf, PIPELINE_NETWORK_WORKERS),
+                Stage('extract', extract_putusan_detail, PIPELINE_LLM_CONCURRENCY),
+                Stage('store', store_putusan, PIPELINE_STORE_WORKERS),
+            ], queue_size=PIPELINE_QUEUE_SIZE, on_error=putusan_failed)
+        return pipelines['putusan']
+
+def process_all_putusan(links, on_result=None, cancelled=None, label=""):
+    """
+    Proses semua putusan melalui pipeline bertahap.
+
+    on_result(link, result) dipanggil setelah setiap putusan; jika cancelled()
+    bernilai True, putusan yang belum dimulai dilewati (hasilnya None).
+    """
+    if not links:
+        return []
+    return asyncio.run(putusan_pipeline().run(links, on_result=on_result, cancelled=cancelled, label=label))
+
+def known_putusan(page_links):
+    """
+    Link putusan yang sudah dikenal: selesai di frontier atau nomornya sudah ada di database.
+
+    Semua nomor dicek dengan satu query; link yang ditemukan di database ditandai
+    stored di frontier sehingga pengecekan berikutnya cukup lokal.
+    """
+    known = crawl_frontier.finished(page_links)
+    nomor_links = {nomor: link for link, nomor in page_links.items() if nomor and link not in known}
+    if nomor_links:
+        res = supabase.table('putusan').select('nomor_putusan').in_('nomor_putusan', list(nomor_links)).execute()
+        for row in res.data:
+            link = nomor_links[row['nomor_putusan']]
+            crawl_frontier.mark(link, URL_STORED, row['nomor_putusan'])
+            known.add(link)
+    return known
+
+def crawl_putusan(base_url, page_start=1, page_end=None, on_page=None, on_result=None, cancelled=None, incremental=False):
+    """
+    Crawl satu direktori pengadilan dengan frontier yang bisa dilanjutkan.
+
+    Crawl yang terhenti dilanjutkan setelah halaman terakhir yang tercatat, dengan
+    putusan yang belum selesai; putusan yang sudah tersimpan atau dilewati tidak
+    diambil lagi. on_page(page, links) dipanggil per halaman daftar (page None
+    untuk putusan yang dilanjutkan dari frontier).
+
+    Mode incremental mengambil halaman satu per satu (terbaru lebih dulu) dan berhenti
+    pada halaman pertama yang seluruh putusannya sudah dikenal.
+
+    Jika halaman daftar gagal diambil, putusan yang sudah didapat tetap diproses lalu
+    ListingPageError dilempar; crawl tidak ditandai selesai sehingga crawl berikutnya
+    dilanjutkan dari halaman yang gagal.
+    """
+    # 1. Lanjutkan dari frontier
+    page = crawl_frontier.begin(base_url, page_start, page_end)
+    links = crawl_frontier.pending(base_url)
+    if page > page_start:
+        print(f"Melanjutkan crawl {base_url} dari halaman {page} ({len(links)} putusan tertunda)")
+    if links and on_page:
+        on_page(None, links)
+
+    # 2. Ambil halaman daftar berikutnya, catat link setiap halaman
+    def record(page, page_links):
+        crawl_frontier.record_page(base_url, page, page_links)
+        known = known_putusan(page_links)
+        if on_page:
+            on_page(page, list(page_links))
+        # Halaman berisi putusan yang sudah dikenal semua: sisa direktori sudah diambil
+        return incremental and bool(page_links) and len(known) == len(page_links)
+
+    # Halaman yang gagal diambil tidak menyelesaikan crawl: putusan yang sudah didapat
+    # tetap diproses, lalu job gagal dan crawl berikutnya mulai dari halaman itu
+    page_error = None
+    if page_end is None or page <= page_end:
+        try:
+            links += get_all_links(base_url, page, page_end, on_page=record, window=1 if incremental else None)
+        except ListingPageError as e:
+            links += e.links
+            page_error = e
+
+    # 3. Proses putusan yang belum selesai saja
+    finished = crawl_frontier.finished(links)
+    queued = list(dict.fromkeys(link for link in links if link not in finished))
+    if on_result:
+        for link in finished:
+            on_result(link, PUTUSAN_SKIPPED)
+    try:
+        process_all_putusan(queued, on_result=on_result, cancelled=cancelled, label=base_url)
+    finally:
+        # Simpan indeks pencarian sekali di akhir crawl (selama crawl disimpan berkala)
+        search_index.flush()
+
+    if page_error:
+        raise page_error
+    if not (cancelled and cancelled()):
+        crawl_frontier.complete(base_url)
@@ -1,10 +1,322 @@
-from typing import Optional, Dict, Any
-from ..db.database import supabase
-    
-def search_cases(
+import json
+import uuid
+import base64
+import asyncio
+from datetime import datetime
+from collections import Counter
+from typing import Optional, Dict, Any, List, Tuple
+from postgrest.types import CountMethod
+from ..cores.extract import compile_record, extract_column
+from ..db.database import async_supabase
+from ..db.fetch import aexecute, aiter_pages
+from ..db.local_replica import replica
+from .dimension_service import dimensions
+from .facet_service import FACET_COLUMNS, facet_row, count_facets
+from .index_service import search_index
+
+# Columns returned for every case in search results
+CASE_COLUMNS = '''
+    id,
+    nomor_putusan,
+    judul_putusan,
+    jenis_kejahatan,
+    lembaga_peradilan,
+    tahun,
+    tanggal_putusan:tanggal_dibacakan,
+    lama_tahanan,
+    status_tahanan,
+    vonis_hukuman,
+    hasil_putusan,
+    kode_kabupaten
+'''
+
+# Result row fields copied as they are (nomor_putusan second), followed by kode_kabupaten
+RESULT_FIELDS = (
+    'id', 'nomor_putusan', 'judul_putusan', 'jenis_kejahatan', 'lembaga_peradilan', 'tahun',
+    'tanggal_putusan', 'status_tahanan', 'lama_tahanan', 'vonis_hukuman', 'hasil_putusan'
+)
+_result_values = compile_record(RESULT_FIELDS + ('kode_kabupaten',))
+
+def build_search_query(
+    columns: str,
+    query: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    count: Optional[CountMethod] = None,
+    head: Optional[bool] = None
+):
+    """
+    Build a new putusan select filtered by the text search query and filters.
+
+    Args:
+        columns: PostgREST select expression
+        query: Plain text search query (searches across multiple fields)
+        filters: jenis_kejahatan, tahun, provinsi (code), kabupaten (name),
+            peradilan and status_tahanan filters; empty values are ignored
+        count: PostgREST count method to request alongside the rows
+        head: Only return headers (the count), no rows
+
+    Returns:
+        Unexecuted select builder of the async client
+    """
+    filters = filters or {}
+    base_query = async_supabase.table('putusan').select(columns, count=count, head=head)
+
+    # Apply filters if provided
+    if filters.get('jenis_kejahatan'):
+        base_query = base_query.eq('jenis_kejahatan', filters['jenis_kejahatan'])
+    if filters.get('tahun'):
+        base_query = base_query.eq('tahun', filters['tahun'])
+    if filters.get('provinsi') or filters.get('kabupaten'):
+        # Location filters become a foreign key list resolved by the dimension cache, no join
+        base_query = base_query.in_('kode_kabupaten', location_codes(filters))
+    if filters.get('peradilan'):
+        base_query = base_query.eq('lembaga_peradilan', filters['peradilan'])
+    if filters.get('status_tahanan'):
+        base_query = base_query.eq('status_tahanan', filters['status_tahanan'])
+
+    # Apply text search query if provided
+    if query and query.strip():
+        # Search across multiple text fields including detail data
+        search_query = f'%{query.strip()}%'
+        base_query = base_query.or_(
+            f'judul_putusan.ilike.{search_query},'
+            f'hasil_putusan.ilike.{search_query},'
+            f'nomor_putusan.ilike.{search_query},'
+            f'jenis_kejahatan.ilike.{search_query},'
+            f'lembaga_peradilan.ilike.{search_query},'
+            f'status_tahanan.ilike.{search_query}'
+        )
+
+    return base_query
+
+def location_codes(filters: Dict[str, Any]) -> List[str]:
+    """Codes of the kabupaten matching the provinsi (code) and kabupaten (name) filters"""
+    return dimensions.kabupaten_codes(filters.get('provinsi'), filters.get('kabupaten'))
+
+def encode_cursor(item: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after the given search result row"""
+    position = json.dumps([item.get("tanggal_putusan"), item.get("id")], separators=(',', ':'))
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """
+    Decode a cursor created by encode_cursor.
+
+    The values end up inside a PostgREST filter, so tanggal must be an ISO date
+    and the id a UUID.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        tanggal, case_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if tanggal is not None:
+            datetime.fromisoformat(tanggal)
+        if str(uuid.UUID(case_id)) != case_id:
+            raise ValueError(case_id)
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+    return tanggal, case_id
+
+def apply_cursor(base_query, cursor: str):
+    """
+    Restrict a (tanggal_dibacakan desc nullslast, id desc) ordered query to rows after the cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    tanggal, case_id = decode_cursor(cursor)
+    if tanggal is None:
+        return base_query.or_(f'and(tanggal_dibacakan.is.null,id.lt."{case_id}")')
+    return base_query.or_(
+        f'tanggal_dibacakan.lt."{tanggal}",'
+        f'and(tanggal_dibacakan.eq."{tanggal}",id.lt."{case_id}"),'
+        f'tanggal_dibacakan.is.null'
+    )
+
+async def count_cases(
+    query: Optional[str] = None,
+    count_method: str = "exact",
+    filters: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Count matching cases with a head-only request, without transferring rows.
+
+    Args:
+        query: Plain text search query (searches across multiple fields)
+        filters: Search filters, see build_search_query
+        count_method: 'exact' (COUNT(*)), 'planned' (planner estimate) or
+            'estimated' (exact for small results, planner estimate above max-rows)
+
+    Returns:
+        Number of matching cases
+    """
+    result = await aexecute(build_search_query('id', query, filters, count=CountMethod(count_method), head=True))
+    return result.count or 0
+
+async def facet_cases(query: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Count facets over every matching case in one pass over a light select.
+
+    Only used while the search index is not ready: it pages through the whole
+    matching set, which the index answers from memory.
+
+    Args:
+        query: Plain text search query (searches across multiple fields)
+        filters: Search filters, see build_search_query
+
+    Returns:
+        Facets in the format of count_facets
+    """
+    # Only distinct facet combinations are kept while the pages stream in
+    combinations = Counter()
+    async for page in aiter_pages(lambda: build_search_query(FACET_COLUMNS, query, filters)):
+        combinations.update(facet_row(item) for item in page)
+
+    return count_facets(combinations.elements())
+
+# Replica equivalent of the putusan select; names are resolved by the dimension cache
+LOCAL_CASE_FROM = 'FROM putusan p'
+
+LOCAL_CASE_COLUMNS = '''
+    p.id, p.nomor_putusan, p.judul_putusan, p.jenis_kejahatan, p.lembaga_peradilan, p.tahun,
+    p.tanggal_dibacakan AS tanggal_putusan, p.lama_tahanan, p.status_tahanan, p.vonis_hukuman,
+    p.hasil_putusan, p.kode_kabupaten
+'''
+
+# Columns matched by the text search query
+TEXT_SEARCH_COLUMNS = (
+    'judul_putusan', 'hasil_putusan', 'nomor_putusan', 'jenis_kejahatan', 'lembaga_peradilan', 'status_tahanan'
+)
+
+def build_local_conditions(query: Optional[str] = None, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Any]]:
+    """
+    SQL conditions and parameters of the replica equivalent of build_search_query.
+
+    Args:
+        query: Plain text search query (searches across multiple fields)
+        filters: Search filters, see build_search_query
+
+    Returns:
+        Tuple of (conditions to AND together, parameters)
+    """
+    filters = filters or {}
+    conditions = []
+    params = []
+
+    filter_columns = (
+        ('jenis_kejahatan', 'p.jenis_kejahatan'),
+        ('tahun', 'p.tahun'),
+        ('peradilan', 'p.lembaga_peradilan'),
+        ('status_tahanan', 'p.status_tahanan')
+    )
+    for name, column in filter_columns:
+        if filters.get(name):
+            conditions.append(f'{column} = ?')
+            params.append(filters[name])
+
+    if filters.get('provinsi') or filters.get('kabupaten'):
+        codes = location_codes(filters)
+        conditions.append(f"p.kode_kabupaten IN ({', '.join('?' for _ in codes)})")
+        params.extend(codes)
+
+    # LIKE is case-insensitive for ASCII in SQLite, like ilike
+    if query and query.strip():
+        conditions.append('(' + ' OR '.join(f'p.{column} LIKE ?' for column in TEXT_SEARCH_COLUMNS) + ')')
+        params.extend([f'%{query.strip()}%'] * len(TEXT_SEARCH_COLUMNS))
+
+    return conditions, params
+
+def load_local_cases(case_ids: List[str]) -> List[Dict[str, Any]]:
+    """Load search result rows by id from the replica"""
+    placeholders = ', '.join('?' for _ in case_ids)
+    rows = replica.query(f'SELECT {LOCAL_CASE_COLUMNS} {LOCAL_CASE_FROM} WHERE p.id IN ({placeholders})', case_ids)
+    return rows
+
+def search_local_page(
+    query: Optional[str],
+    filters: Dict[str, Any],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    with_facets: bool
+) -> Tuple[int, Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Count, facet and page matching cases with SQL against the local replica.
+
+    Args:
+        query: Plain text search query (searches across multiple fields)
+        filters: Search filters, see build_search_query
+        limit: Maximum number of results (one extra row is returned in cursor mode)
+        offset: Number of results to skip, ignored with a cursor
+        cursor: Keyset cursor from a previous meta.next_cursor
+        with_facets: Count facets with one GROUP BY over the matching set
+
+    Returns:
+        Tuple of (total, facets or None, page rows shaped like the PostgREST rows)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    conditions, params = build_local_conditions(query, filters)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+    facets = None
+    if with_facets:
+        combinations = Counter()
+        for row in replica.query(f'''
+            SELECT p.jenis_kejahatan, p.tahun, p.lembaga_peradilan, p.status_tahanan, p.kode_kabupaten,
+                   COUNT(*) AS jumlah
+            {LOCAL_CASE_FROM} {where}
+            GROUP BY 1, 2, 3, 4, 5
+        ''', params):
+            combinations[facet_row(row)] += row['jumlah']
+        total = combinations.total()
+        facets = count_facets(combinations.elements())
+    else:
+        total = replica.query(f'SELECT COUNT(*) AS total {LOCAL_CASE_FROM} {where}', params)[0]['total']
+
+    # Same (tanggal_dibacakan desc nullslast, id desc) order and keyset as the remote query
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if cursor:
+        tanggal, case_id = decode_cursor(cursor)
+        if tanggal is None:
+            page_conditions.append('(p.tanggal_dibacakan IS NULL AND p.id < ?)')
+            page_params.append(case_id)
+        else:
+            page_conditions.append(
+                '(p.tanggal_dibacakan < ? OR (p.tanggal_dibacakan = ? AND p.id < ?) OR p.tanggal_dibacakan IS NULL)'
+            )
+            page_params.extend([tanggal, tanggal, case_id])
+        page_params.extend([limit + 1, 0])
+    else:
+        page_params.extend([limit + 1, offset])
+
+    page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ''
+    rows = replica.query(f'''
+        SELECT {LOCAL_CASE_COLUMNS} {LOCAL_CASE_FROM} {page_where}
+        ORDER BY p.tanggal_dibacakan IS NULL, p.tanggal_dibacakan DESC, p.id DESC
+        LIMIT ? OFFSET ?
+    ''', page_params)
+
+    return total, facets, rows
+
+async def search_cases(
     query: Optional[str] = None,
+    jenis_kejahatan: Optional[str] = None,
+    tahun: Optional[int] = None,
+    provinsi: Optional[str] = None,
+    kabupaten: Optional[str] = None,
+    peradilan: Optional[str] = None,
+    status_tahanan: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    count_method: str = "exact",
+    sort: str = "relevance",
+    cursor: Optional[str] = None,
+    with_facets: bool = False
 ) -> Dict[str, Any]:
     """
     Search for court cases based on text query and filter criteria.
@@ -13,92 +325,103 @@ def search_cases(
         query: Plain text search query (searches across multiple fields)
         jenis_kejahatan: Type of crime filter
         tahun: Year of case filter
-        provinsi: Province code or name filter
+        provinsi: Province code filter
         kabupaten: District/city name filter
         peradilan: Court name filter
         status_tahanan: Case status filter
         limit: Maximum number of results
         offset: Number of results to skip
+        count_method: How total is counted ('exact', 'planned' or 'estimated')
+        sort: 'relevance' ranks text queries with the BM25 search index when it is
+            ready, 'tanggal' orders by verdict date
+        cursor: Keyset cursor from a previous meta.next_cursor; pages by verdict
+            date after that row and ignores offset
+        with_facets: Count jenis_kejahatan, tahun, provinsi, lembaga_peradilan and
+            status_tahanan over all matching cases
         
     Returns:
         Dictionary containing search results and metadata
     """
     try:
-        # Build base query with all necessary joins
-        base_query = supabase.table('putusan').select('''
-            id,
-            nomor_putusan,
-            judul_putusan,
-            jenis_kejahatan,
-            lembaga_peradilan,
-            tahun,
-            tanggal_putusan:tanggal_dibacakan,
-            lama_tahanan,
-            status_tahanan,
-            vonis_hukuman,
-            hasil_putusan,
-            kabupaten(
-                nama_kabupaten,
-                kode_provinsi,
-                provinsi(nama_provinsi)
+        filters = {
+            "jenis_kejahatan": jenis_kejahatan,
+            "tahun": tahun,
+            "provinsi": provinsi,
+            "kabupaten": kabupaten,
+            "peradilan": peradilan,
+            "status_tahanan": status_tahanan
+        }
+
+        # Location filters, facets and result rows resolve names through the dimension cache
+        await dimensions.aensure_loaded()
+
+        next_cursor = None
+        facets = None
+        if cursor is None and query and query.strip() and sort == "relevance" and search_index.ready:
+            # Rank with the in-process search index, then load only the page rows
+            total_count, ranked_ids, facets = await asyncio.to_thread(
+                search_index.search, query, limit=limit, offset=offset, filters=filters, with_facets=with_facets
             )
-        ''')
-        
-        # Apply text search query if provided
-        if query and query.strip():
-            # Search across multiple text fields including detail data
-            search_query = f'%{query.strip()}%'
-            base_query = base_query.or_(
-                f'judul_putusan.ilike.{search_query},'
-                f'hasil_putusan.ilike.{search_query},'
-                f'nomor_putusan.ilike.{search_query},'
-                f'jenis_kejahatan.ilike.{search_query},'
-                f'lembaga_peradilan.ilike.{search_query},'
-                f'status_tahanan.ilike.{search_query}'
+            rows = []
+            if ranked_ids:
+                if replica.ready:
+                    page = await asyncio.to_thread(load_local_cases, ranked_ids)
+                else:
+                    result = await aexecute(async_supabase.table('putusan').select(CASE_COLUMNS).in_('id', ranked_ids))
+                    page = result.data or []
+                rank = {case_id: position for position, case_id in enumerate(ranked_ids)}
+                rows = sorted(page, key=lambda item: rank.get(item.get("id"), len(rank)))
+        elif replica.ready:
+            # Count, facet and page with SQL against the local replica (the count is always exact)
+            total_count, facets, rows = await asyncio.to_thread(
+                search_local_page, query, filters, limit, offset, cursor, with_facets
             )
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1])
+        else:
+            # Apply ordering; (tanggal_dibacakan, id) is unique so pages are stable
+            paginated_query = build_search_query(CASE_COLUMNS, query, filters) \
+                .order('tanggal_dibacakan', desc=True, nullsfirst=False) \
+                .order('id', desc=True)
+
+            # Apply pagination: keyset after the cursor, or offset; one extra row tells if there is a next page
+            if cursor:
+                paginated_query = apply_cursor(paginated_query, cursor).limit(limit + 1)
+            else:
+                paginated_query = paginated_query.range(offset, offset + limit)
+            
+            # Count matching cases with a head-only request, concurrently with the page query
+            total_count, result = await asyncio.gather(count_cases(query, count_method, filters), aexecute(paginated_query))
+
+            # Facets come from the in-memory search index; paging the matching set is the fallback
+            if with_facets:
+                if search_index.ready:
+                    facets = await asyncio.to_thread(search_index.facets, query, filters)
+                else:
+                    facets = await facet_cases(query, filters)
+            rows = result.data if result.data else []
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1])
         
-        # Get total count first (before pagination)
-        count_query = base_query
-        count_result = count_query.execute()
-        total_count = len(count_result.data) if count_result.data else 0
-
-        # print(f"results: {count_result.data}")
-         
-        # Apply pagination and ordering
-        paginated_query = base_query.order('tanggal_dibacakan', desc=True).range(offset, offset + limit - 1)
-        
-        # Execute paginated query
-        result = paginated_query.execute()
-        
+        # Get detailed information from putusan_detail table for the whole page at once
+        details = await get_putusan_details(extract_column(rows, "nomor_putusan"))
+
         # Process and format results
         processed_data = []
-        for item in result.data if result.data else []:
-            # Get detailed information from putusan_detail table
-            detail_data = get_putusan_detail(item.get("nomor_putusan"))
-
-            # print(f"Detail for {item.get('nomor_putusan')}: {detail_data}")
+        for item in rows:
+            *values, kode_kabupaten = _result_values(item)
+            detail_data = details.get(values[1], {"pihak_terlibat": {}})
+            kabupaten = dimensions.kabupaten(kode_kabupaten)
             
             # Format the case data
             formatted_item = {
-                "id": item.get("id"),
-                "nomor_putusan": item.get("nomor_putusan"),
-                "judul_putusan": item.get("judul_putusan"),
-                "jenis_kejahatan": item.get("jenis_kejahatan"),
-                "lembaga_peradilan": item.get("lembaga_peradilan"),
-                "tahun": item.get("tahun"),
-                "tanggal_putusan": item.get("tanggal_putusan"),
-                "status_tahanan": item.get("status_tahanan"),
-                "lama_tahanan": item.get("lama_tahanan"),
-                "vonis_hukuman": item.get("vonis_hukuman"),
-                "hasil_putusan": item.get("hasil_putusan"),
+                **dict(zip(RESULT_FIELDS, values)),
                 "lokasi": {
-                    "kabupaten": item.get("kabupaten", {}).get("nama_kabupaten") if item.get("kabupaten") else None,
-                    "provinsi": (
-                        item.get("kabupaten", {}).get("provinsi", {}).get("nama_provinsi") 
-                        if item.get("kabupaten") and item.get("kabupaten").get("provinsi") 
-                        else None
-                    ),
-                    "kode_provinsi": item.get("kabupaten", {}).get("kode_provinsi") if item.get("kabupaten") else None
+                    "kabupaten": kabupaten["nama_kabupaten"] if kabupaten else None,
+                    "provinsi": kabupaten["nama_provinsi"] if kabupaten else None,
+                    "kode_provinsi": kabupaten["kode_provinsi"] if kabupaten else None
                 },
                 "pihak_terlibat": detail_data.get("pihak_terlibat", {})
             }
@@ -116,12 +439,16 @@ def search_cases(
                 "offset": offset,
                 "page": current_page,
                 "total_pages": total_pages,
-                "has_next": offset + limit < total_count,
-                "has_prev": offset > 0,
-                "search_query": query
-            }
+                "has_next": next_cursor is not None if cursor else offset + limit < total_count,
+                "has_prev": cursor is not None or offset > 0,
+                "search_query": query,
+                "next_cursor": next_cursor
+            },
+            "facets": facets
         }
     
+    except ValueError:
+        raise
     except Exception as e:
         raise Exception(f"Error searching cases: {str(e)}")
 
@@ -153,61 +480,80 @@ def mapping_putusan_detail(data_list, detail, table_name, column_name=None):
                 }
                 data_list.append(hakim_info)
 
-def get_putusan_detail(nomor_putusan: str) -> Dict[str, Any]:
+# Party relations loaded for every putusan_detail row
+DETAIL_COLUMNS = '''
+    nomor_putusan,
+    terdakwa(nama_terdakwa:nama_lengkap),
+    hakim(nama_hakim, jabatan),
+    saksi(nama_saksi),
+    penuntut_umum(nama_penuntut)
+'''
+
+def load_local_details(nomor_putusan_list: List[str]) -> List[Dict[str, Any]]:
+    """Load putusan_detail rows with their parties from the replica, shaped like DETAIL_COLUMNS"""
+    placeholders = ', '.join('?' for _ in nomor_putusan_list)
+    rows = replica.query(f'''
+        SELECT d.nomor_putusan,
+               t.id AS terdakwa_id, t.nama_lengkap AS nama_terdakwa,
+               h.id AS hakim_id, h.nama_hakim, h.jabatan,
+               s.id AS saksi_id, s.nama_saksi,
+               pu.id AS penuntut_umum_id, pu.nama_penuntut
+        FROM putusan_detail d
+        LEFT JOIN terdakwa t ON t.id = d.terdakwa_id
+        LEFT JOIN hakim h ON h.id = d.hakim_id
+        LEFT JOIN saksi s ON s.id = d.saksi_id
+        LEFT JOIN penuntut_umum pu ON pu.id = d.penuntut_umum_id
+        WHERE d.nomor_putusan IN ({placeholders})
+        ORDER BY d.id
+    ''', nomor_putusan_list)
+
+    return [
+        {
+            "nomor_putusan": row["nomor_putusan"],
+            "terdakwa": {"nama_terdakwa": row["nama_terdakwa"]} if row["terdakwa_id"] else None,
+            "hakim": {"nama_hakim": row["nama_hakim"], "jabatan": row["jabatan"]} if row["hakim_id"] else None,
+            "saksi": {"nama_saksi": row["nama_saksi"]} if row["saksi_id"] else None,
+            "penuntut_umum": {"nama_penuntut": row["nama_penuntut"]} if row["penuntut_umum_id"] else None
+        }
+        for row in rows
+    ]
+
+async def get_putusan_details(nomor_putusan_list: List[str]) -> Dict[str, Dict[str, Any]]:
     """
-    Get detailed information from putusan_detail table by nomor_putusan.
+    Get detailed information from putusan_detail table for many cases at once.
     
     Args:
-        nomor_putusan: Case number to look up details
+        nomor_putusan_list: Case numbers to look up details
         
     Returns:
-        Dictionary containing detailed case information
+        Dictionary mapping each case number to its detailed case information
     """
-    try:
-        if not nomor_putusan:
-            return {"pihak_terlibat": {}}
-        
-        # Query putusan_detail table
-        # First, get the basic detail record to check which relations exist
-        basic_detail = supabase.table('putusan_detail').select('id, terdakwa(nama_lengkap), hakim(nama_hakim), saksi(nama_saksi), penuntut_umum(nama_penuntut)').eq('nomor_putusan', nomor_putusan).execute()
-
-        if not basic_detail.data:
-            return {"pihak_terlibat": {}}
-        
-        detail_record = basic_detail.data[0]
+    nomor_putusan_list = list(dict.fromkeys(nomor for nomor in nomor_putusan_list if nomor))
+    details = {nomor: {"pihak_terlibat": {}} for nomor in nomor_putusan_list}
+    if not nomor_putusan_list:
+        return details
 
-        # print(f"Basic detail for {nomor_putusan}: {detail_record}")
-        
-        # Build select query dynamically based on which relations have values
-        select_fields = []
-        if detail_record.get('terdakwa'):
-            select_fields.append('terdakwa(nama_terdakwa:nama_lengkap)')
-        
-        if detail_record.get('hakim'):
-            select_fields.append('hakim(nama_hakim, jabatan)')
-        
-        if detail_record.get('saksi'):
-            select_fields.append('saksi(nama_saksi)')
-        
-        if detail_record.get('penuntut_umum'):
-            select_fields.append('penuntut_umum(nama_penuntut)')
-
-        # print(f"Selected fields for {nomor_putusan}: {select_fields}")
-        
-        # If no relations have values, return empty result
-        if not select_fields:
-            detail_result = basic_detail
+    try:
+        # Query all party relations of the page in one select, grouped per case
+        rows_by_nomor = {}
+        if replica.ready:
+            for row in await asyncio.to_thread(load_local_details, nomor_putusan_list):
+                rows_by_nomor.setdefault(row.get('nomor_putusan'), []).append(row)
         else:
-            # Query with only the relations that have values
-            select_query = ', '.join(select_fields)
-            # print(f"Executing detail query for {nomor_putusan} with fields: {select_query}")
-            detail_result = supabase.table('putusan_detail').select(select_query).eq('nomor_putusan', nomor_putusan).execute()
-        
-        if not detail_result.data:
-            return {"pihak_terlibat": {}}
+            async for page in aiter_pages(
+                lambda: async_supabase.table('putusan_detail').select(DETAIL_COLUMNS).in_('nomor_putusan', nomor_putusan_list),
+                max_workers=1
+            ):
+                for row in page:
+                    rows_by_nomor.setdefault(row.get('nomor_putusan'), []).append(row)
+    except Exception as e:
+        print(f"Error getting putusan detail for {len(nomor_putusan_list)} cases: {str(e)}")
+        return details
+
+    for nomor_putusan, detail in rows_by_nomor.items():
+        if nomor_putusan not in details:
+            continue
 
-        # Process the detail data
-        detail = detail_result.data        
         terdakwa_list = []
         hakim_list = []
         saksi_list = []
@@ -228,16 +574,29 @@ def get_putusan_detail(nomor_putusan: str) -> Dict[str, Any]:
                 mapping_putusan_detail(penuntut_list, item, "penuntut_umum", "nama_penuntut")
         
         # Build the complete pihak_terlibat response
-        pihak_terlibat = {
-            "terdakwa": terdakwa_list,
-            "hakim": hakim_list,
-            "saksi": saksi_list,
-            "penuntut": penuntut_list
+        details[nomor_putusan] = {
+            "pihak_terlibat": {
+                "terdakwa": terdakwa_list,
+                "hakim": hakim_list,
+                "saksi": saksi_list,
+                "penuntut": penuntut_list
+            }
         }
-        
-        return {"pihak_terlibat": pihak_terlibat}
+
+    return details
+
+async def get_putusan_detail(nomor_putusan: str) -> Dict[str, Any]:
+    """
+    Get detailed information from putusan_detail table by nomor_putusan.
     
-    except Exception as e:
-        # if e.code != '42703':
-        print(f"Error getting putusan detail for {nomor_putusan}: {str(e)}")
-        return {"pihak_terlibat": {}}
\ No newline at end of file
+    Args:
+        nomor_putusan: Case number to look up details
+        
+    Returns:
+        Dictionary containing detailed case information
+    """
+    if not nomor_putusan:
+        return {"pihak_terlibat": {}}
+
+    details = await get_putusan_details([nomor_putusan])
+    return details[nomor_putusan]
@@ -0,0 +1,188 @@
+import threading
+import asyncio
+import numpy as np
+from array import array
+from typing import Any, Dict, List, Tuple
+from ..db.database import supabase, async_supabase
+from ..db.fetch import iter_pages, aiter_pages
+from ..db.local_replica import replica
+
+# Dictionary-encoded putusan columns; provinsi is derived from kode_kabupaten
+CATEGORICAL_COLUMNS = ('jenis_kejahatan', 'waktu_kejadian_id', 'lokasi_kejadian_id', 'kode_kabupaten', 'lembaga_peradilan')
+STORE_COLUMNS = ('tahun',) + CATEGORICAL_COLUMNS
+
+# Code of a missing value in every column
+NULL_CODE = -1
+
+class CaseStore:
+    """
+    Compact in-memory copy of the putusan columns used by the analytics endpoints.
+
+    Categorical columns are stored as int32 codes into a per-column dictionary
+    of distinct values and tahun as an int16 array, about 22 bytes per case.
+    The store is loaded once and grown by append() when cases are ingested.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._async_load_lock = None
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._tahun = array('h')
+        self._codes: Dict[str, array] = {column: array('i') for column in CATEGORICAL_COLUMNS}
+        self._values: Dict[str, List[Any]] = {column: [] for column in CATEGORICAL_COLUMNS}
+        self._index: Dict[str, Dict[Any, int]] = {column: {} for column in CATEGORICAL_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._tahun)
+
+    def load(self):
+        """Load every case from the local replica when ready, else from Supabase, replacing the store"""
+        fresh = CaseStore()
+        if replica.ready:
+            fresh._extend(replica.query(f"SELECT {', '.join(STORE_COLUMNS)} FROM putusan"))
+        else:
+            for page in iter_pages(lambda: supabase.table('putusan').select(', '.join(STORE_COLUMNS))):
+                fresh._extend(page)
+        self._replace(fresh)
+
+    async def aload(self):
+        """Load the store with the async client without blocking the event loop"""
+        if replica.ready:
+            await asyncio.to_thread(self.load)
+            return
+
+        fresh = CaseStore()
+        async for page in aiter_pages(lambda: async_supabase.table('putusan').select(', '.join(STORE_COLUMNS))):
+            fresh._extend(page)
+        self._replace(fresh)
+
+    def ensure_loaded(self):
+        """Load the store on first use"""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load()
+
+    async def aensure_loaded(self):
+        """Load the store on first use without blocking the event loop"""
+        if self.loaded:
+            return
+        if self._async_load_lock is None:
+            self._async_load_lock = asyncio.Lock()
+        async with self._async_load_lock:
+            if not self.loaded:
+                await self.aload()
+
+    def append(self, putusan: dict):
+        """Add one newly inserted putusan row"""
+        with self._lock:
+            if self.loaded:
+                self._extend([putusan])
+
+    def tahun(self) -> np.ndarray:
+        """Copy of the tahun column (NULL_CODE where missing)"""
+        with self._lock:
+            return np.array(self._tahun, dtype=np.int16)
+
+    def codes(self, column: str) -> Tuple[np.ndarray, List[Any]]:
+        """
+        Copy of a categorical column.
+
+        Returns:
+            Tuple of (int32 codes, NULL_CODE where missing; distinct values indexed by code)
+        """
+        with self._lock:
+            return np.array(self._codes[column], dtype=np.int32), list(self._values[column])
+
+    def distinct(self, column: str) -> List[Any]:
+        """Distinct non-null values present in a column"""
+        if column == 'tahun':
+            years = np.unique(self.tahun())
+            return [int(year) for year in years if year != NULL_CODE]
+
+        codes, values = self.codes(column)
+        present = np.unique(codes)
+        return [values[code] for code in present if code != NULL_CODE]
+
+    def count_by(self, columns: Tuple[str, ...]) -> Dict[tuple, int]:
+        """
+        Count cases per combination of column values in one vectorized pass.
+
+        Args:
+            columns: Store columns to group by
+
+        Returns:
+            Dictionary mapping value tuples (None for missing) to case counts
+        """
+        with self._lock:
+            if not len(self._tahun):
+                return {}
+
+            # Dense per-column codes combined into one mixed-radix int64 key
+            dense = []
+            lookups = []
+            for column in columns:
+                if column == 'tahun':
+                    raw = np.array(self._tahun, dtype=np.int32)
+                    decode = lambda value: None if value == NULL_CODE else int(value)
+                else:
+                    raw = np.array(self._codes[column], dtype=np.int32)
+                    values = self._values[column]
+                    decode = lambda value, values=values: None if value == NULL_CODE else values[value]
+                uniques, inverse = np.unique(raw, return_inverse=True)
+                dense.append(inverse.astype(np.int64))
+                lookups.append([decode(value) for value in uniques])
+
+        key = np.zeros(len(dense[0]), dtype=np.int64)
+        for codes, lookup in zip(dense, lookups):
+            key = key * len(lookup) + codes
+        keys, counts = np.unique(key, return_counts=True)
+
+        groups = {}
+        for combined, count in zip(keys.tolist(), counts.tolist()):
+            group = []
+            for lookup in reversed(lookups):
+                combined, position = divmod(combined, len(lookup))
+                group.append(lookup[position])
+            groups[tuple(reversed(group))] = count
+        return groups
+
+    def _extend(self, rows: List[dict]):
+        """Encode and append rows (caller holds the lock or owns the store)"""
+        for row in rows:
+            tahun = row.get('tahun')
+            self._tahun.append(int(tahun) if str(tahun).strip().isdigit() else NULL_CODE)
+            for column in CATEGORICAL_COLUMNS:
+                self._codes[column].append(self._encode(column, row.get(column)))
+
+    def _encode(self, column: str, value: Any) -> int:
+        if value is None or value == '':
+            return NULL_CODE
+        if column == 'kode_kabupaten':
+            value = str(value)
+        index = self._index[column]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self._values[column])
+            self._values[column].append(value)
+        return code
+
+    def _replace(self, fresh: "CaseStore"):
+        with self._lock:
+            self._tahun = fresh._tahun
+            self._codes = fresh._codes
+            self._values = fresh._values
+            self._index = fresh._index
+            self.loaded = True
+
+case_store = CaseStore()
+
+def _on_replica_change(changed):
+    """Reload the store when a replica sync brought new or changed cases"""
+    if case_store.loaded and 'putusan' in changed:
+        case_store.load()
+
+replica.add_listener(_on_replica_change)
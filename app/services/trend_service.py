@@ -1,4 +1,8 @@
-from typing import Dict, Any
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+# Dimensions reported by /api/trends, in response order
+TREND_DIMENSIONS = ('jenis_kejahatan', 'waktu_kejadian', 'lokasi_kejadian', 'wilayah')
 
 def calculate_stats(data_dict: Dict[str, int]) -> Dict[str, Any]:
     """
@@ -27,3 +31,88 @@ def calculate_stats(data_dict: Dict[str, int]) -> Dict[str, Any]:
         "terendah": {"nama": min_item[0], "jumlah": min_item[1]},
         "rata_rata": round(avg, 2)
     }
+
+# Cube attributes needed to build a trend frame, in cell tuple order
+TREND_CUBE_GROUPS = (
+    'tahun', 'jenis_kejahatan', 'waktu_kejadian', 'nama_lokasi',
+    'kode_provinsi', 'nama_kabupaten', 'nama_provinsi'
+)
+
+def build_trend_frame(cells: Dict[tuple, int], provinsi: Optional[str]) -> pd.DataFrame:
+    """
+    Turn crime cube rollup cells into one column per trend dimension.
+
+    Args:
+        cells: Output of crime_cube.rollup(TREND_CUBE_GROUPS, ...)
+        provinsi: Province code filter; wilayah then holds kabupaten names of that province
+
+    Returns:
+        DataFrame with tahun, one column per dimension and the cell count as jumlah
+    """
+    def wilayah(kode_provinsi, nama_kabupaten, nama_provinsi):
+        if provinsi:
+            return nama_kabupaten if kode_provinsi == provinsi else None
+        return nama_provinsi
+
+    keys = list(cells.keys())
+    return pd.DataFrame({
+        'tahun': [str(key[0]) for key in keys],
+        'jenis_kejahatan': [key[1] or None for key in keys],
+        'waktu_kejadian': [key[2] or None for key in keys],
+        'lokasi_kejadian': [key[3] or None for key in keys],
+        'wilayah': [wilayah(*key[4:]) or None for key in keys],
+        'jumlah': list(cells.values()),
+    }, dtype=object)
+
+def aggregate_trends(frame: pd.DataFrame, labels: List[str]) -> Dict[str, Any]:
+    """
+    Build every year x dimension count matrix and total in one grouped pass.
+
+    Args:
+        frame: Output of build_trend_frame (jumlah may hold counts above 1)
+        labels: Year labels (as strings) for the trend series
+
+    Returns:
+        Dictionary with total_records, tahun series, datasets and details per dimension
+    """
+    frame = frame.astype({'jumlah': 'int64'})
+
+    # One groupby over the long (dimensi, label, tahun) layout covers all dimensions
+    long_frame = frame.melt(
+        id_vars=['tahun', 'jumlah'],
+        value_vars=list(TREND_DIMENSIONS),
+        var_name='dimensi',
+        value_name='label'
+    ).dropna(subset=['label'])
+    counts = long_frame.groupby(['dimensi', 'label', 'tahun'], sort=False)['jumlah'].sum()
+    present = set(counts.index.get_level_values('dimensi'))
+
+    datasets = {}
+    details = {}
+    for dimensi in TREND_DIMENSIONS:
+        label_order = list(set(frame[dimensi].dropna().tolist()))
+        if dimensi not in present:
+            datasets[dimensi] = []
+            details[dimensi] = {}
+            continue
+
+        dimension_counts = counts.xs(dimensi, level='dimensi')
+        matrix = dimension_counts.unstack('tahun', fill_value=0).reindex(
+            index=label_order, columns=labels, fill_value=0
+        )
+        totals = dimension_counts.groupby(level='label').sum()
+
+        datasets[dimensi] = [
+            {"label": label, "data": [int(count) for count in row]}
+            for label, row in zip(label_order, matrix.to_numpy().tolist())
+        ]
+        details[dimensi] = {label: int(totals[label]) for label in label_order}
+
+    year_totals = frame.groupby('tahun', sort=False)['jumlah'].sum().reindex(labels, fill_value=0)
+
+    return {
+        "total_records": int(frame['jumlah'].sum()),
+        "tahun": [int(count) for count in year_totals.tolist()],
+        "datasets": datasets,
+        "details": details
+    }
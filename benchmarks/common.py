@@ -0,0 +1,174 @@
+"""
+Shared setup of the benchmark scripts.
+
+Run the scripts from the repository root, e.g. `python benchmarks/extract_bench.py`.
+"""
+import os
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup_path():
+    """Make the app importable both as the `app` package and from inside app/"""
+    for path in (ROOT, os.path.join(ROOT, 'app')):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+def setup_offline():
+    """
+    Placeholder credentials for benchmarks that never reach Supabase or the LLM.
+
+    The API clients are created at import time and need a URL and key, but
+    connect only when a query is sent.
+    """
+    os.environ.setdefault('SUPABASE_URL', 'http://localhost:54321')
+    os.environ.setdefault('SUPABASE_KEY', 'eyJhbGciOiJIUzI1NiJ9.e30.benchmark')
+    os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+
+def make_putusan(count: int, seed: int = 0) -> List[dict]:
+    """Putusan rows with the columns read by the API, ordered by id"""
+    rnd = random.Random(seed)
+    return [
+        {
+            'id': f'{i:08d}',
+            'nomor_putusan': f'{i}/Pid.B/{2010 + i % 15}/PN Bdg',
+            'judul_putusan': f'Putusan PN Bandung Nomor {i}/Pid.B/{2010 + i % 15}/PN Bdg',
+            'jenis_kejahatan': rnd.choice(['Narkotika', 'Pencurian', 'Penipuan', 'Korupsi', 'Penganiayaan']),
+            'lembaga_peradilan': rnd.choice(['PN Bandung', 'PN Surabaya', 'PN Banda Aceh']),
+            'tahun': 2010 + i % 15,
+            'tanggal_dibacakan': f'{2010 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}',
+            'lama_tahanan': None,
+            'status_tahanan': rnd.choice(['Ditahan', 'Tidak Ditahan']),
+            'vonis_hukuman': None,
+            'hasil_putusan': None,
+            'waktu_kejadian_id': rnd.choice(['w1', 'w2']),
+            'lokasi_kejadian_id': rnd.choice(['l1', 'l2']),
+            'kode_kabupaten': rnd.choice(['3273', '3578', '1171']),
+            'updated_at': '2024-01-01 00:00:00'
+        }
+        for i in range(count)
+    ]
+
+DIMENSION_TABLES = {
+    'provinsi': [
+        {'kode_provinsi': '32', 'nama_provinsi': 'Jawa Barat'},
+        {'kode_provinsi': '35', 'nama_provinsi': 'Jawa Timur'},
+        {'kode_provinsi': '11', 'nama_provinsi': 'Aceh'},
+    ],
+    'kabupaten': [
+        {'kode_kabupaten': '3273', 'nama_kabupaten': 'Kota Bandung', 'kode_provinsi': '32', 'provinsi': {'nama_provinsi': 'Jawa Barat'}},
+        {'kode_kabupaten': '3578', 'nama_kabupaten': 'Kota Surabaya', 'kode_provinsi': '35', 'provinsi': {'nama_provinsi': 'Jawa Timur'}},
+        {'kode_kabupaten': '1171', 'nama_kabupaten': 'Kota Banda Aceh', 'kode_provinsi': '11', 'provinsi': {'nama_provinsi': 'Aceh'}},
+    ],
+    'waktu_kejadian': [{'id': 'w1', 'waktu_kejadian': 'Pagi'}, {'id': 'w2', 'waktu_kejadian': 'Malam'}],
+    'lokasi_kejadian': [{'id': 'l1', 'nama_lokasi': 'Rumah'}, {'id': 'l2', 'nama_lokasi': 'Jalan Umum'}],
+}
+
+class SimulatedPostgrest:
+    """
+    PostgREST stand-in on localhost for benchmarks that must not depend on a live project.
+
+    Serves GET and HEAD on /rest/v1/<table> from in-memory rows with offset/limit
+    paging capped at max_rows, eq/in/gte/lte filters, top-level select columns and
+    Prefer: count=exact. Every request sleeps `latency` seconds to stand in for the
+    network round trip and query time; requests are served on concurrent threads.
+    """
+
+    def __init__(self, tables: Dict[str, List[dict]], latency: float = 0.03, max_rows: int = 1000):
+        self.tables = tables
+        self.latency = latency
+        self.max_rows = max_rows
+        self.requests = 0
+        self._lock = threading.Lock()
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                simulator._respond(self, body=True)
+
+            def do_HEAD(self):
+                simulator._respond(self, body=False)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def start(self) -> 'SimulatedPostgrest':
+        threading.Thread(target=self.server.serve_forever, name='simulated-postgrest', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _respond(self, handler: BaseHTTPRequestHandler, body: bool):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+        url = urlsplit(handler.path)
+        rows = self.tables.get(url.path.rsplit('/', 1)[-1], [])
+        offset, limit, columns = 0, None, None
+        for name, value in parse_qsl(url.query):
+            if name == 'offset':
+                offset = int(value)
+            elif name == 'limit':
+                limit = int(value)
+            elif name == 'select':
+                # "alias:column" and embedded "table(columns)" keep their first name as the key
+                columns = [column.split('(')[0].strip().partition(':')[::2] for column in value.split(',')]
+            elif name not in ('order', 'or', 'and') and '.' in value:
+                rows = self._filter(rows, name, *value.split('.', 1))
+
+        total = len(rows)
+        limit = min(limit if limit is not None else self.max_rows, self.max_rows)
+        page = rows[offset:offset + limit]
+        if columns and ('*', '') not in columns:
+            page = [
+                {alias: row[column or alias] for alias, column in columns if (column or alias) in row}
+                for row in page
+            ]
+
+        payload = json.dumps(page).encode() if body else b''
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        end = offset + len(page) - 1
+        handler.send_header('Content-Range', f'{offset}-{end}/{total}' if page else f'*/{total}')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        if body:
+            handler.wfile.write(payload)
+
+    @staticmethod
+    def _filter(rows: List[dict], column: str, operator: str, value: str) -> List[dict]:
+        if operator == 'eq':
+            return [row for row in rows if str(row.get(column)) == value]
+        if operator == 'in':
+            values = {item.strip('"') for item in value.strip('()').split(',')}
+            return [row for row in rows if str(row.get(column)) in values]
+        if operator in ('gte', 'lte'):
+            bound = float(value)
+            keep = (lambda x: x >= bound) if operator == 'gte' else (lambda x: x <= bound)
+            return [row for row in rows if row.get(column) is not None and keep(float(row[column]))]
+        return rows
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, object]:
+    """Fastest wall time in seconds of `repeat` calls of fn, with the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
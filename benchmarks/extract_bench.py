@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of the compiled column extractors in app/cores/extract.py.
+
+Compares, per row of Supabase-shaped putusan results:
+- the original get_nested_value (path split and dict probing on every call)
+  against extract_column for a nested path, as used by group_and_count;
+- per-field dict lookups against compile_record for a flat search result row.
+
+Usage: python benchmarks/extract_bench.py [--rows 200000]
+"""
+import argparse
+import random
+
+from common import best_of, setup_offline, setup_path
+
+setup_path()
+setup_offline()
+
+from app.cores.extract import compile_record, extract_column
+
+RESULT_FIELDS = (
+    'id', 'nomor_putusan', 'judul_putusan', 'jenis_kejahatan', 'lembaga_peradilan', 'tahun',
+    'tanggal_putusan', 'status_tahanan', 'lama_tahanan', 'vonis_hukuman', 'hasil_putusan', 'kode_kabupaten'
+)
+
+def legacy_get_nested_value(obj: dict, path: str):
+    """get_nested_value as it was before the extractors"""
+    keys = path.split('.')
+    for key in keys:
+        if obj is None or not isinstance(obj, dict):
+            return None
+        obj = obj.get(key, {})
+    return obj if obj != {} else None
+
+def make_rows(count: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        kode_provinsi = rnd.choice(['11', '32', '35'])
+        row = {field: f'{field}-{i}' for field in RESULT_FIELDS}
+        row['tahun'] = rnd.randint(2010, 2024)
+        row['kabupaten'] = None if rnd.random() < 0.05 else {
+            'nama_kabupaten': f'Kab {kode_provinsi}-{rnd.randint(1, 30)}',
+            'kode_provinsi': kode_provinsi,
+            'provinsi': {'nama_provinsi': f'Provinsi {kode_provinsi}'}
+        }
+        rows.append(row)
+    return rows
+
+def report(name: str, rows: int, legacy: float, compiled: float):
+    print(
+        f"{name:<32} legacy {legacy / rows * 1e9:7.1f} ns/row   "
+        f"compiled {compiled / rows * 1e9:7.1f} ns/row   speedup {legacy / compiled:4.1f}x"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+
+    for path in ('kabupaten.nama_kabupaten', 'kabupaten.provinsi.nama_provinsi'):
+        legacy, expected = best_of(lambda: [legacy_get_nested_value(row, path) for row in rows], args.repeat)
+        compiled, actual = best_of(lambda: extract_column(rows, path), args.repeat)
+        assert actual == expected
+        report(path, args.rows, legacy, compiled)
+
+    record = compile_record(RESULT_FIELDS)
+    legacy, expected = best_of(lambda: [tuple([row.get(field) for field in RESULT_FIELDS]) for row in rows], args.repeat)
+    compiled, actual = best_of(lambda: list(map(record, rows)), args.repeat)
+    assert actual == expected
+    report(f'{len(RESULT_FIELDS)}-field record', args.rows, legacy, compiled)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Wall time of reading a whole putusan select against table size, in app/db/fetch.py.
+
+Runs against a simulated PostgREST on localhost (see SimulatedPostgrest) with a
+fixed latency per request and the Supabase max-rows cap, and compares:
+- one .execute() of the whole select, which is truncated at max-rows;
+- fetch_all with one window in flight (sequential .range() paging);
+- fetch_all with FETCH_WORKERS windows in flight;
+and reports the traced peak memory of streaming iter_pages against fetch_all.
+
+Usage: python benchmarks/fetch_bench.py [--sizes 1000,5000,20000,50000] [--latency 0.03]
+"""
+import argparse
+import os
+import tracemalloc
+
+from common import SimulatedPostgrest, best_of, make_putusan, setup_offline, setup_path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,5000,20000,50000')
+    parser.add_argument('--latency', type=float, default=0.03, help='Seconds per request')
+    parser.add_argument('--max-rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    table = make_putusan(max(sizes))
+    server = SimulatedPostgrest({'putusan': table}, latency=args.latency, max_rows=args.max_rows).start()
+    os.environ['SUPABASE_URL'] = server.url
+    os.environ['SUPABASE_MAX_ROWS'] = str(args.max_rows)
+    setup_path()
+    setup_offline()
+
+    from app.db.database import supabase
+    from app.db.fetch import FETCH_WORKERS, fetch_all, iter_pages
+
+    columns = 'id, jenis_kejahatan, tahun, kode_kabupaten'
+    print(f"latency {args.latency * 1000:.0f} ms/request, max-rows {args.max_rows}, FETCH_WORKERS {FETCH_WORKERS}")
+    print(f"{'rows':>8} {'execute':>16} {'fetch_all x1':>14} {f'fetch_all x{FETCH_WORKERS}':>14} {'speedup':>8} "
+          f"{'peak iter_pages':>16} {'peak fetch_all':>15}")
+
+    try:
+        for size in sizes:
+            server.tables['putusan'] = table[:size]
+            build = lambda: supabase.table('putusan').select(columns)
+
+            single, result = best_of(lambda: build().execute(), args.repeat)
+            sequential, rows = best_of(lambda: fetch_all(build, max_workers=1), args.repeat)
+            assert len(rows) == size
+            concurrent, rows = best_of(lambda: fetch_all(build), args.repeat)
+            assert [row['id'] for row in rows] == [row['id'] for row in table[:size]]
+
+            tracemalloc.start()
+            streamed = sum(len(page) for page in iter_pages(build))
+            streaming_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert streamed == size
+
+            tracemalloc.start()
+            fetch_all(build)
+            fetch_all_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(
+                f"{size:>8} {single:>6.3f}s {len(result.data):>5} rows {sequential:>13.3f}s {concurrent:>13.3f}s "
+                f"{sequential / concurrent:>7.1f}x {streaming_peak / 2 ** 20:>13.1f} MB {fetch_all_peak / 2 ** 20:>12.1f} MB"
+            )
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Load test of /api/search: throughput against the number of concurrent clients.
+
+The app runs in process behind httpx's ASGI transport and reads from a simulated
+PostgREST on localhost (see SimulatedPostgrest) with a fixed latency per request.
+Each search sends the count, page and putusan_detail queries of the remote path.
+For comparison the same queries are also served by a route that calls the
+synchronous supabase client inside `async def`, as the routes did before the
+async data access layer: every query blocks the event loop, so its throughput
+stays flat however many clients there are.
+
+Usage: python benchmarks/load_test.py [--clients 1,2,4,8,16,32] [--requests 10] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from common import DIMENSION_TABLES, SimulatedPostgrest, make_putusan, setup_offline, setup_path
+
+SEARCH_URL = '/api/search?sort=tanggal&limit=20&kabupaten=Kota%20Bandung'
+
+def blocking_app():
+    """One route running the queries of a search page with the synchronous client"""
+    from fastapi import FastAPI
+    from app.db.database import supabase
+    from app.services.search_service import CASE_COLUMNS, DETAIL_COLUMNS
+
+    app = FastAPI()
+
+    @app.get('/api/search')
+    async def search(limit: int = 20, offset: int = 0):
+        codes = ['3273']  # kabupaten=Kota Bandung
+        total = supabase.table('putusan').select('id', count='exact', head=True) \
+            .in_('kode_kabupaten', codes).execute().count
+        rows = supabase.table('putusan').select(CASE_COLUMNS).in_('kode_kabupaten', codes) \
+            .order('tanggal_dibacakan', desc=True).range(offset, offset + limit).execute().data
+        nomor = [row['nomor_putusan'] for row in rows]
+        details = supabase.table('putusan_detail').select(DETAIL_COLUMNS).in_('nomor_putusan', nomor).execute().data
+        return {'total': total, 'data': rows, 'details': len(details)}
+
+    return app
+
+async def drive(app, clients: int, requests: int) -> float:
+    """Requests per second of `clients` concurrent clients sending `requests` searches each"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def session():
+            for _ in range(requests):
+                response = await client.get(SEARCH_URL)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(session() for _ in range(clients)))
+        return clients * requests / (time.perf_counter() - start)
+
+async def run(levels, requests: int):
+    from app.main import app
+    from app.services.dimension_service import dimensions
+
+    await dimensions.aensure_loaded()
+    baseline = blocking_app()
+    await drive(app, 1, 1)
+    await drive(baseline, 1, 1)
+
+    print(f"{'clients':>8} {'async req/s':>12} {'scaling':>8} {'blocking req/s':>15} {'scaling':>8}")
+    first = None
+    for clients in levels:
+        pooled = await drive(app, clients, requests)
+        blocking = await drive(baseline, clients, requests)
+        first = first or (pooled, blocking)
+        print(f"{clients:>8} {pooled:>12.1f} {pooled / first[0]:>7.1f}x {blocking:>15.1f} {blocking / first[1]:>7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', default='1,2,4,8,16,32')
+    parser.add_argument('--requests', type=int, default=10, help='Searches per client at each level')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per PostgREST request')
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    server = SimulatedPostgrest(
+        {**DIMENSION_TABLES, 'putusan': make_putusan(args.rows), 'putusan_detail': []}, latency=args.latency
+    ).start()
+    # The ASGI transport does not run the lifespan, so the replica, search index and
+    # ingestion workers stay off and searches take the remote path
+    os.environ['SUPABASE_URL'] = server.url
+    setup_path()
+    setup_offline()
+
+    print(f"latency {args.latency * 1000:.0f} ms/request, {args.requests} searches per client")
+    try:
+        asyncio.run(run([int(level) for level in args.clients.split(',')], args.requests))
+    finally:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# The app imports its modules both as the `app` package and from inside app/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'app')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# The API clients are created at import time; tests never reach the network
+os.environ.setdefault('SUPABASE_URL', 'http://localhost:54321')
+os.environ.setdefault('SUPABASE_KEY', 'eyJhbGciOiJIUzI1NiJ9.e30.test')
+os.environ.setdefault('GOOGLE_API_KEY', 'test')
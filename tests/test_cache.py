@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.cores import cache as cache_module
+from app.cores.cache import ResultCache, bump_data_version, caches, get_data_version
+
+class Clock:
+    """Stands in for time.monotonic of the cache module"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+@pytest.fixture
+def make_cache(monkeypatch):
+    """Create caches without leaving them in the global registry"""
+    monkeypatch.setattr(cache_module, 'caches', dict(caches))
+
+    def make(maxsize=3, ttl=60):
+        return ResultCache('test', maxsize=maxsize, ttl=ttl)
+    return make
+
+def test_get_counts_hits_and_misses(make_cache, clock):
+    cache = make_cache()
+
+    assert cache.get('a') is None
+    cache.set('a', {'data': 1})
+    assert cache.get('a') == {'data': 1}
+    assert cache.get('a') == {'data': 1}
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate'], stats['size']) == (2, 1, 0.6667, 1)
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.set('a', 1)
+
+    clock.now += 59.9
+    assert cache.get('a') == 1
+    clock.now += 0.1
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(maxsize=3)
+    for key in 'abc':
+        cache.set(key, key)
+
+    # Reading 'a' makes 'b' the least recently used entry
+    assert cache.get('a') == 'a'
+    cache.set('d', 'd')
+
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+    assert cache.stats()['size'] == 3
+
+def test_bumping_the_data_version_invalidates_every_entry(make_cache, clock):
+    first, second = make_cache(), make_cache()
+    first.set('a', 1)
+    second.set('b', 2)
+
+    version = get_data_version()
+    assert bump_data_version() == version + 1
+
+    assert first.get('a') is None
+    assert second.get('b') is None
+
+def test_value_computed_before_a_bump_is_stale(make_cache, clock):
+    cache = make_cache()
+    version = get_data_version()
+    bump_data_version()
+
+    # A response built from the old data is stored after new data arrived
+    cache.set('a', 'old', version=version)
+    assert cache.get('a') is None
+
+    cache.set('a', 'new')
+    assert cache.get('a') == 'new'
+
+def test_clear_resets_entries_and_counters(make_cache, clock):
+    cache = make_cache()
+    cache.set('a', 1)
+    cache.get('a')
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (0, 0, 0)
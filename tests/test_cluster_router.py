@@ -0,0 +1,63 @@
+import random
+from itertools import product
+
+import pytest
+
+from app.routers.cluster_router import slice_cluster_data
+from app.services.cluster_service import kabupaten_counts
+from app.services.cube_service import crime_cube
+from app.services.dimension_service import dimensions
+
+KABUPATEN = [
+    {'kode_kabupaten': '3273', 'nama_kabupaten': 'Kota Bandung', 'kode_provinsi': '32', 'provinsi': {'nama_provinsi': 'Jawa Barat'}},
+    {'kode_kabupaten': '3204', 'nama_kabupaten': 'Kabupaten Bandung', 'kode_provinsi': '32', 'provinsi': {'nama_provinsi': 'Jawa Barat'}},
+    {'kode_kabupaten': '3578', 'nama_kabupaten': 'Kota Surabaya', 'kode_provinsi': '35', 'provinsi': {'nama_provinsi': 'Jawa Timur'}},
+    {'kode_kabupaten': '1171', 'nama_kabupaten': 'Kota Banda Aceh', 'kode_provinsi': '11', 'provinsi': {'nama_provinsi': 'Aceh'}},
+]
+JENIS = ['Narkotika', 'Pencurian', 'Korupsi', None]
+YEARS = [2019, 2020, 2021, None]
+# '9999' is not in the kabupaten table, so its cases are never counted
+KODE = ['3273', '3204', '3578', '1171', '9999', None]
+
+@pytest.fixture
+def cube(monkeypatch):
+    """Crime cube over random cells, with the dimensions loaded from KABUPATEN"""
+    rnd = random.Random(0)
+    cells = {}
+    for _ in range(400):
+        key = (rnd.choice(YEARS), rnd.choice(JENIS), None, None, rnd.choice(KODE))
+        cells[key] = cells.get(key, 0) + rnd.randint(1, 5)
+
+    for name in ('_waktu', '_lokasi', '_kabupaten'):
+        monkeypatch.setattr(dimensions, name, {})
+    monkeypatch.setattr(dimensions, 'loaded', False)
+    dimensions._set([], [], KABUPATEN)
+    monkeypatch.setattr(crime_cube, '_cells', cells)
+    monkeypatch.setattr(crime_cube, '_built', True)
+    return crime_cube
+
+def per_combination(jenis_kejahatan, tahun, provinsi):
+    """What /api/cluster counts for one combination"""
+    cells = crime_cube.rollup(
+        ('kabupaten', 'nama_kabupaten'), tahun=tahun, jenis_kejahatan=jenis_kejahatan, kode_provinsi=provinsi
+    )
+    return kabupaten_counts(cells.items())
+
+def test_slice_cluster_data_matches_per_combination_rollups(cube):
+    combinations = list(product(
+        ['Narkotika', 'Pencurian', 'Penipuan', None],
+        [2019, 2021, 2030, None],
+        ['32', '35', '99', None]
+    ))
+
+    assert slice_cluster_data(combinations) == [per_combination(*combination) for combination in combinations]
+
+def test_slice_cluster_data_keeps_request_order_and_duplicates(cube):
+    combinations = [('Korupsi', None, '32'), (None, None, None), ('Korupsi', None, '32'), ('Penipuan', 2020, None)]
+
+    results = slice_cluster_data(combinations)
+
+    assert results == [per_combination(*combination) for combination in combinations]
+    assert results[0] == results[2]
+    assert results[1][1] == sum(count for key, count in cube._cells.items() if key[4] not in ('9999', None))
+    assert results[3] == ([], 0)
@@ -0,0 +1,73 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+from sklearn.metrics import silhouette_score
+
+from app.services.cluster_service import optimal_1d_clusterings, optimal_1d_clusters, silhouette_1d
+
+def sse(values, labels):
+    """Within-cluster sum of squares"""
+    return sum(((values[labels == c] - values[labels == c].mean()) ** 2).sum() for c in np.unique(labels))
+
+def brute_force_sse(values, k):
+    """Minimum SSE over every split of the sorted values into k contiguous segments"""
+    xs = np.sort(values)
+    best = np.inf
+    for cuts in itertools.combinations(range(1, len(xs)), k - 1):
+        bounds = (0,) + cuts + (len(xs),)
+        best = min(best, sum(((xs[i:j] - xs[i:j].mean()) ** 2).sum() for i, j in zip(bounds, bounds[1:])))
+    return best
+
+def make_values(count, seed):
+    rnd = random.Random(seed)
+    return np.array([rnd.choice([rnd.randint(0, 20), rnd.random() * 100]) for _ in range(count)])
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('k', [2, 3, 4])
+def test_optimal_1d_clusters_matches_brute_force(seed, k):
+    values = make_values(9, seed)
+    labels = optimal_1d_clusters(values, k)
+
+    assert sse(values, labels) == pytest.approx(brute_force_sse(values, k), abs=1e-9)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_optimal_1d_clusters_are_ordered_segments(seed):
+    values = make_values(40, seed)
+    labels = optimal_1d_clusters(values, 3)
+
+    # Label 0 is the lowest segment and every cluster is a contiguous range of values
+    sorted_labels = labels[np.argsort(values, kind='stable')]
+    assert list(sorted_labels) == sorted(sorted_labels)
+    assert set(labels) == {0, 1, 2}
+
+def test_optimal_1d_clusters_single_value():
+    assert list(optimal_1d_clusters([5.0], 3)) == [0]
+
+@pytest.mark.parametrize('seed', range(10))
+def test_optimal_1d_clusterings_matches_brute_force_for_every_k(seed):
+    values = make_values(9, seed)
+    clusterings = optimal_1d_clusterings(values, 5)
+
+    assert len(clusterings) == 5
+    for k, labels in enumerate(clusterings, start=1):
+        assert len(set(labels)) == k
+        assert sse(values, labels) == pytest.approx(brute_force_sse(values, k), abs=1e-9)
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('k', [2, 3, 5])
+def test_silhouette_1d_matches_sklearn(seed, k):
+    values = make_values(60, seed)
+    labels = np.random.default_rng(seed).integers(0, k, len(values))
+
+    expected = silhouette_score(values.reshape(-1, 1), labels)
+    assert silhouette_1d(values, labels) == pytest.approx(expected, abs=1e-9)
+
+def test_silhouette_1d_singleton_clusters_match_sklearn():
+    values = np.array([0.0, 1.0, 1.5, 10.0, 30.0, 31.0])
+    labels = np.array([0, 0, 0, 1, 2, 2])
+
+    expected = silhouette_score(values.reshape(-1, 1), labels)
+    assert silhouette_1d(values, labels) == pytest.approx(expected, abs=1e-9)
+    assert silhouette_1d(values, np.zeros(len(values), dtype=int)) == 0.0
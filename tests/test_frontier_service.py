@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import scrap_service
+from app.services.scrap_service import ListingPageError, crawl_putusan
+from app.services.frontier_service import (
+    URL_DISCOVERED, URL_EXTRACTED, URL_FAILED, URL_FETCHED, URL_SKIPPED, URL_STORED, CrawlFrontier
+)
+
+BASE_URL = 'https://putusan3.mahkamahagung.go.id/direktori/index/pengadilan/pn-bandung'
+
+def page_links(page, count=3):
+    return {f'{BASE_URL}/putusan/{page}-{i}': f'{page}{i}/Pid.B/2024/PN Bdg' for i in range(count)}
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'frontier.sqlite3')
+
+def test_new_crawl_starts_at_page_start(path):
+    frontier = CrawlFrontier(path)
+
+    assert frontier.begin(BASE_URL, 2, 10) == 2
+    assert frontier.pending(BASE_URL) == []
+
+def test_partial_crawl_resumes_after_last_listed_page(path):
+    frontier = CrawlFrontier(path)
+    frontier.begin(BASE_URL, 1, 10)
+    first, second = page_links(1), page_links(2)
+    frontier.record_page(BASE_URL, 1, first)
+    frontier.record_page(BASE_URL, 2, second)
+
+    # Some cases got through the pipeline before the process stopped
+    done, skipped, extracted, fetched = list(first)[:2] + list(second)[:2]
+    frontier.mark(done, URL_STORED)
+    frontier.mark(skipped, URL_SKIPPED)
+    frontier.mark(extracted, URL_EXTRACTED, '999/Pid.B/2024/PN Bdg')
+    frontier.mark(fetched, URL_FETCHED)
+
+    # A new process opens the same file
+    resumed = CrawlFrontier(path)
+    assert resumed.begin(BASE_URL, 1, 10) == 3
+    assert resumed.pending(BASE_URL) == [list(first)[2], extracted, fetched, list(second)[2]]
+    assert resumed.finished([*first, *second]) == {done, skipped}
+    assert resumed.state(list(second)[2]) == URL_DISCOVERED
+    assert resumed.state('https://elsewhere') is None
+
+def test_pages_are_not_listed_twice(path):
+    frontier = CrawlFrontier(path)
+    frontier.begin(BASE_URL, 1, None)
+    links = page_links(1)
+    frontier.record_page(BASE_URL, 1, links)
+    frontier.mark(next(iter(links)), URL_STORED)
+
+    # Listing the page again keeps the state of URLs already seen
+    frontier.record_page(BASE_URL, 1, links)
+    assert len(frontier.pending(BASE_URL)) == 2
+    assert frontier.begin(BASE_URL, 1, None) == 2
+
+def test_failed_urls_are_retried_up_to_max_attempts(path):
+    frontier = CrawlFrontier(path, max_attempts=2)
+    frontier.begin(BASE_URL, 1, 1)
+    url = next(iter(page_links(1, 1)))
+    frontier.record_page(BASE_URL, 1, {url: None})
+
+    frontier.mark(url, URL_FAILED)
+    assert frontier.pending(BASE_URL) == [url]
+    frontier.mark(url, URL_FAILED)
+    assert frontier.pending(BASE_URL) == []
+
+def test_completed_crawl_starts_over(path):
+    frontier = CrawlFrontier(path)
+    frontier.begin(BASE_URL, 1, 5)
+    frontier.record_page(BASE_URL, 3, page_links(3))
+    frontier.complete(BASE_URL)
+
+    assert frontier.begin(BASE_URL, 1, 5) == 1
+
+def test_other_page_range_starts_a_new_crawl(path):
+    frontier = CrawlFrontier(path)
+    frontier.begin(BASE_URL, 1, 5)
+    frontier.record_page(BASE_URL, 1, page_links(1))
+
+    assert frontier.begin(BASE_URL, 1, 20) == 1
+    # URLs already seen keep their state
+    assert len(frontier.pending(BASE_URL)) == 3
+
+@pytest.fixture
+def directory(monkeypatch, path):
+    """
+    crawl_putusan over a fake five-page directory, with a fresh frontier.
+
+    Listing pages in `failing` raise once (`listed` records the pages fetched);
+    processing stores every case except those in `unprocessed`, which the
+    pipeline never reached.
+    """
+    frontier = CrawlFrontier(path)
+    state = SimpleNamespace(frontier=frontier, failing=set(), unprocessed=set(), listed=[], processed=[])
+
+    def get_page_links(base_url, page):
+        if page > 5:
+            return None
+        if page in state.failing:
+            state.failing.discard(page)
+            raise ConnectionError('timeout')
+        state.listed.append(page)
+        return page_links(page, 2)
+
+    def process_all_putusan(links, on_result=None, cancelled=None, label=''):
+        for link in links:
+            if link in state.unprocessed:
+                continue
+            state.processed.append(link)
+            frontier.mark(link, URL_STORED)
+
+    monkeypatch.setattr(scrap_service, 'crawl_frontier', frontier)
+    monkeypatch.setattr(scrap_service, 'get_page_links', get_page_links)
+    monkeypatch.setattr(scrap_service, 'known_putusan', lambda links: set())
+    monkeypatch.setattr(scrap_service, 'process_all_putusan', process_all_putusan)
+    monkeypatch.setattr(scrap_service, 'search_index', SimpleNamespace(flush=lambda: None))
+    monkeypatch.setattr(scrap_service.crawler, 'concurrency', 1)
+    return state
+
+def test_crawl_resumes_after_failed_listing_page(directory):
+    directory.failing = {3}
+    late = list(page_links(2, 2))[1]
+    directory.unprocessed = {late}
+
+    with pytest.raises(ListingPageError):
+        crawl_putusan(BASE_URL, 1, 5)
+
+    # Cases of the pages before the failure were processed, the crawl is not complete
+    assert directory.processed == [link for page in (1, 2) for link in page_links(page, 2) if link != late]
+    assert directory.frontier.pending(BASE_URL) == [late]
+
+    directory.unprocessed = set()
+    directory.listed, directory.processed = [], []
+    crawl_putusan(BASE_URL, 1, 5)
+
+    # Only the failed page onwards is listed again, and only unfinished cases are processed
+    assert directory.listed == [3, 4, 5]
+    assert directory.processed == [late] + [link for page in (3, 4, 5) for link in page_links(page, 2)]
+    assert directory.frontier.pending(BASE_URL) == []
+    assert directory.frontier.begin(BASE_URL, 1, 5) == 1
@@ -0,0 +1,104 @@
+import pytest
+
+from app.services.job_service import (
+    JOB_CANCELLED, JOB_DONE, JOB_QUEUED, JOB_RUNNING, JobQueue
+)
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / 'jobs.sqlite3'), stale_after=60)
+
+def age_heartbeat(queue, job_id):
+    """Make the heartbeat of a job look older than stale_after"""
+    connection = queue.connect()
+    try:
+        connection.execute("UPDATE jobs SET heartbeat_at = '2000-01-01 00:00:00' WHERE id = ?", (job_id,))
+    finally:
+        connection.close()
+
+def test_claim_takes_the_oldest_queued_job(queue):
+    first = queue.submit('https://example/a', page_start=1, page_end=2)
+    second = queue.submit('https://example/b', incremental=True)
+
+    job = queue.claim('worker-a')
+    assert job['id'] == first['id']
+    assert (job['status'], job['owner']) == (JOB_RUNNING, 'worker-a')
+    assert job['started_at'] and job['heartbeat_at']
+
+    job = queue.claim('worker-b')
+    assert job['id'] == second['id'] and job['incremental'] is True
+    assert queue.claim('worker-c') is None
+
+def test_live_job_of_another_worker_is_not_requeued(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+
+    # A second uvicorn worker opens the same file and polls for work
+    other = JobQueue(queue.path, stale_after=60)
+    assert other.claim('worker-b') is None
+    assert other.get(job['id'])['owner'] == 'worker-a'
+    assert other.get(job['id'])['status'] == JOB_RUNNING
+
+def test_stale_job_is_requeued_and_claimed_again(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+    age_heartbeat(queue, job['id'])
+
+    job = JobQueue(queue.path, stale_after=60).claim('worker-b')
+    assert job is not None and job['owner'] == 'worker-b'
+    assert job['status'] == JOB_RUNNING
+
+def test_heartbeat_keeps_a_job_alive(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+    age_heartbeat(queue, job['id'])
+
+    queue.heartbeat('worker-a')
+    assert queue.claim('worker-b') is None
+    assert queue.get(job['id'])['owner'] == 'worker-a'
+
+def test_release_queues_the_job_again(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+
+    # Only the owner can release it
+    queue.release(job['id'], 'worker-b')
+    assert queue.get(job['id'])['status'] == JOB_RUNNING
+    queue.release(job['id'], 'worker-a')
+    released = queue.get(job['id'])
+    assert (released['status'], released['owner'], released['heartbeat_at']) == (JOB_QUEUED, None, None)
+
+def test_cancel_queued_job_is_immediate(queue):
+    job = queue.submit('https://example/a')
+
+    cancelled = queue.cancel(job['id'])
+    assert cancelled['status'] == JOB_CANCELLED and cancelled['cancel_requested'] is True
+    assert cancelled['finished_at']
+    assert queue.claim('worker-a') is None
+    assert queue.cancel('missing') is None
+
+def test_cancel_running_job_is_requested(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+
+    assert queue.cancel(job['id'])['status'] == JOB_RUNNING
+    assert queue.cancel_requested(job['id'])
+
+    # A stale job whose cancellation was requested is cancelled, not queued again
+    age_heartbeat(queue, job['id'])
+    assert JobQueue(queue.path, stale_after=60).claim('worker-b') is None
+    assert queue.get(job['id'])['status'] == JOB_CANCELLED
+
+def test_counters_and_finish(queue):
+    job = queue.submit('https://example/a')
+    queue.claim('worker-a')
+    queue.increment(job['id'], pages=1, cases_found=10)
+    queue.increment(job['id'], cases_saved=7, cases_skipped=2)
+    queue.increment(job['id'], cases_failed=1)
+    queue.finish(job['id'], JOB_DONE)
+
+    job = queue.get(job['id'])
+    assert (job['status'], job['pages'], job['cases_found'], job['cases_processed']) == (JOB_DONE, 1, 10, 10)
+    with pytest.raises(ValueError):
+        queue.increment(job['id'], unknown=1)
+    assert [item['id'] for item in queue.list(JOB_DONE)] == [job['id']]
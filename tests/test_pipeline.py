@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+import pytest
+
+from app.cores.pipeline import Done, Pipeline, Stage, pipelines
+
+class WorkerDied(BaseException):
+    """Escapes the per-item error handling, like a cancelled or killed worker"""
+
+@pytest.fixture
+def make_pipeline():
+    """Create pipelines and unregister them afterwards"""
+    created = []
+
+    def make(name, stages, **kwargs):
+        pipeline = Pipeline(name, stages, **kwargs)
+        created.append(pipeline)
+        return pipeline
+
+    yield make
+    for pipeline in created:
+        pipeline.close()
+    assert not {pipeline.name for pipeline in created} & set(pipelines)
+
+def test_results_follow_input_order(make_pipeline):
+    async def double(value):
+        await asyncio.sleep(0.001 * (value % 3))
+        return value * 2
+
+    pipeline = make_pipeline('order', [Stage('double', double, workers=3), Stage('add', lambda value: value + 1, workers=2)])
+    finished = []
+
+    results = asyncio.run(pipeline.run(range(20), on_result=lambda item, result: finished.append(item)))
+
+    assert results == [value * 2 + 1 for value in range(20)]
+    assert sorted(finished) == list(range(20))
+    assert pipeline.stats()['last']['completed'] == 20
+
+def test_stage_errors_and_done_finish_items_early(make_pipeline):
+    def check(value):
+        if value == 3:
+            raise ValueError('bad item')
+        return Done('skipped') if value == 4 else value
+
+    later = []
+    pipeline = make_pipeline(
+        'errors',
+        [Stage('check', check), Stage('later', lambda value: later.append(value) or value)],
+        on_error=lambda item, error: f'failed: {error}'
+    )
+
+    def on_result(item, result):
+        raise RuntimeError('callback errors are only logged')
+
+    results = asyncio.run(pipeline.run(range(6), on_result=on_result))
+
+    assert results == [0, 1, 2, 'failed: bad item', 'skipped', 5]
+    assert sorted(later) == [0, 1, 2, 5]
+    assert pipeline.stats()['last']['stages'][0]['failed'] == 1
+
+def test_crashed_worker_stops_the_run(make_pipeline):
+    async def store(value):
+        if value == 2:
+            raise WorkerDied()
+        return value
+
+    async def run():
+        pipeline = make_pipeline('crash', [Stage('parse', lambda value: value), Stage('store', store)], queue_size=1)
+        # Without the crash check the parse stage would wait on the full store queue forever
+        await asyncio.wait_for(pipeline.run(range(50)), timeout=5)
+
+    with pytest.raises(WorkerDied):
+        asyncio.run(run())
+
+def test_bounded_queues_hold_back_the_source(make_pipeline):
+    queue_size = 2
+    read = 0
+    completed = 0
+    ahead = []
+
+    def cancelled():
+        # Called by the source before reading each item
+        nonlocal read
+        read += 1
+        ahead.append(read - completed)
+        return False
+
+    def on_result(item, result):
+        nonlocal completed
+        completed += 1
+
+    async def slow(value):
+        await asyncio.sleep(0.005)
+        return value
+
+    pipeline = make_pipeline(
+        'backpressure',
+        [Stage('fast', lambda value: value, workers=2), Stage('slow', slow)],
+        queue_size=queue_size
+    )
+
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run(range(40), on_result=on_result, cancelled=cancelled))
+
+    assert results == list(range(40))
+    # Items between the source and the sink: both queues, one in each worker and the one being read
+    assert max(ahead) <= 2 * queue_size + 3 + 1
+    last = pipeline.stats()['last']
+    assert all(stage['max_queue_depth'] <= queue_size for stage in last['stages'])
+    assert time.perf_counter() - start >= 40 * 0.005
+
+def test_cancelled_stops_reading_items(make_pipeline):
+    pipeline = make_pipeline('cancel', [Stage('noop', lambda value: value)], queue_size=1)
+    seen = []
+
+    results = asyncio.run(pipeline.run(range(10), on_result=lambda item, result: seen.append(item), cancelled=lambda: len(seen) >= 3))
+
+    assert 3 <= len(seen) < 10
+    assert results[len(seen):] == [None] * (10 - len(seen))
@@ -0,0 +1,64 @@
+import base64
+import json
+
+import pytest
+
+from app.services.search_service import apply_cursor, decode_cursor, encode_cursor
+
+CASE_ID = '5b6ca73a-d2c2-4e95-90f9-afe3738db194'
+
+def raw_cursor(value) -> str:
+    """Cursor wrapping any JSON value, encoded like encode_cursor"""
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+class RecordingQuery:
+    """Stands in for a PostgREST builder and records the or_ filter"""
+
+    def __init__(self):
+        self.filters = []
+
+    def or_(self, filters):
+        self.filters.append(filters)
+        return self
+
+@pytest.mark.parametrize('tanggal', ['2024-03-01', '2024-03-01T08:30:00', None])
+def test_cursor_round_trip(tanggal):
+    cursor = encode_cursor({'tanggal_putusan': tanggal, 'id': CASE_ID, 'judul_putusan': 'ignored'})
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (tanggal, CASE_ID)
+
+def test_apply_cursor_builds_keyset_filter():
+    query = apply_cursor(RecordingQuery(), encode_cursor({'tanggal_putusan': '2024-03-01', 'id': CASE_ID}))
+    assert query.filters == [
+        f'tanggal_dibacakan.lt."2024-03-01",'
+        f'and(tanggal_dibacakan.eq."2024-03-01",id.lt."{CASE_ID}"),'
+        f'tanggal_dibacakan.is.null'
+    ]
+
+    query = apply_cursor(RecordingQuery(), encode_cursor({'tanggal_putusan': None, 'id': CASE_ID}))
+    assert query.filters == [f'and(tanggal_dibacakan.is.null,id.lt."{CASE_ID}")']
+
+@pytest.mark.parametrize('cursor', [
+    '',
+    'not base64 !',
+    raw_cursor('2024-03-01'),
+    raw_cursor(['2024-03-01']),
+    raw_cursor(['2024-03-01', CASE_ID, 'extra']),
+    raw_cursor(['2024-03-01', None]),
+    raw_cursor(['2024-03-01', 42]),
+    raw_cursor([20240301, CASE_ID]),
+    raw_cursor(['kemarin', CASE_ID]),
+    raw_cursor(['2024-03-01', 'abc']),
+    raw_cursor(['2024-03-01', CASE_ID.upper()]),
+    raw_cursor(['2024-03-01', '{' + CASE_ID + '}']),
+    # Attempts to close the quoted value and add filter terms
+    raw_cursor(['2024-03-01"),id.gt.(0', CASE_ID]),
+    raw_cursor(['2024-03-01', CASE_ID + '",id.gt."0']),
+    raw_cursor(['2024-03-01', f'{CASE_ID}),status_tahanan.eq.(x']),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match='Cursor tidak valid'):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError, match='Cursor tidak valid'):
+        apply_cursor(RecordingQuery(), cursor)
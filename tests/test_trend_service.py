@@ -0,0 +1,165 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.trend_service import TREND_DIMENSIONS, build_trend_frame, aggregate_trends
+
+PROVINSI = {'32': 'Jawa Barat', '35': 'Jawa Timur', '11': 'Aceh'}
+JENIS = ['Narkotika', 'Pencurian', 'Penipuan', 'Korupsi', '', None]
+WAKTU = ['Pagi', 'Siang', 'Malam', '', None]
+LOKASI = ['Rumah', 'Jalan Umum', 'Pasar', None]
+
+def make_rows(count, provinsi=None, seed=0):
+    """
+    Putusan rows shaped like the select of the original /api/trends.
+
+    With a province filter PostgREST only filters the embedded kabupaten, so rows
+    of other provinces are still returned, with kabupaten set to None.
+    """
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        kode_provinsi = rnd.choice(list(PROVINSI))
+        kabupaten = None
+        if rnd.random() < 0.9 and (not provinsi or kode_provinsi == provinsi):
+            kabupaten = {
+                'nama_kabupaten': f'Kab {kode_provinsi}-{rnd.randint(1, 6)}',
+                'kode_provinsi': kode_provinsi,
+                'provinsi': {'nama_provinsi': PROVINSI[kode_provinsi]}
+            }
+        waktu = rnd.choice(WAKTU)
+        lokasi = rnd.choice(LOKASI)
+        rows.append({
+            'id': str(i),
+            'tahun': rnd.choice([2015, 2018, 2019, 2020, 2021, 2023]),
+            'jenis_kejahatan': rnd.choice(JENIS),
+            'waktu_kejadian': {'waktu_kejadian': waktu} if waktu is not None else None,
+            'lokasi_kejadian': {'nama_lokasi': lokasi} if lokasi is not None else None,
+            'kabupaten': kabupaten
+        })
+    return rows
+
+def legacy_trends(data, labels, provinsi):
+    """Datasets and totals computed by the per-row loops of the original /api/trends"""
+    jenis_kejahatan_list = list(set([
+        item['jenis_kejahatan'] for item in data
+        if item.get('jenis_kejahatan')
+    ]))
+    waktu_kejadian_list = list(set([
+        item['waktu_kejadian']['waktu_kejadian'] for item in data
+        if item.get('waktu_kejadian') and item['waktu_kejadian'].get('waktu_kejadian')
+    ]))
+    lokasi_kejadian_list = list(set([
+        item['lokasi_kejadian']['nama_lokasi'] for item in data
+        if item.get('lokasi_kejadian') and item['lokasi_kejadian'].get('nama_lokasi')
+    ]))
+
+    def jenis_of(item):
+        return item['jenis_kejahatan']
+
+    def waktu_of(item):
+        return item['waktu_kejadian'].get('waktu_kejadian') if item.get('waktu_kejadian') else None
+
+    def lokasi_of(item):
+        return item['lokasi_kejadian'].get('nama_lokasi') if item.get('lokasi_kejadian') else None
+
+    if provinsi:
+        wilayah_list = list(set([
+            item['kabupaten']['nama_kabupaten'] for item in data
+            if item.get('kabupaten') and item['kabupaten'].get('nama_kabupaten')
+        ]))
+
+        def wilayah_of(item):
+            return item['kabupaten'].get('nama_kabupaten') if item.get('kabupaten') else None
+    else:
+        wilayah_list = list(set([
+            item['kabupaten']['provinsi']['nama_provinsi'] for item in data
+            if (item.get('kabupaten') and
+                item['kabupaten'].get('provinsi') and
+                item['kabupaten']['provinsi'].get('nama_provinsi'))
+        ]))
+
+        def wilayah_of(item):
+            if item.get('kabupaten') and item['kabupaten'].get('provinsi'):
+                return item['kabupaten']['provinsi'].get('nama_provinsi')
+            return None
+
+    datasets = {}
+    details = {}
+    for dimensi, values, value_of in (
+        ('jenis_kejahatan', jenis_kejahatan_list, jenis_of),
+        ('waktu_kejadian', waktu_kejadian_list, waktu_of),
+        ('lokasi_kejadian', lokasi_kejadian_list, lokasi_of),
+        ('wilayah', wilayah_list, wilayah_of),
+    ):
+        datasets[dimensi] = [
+            {
+                "label": value,
+                "data": [
+                    len([item for item in data if str(item['tahun']) == year and value_of(item) == value])
+                    for year in labels
+                ]
+            }
+            for value in values
+        ]
+        details[dimensi] = {
+            value: len([item for item in data if value_of(item) == value])
+            for value in values
+        }
+
+    return {
+        "total_records": len(data),
+        "tahun": [len([item for item in data if str(item['tahun']) == year]) for year in labels],
+        "datasets": datasets,
+        "details": details
+    }
+
+def trend_cells(rows):
+    """Count rows per TREND_CUBE_GROUPS tuple, as crime_cube.rollup does"""
+    cells = Counter()
+    for item in rows:
+        kabupaten = item['kabupaten'] or {}
+        cells[(
+            item['tahun'],
+            item['jenis_kejahatan'],
+            (item['waktu_kejadian'] or {}).get('waktu_kejadian'),
+            (item['lokasi_kejadian'] or {}).get('nama_lokasi'),
+            kabupaten.get('kode_provinsi'),
+            kabupaten.get('nama_kabupaten'),
+            (kabupaten.get('provinsi') or {}).get('nama_provinsi')
+        )] += 1
+    return dict(cells)
+
+def by_label(datasets):
+    return {dataset['label']: dataset['data'] for dataset in datasets}
+
+@pytest.mark.parametrize('provinsi', [None, '32'])
+@pytest.mark.parametrize('count', [0, 1, 500, 3000])
+def test_aggregate_trends_matches_per_row_loop(provinsi, count):
+    labels = [str(year) for year in range(2014, 2025)]
+    rows = make_rows(count, provinsi, seed=count)
+
+    expected = legacy_trends(rows, labels, provinsi)
+    actual = aggregate_trends(build_trend_frame(trend_cells(rows), provinsi), labels)
+
+    assert actual["total_records"] == expected["total_records"]
+    assert actual["tahun"] == expected["tahun"]
+    for dimensi in TREND_DIMENSIONS:
+        # Label order follows set iteration in both versions, so compare per label
+        assert len(actual["datasets"][dimensi]) == len(expected["datasets"][dimensi])
+        assert by_label(actual["datasets"][dimensi]) == by_label(expected["datasets"][dimensi])
+        assert actual["details"][dimensi] == expected["details"][dimensi]
+        assert [dataset["label"] for dataset in actual["datasets"][dimensi]] == list(actual["details"][dimensi])
+
+def test_aggregate_trends_years_outside_labels():
+    labels = ['2020', '2021']
+    rows = make_rows(200, seed=7)
+
+    expected = legacy_trends(rows, labels, None)
+    actual = aggregate_trends(build_trend_frame(trend_cells(rows), None), labels)
+
+    assert actual["tahun"] == expected["tahun"]
+    for dimensi in TREND_DIMENSIONS:
+        assert by_label(actual["datasets"][dimensi]) == by_label(expected["datasets"][dimensi])
+        assert actual["details"][dimensi] == expected["details"][dimensi]